@@ -2,18 +2,19 @@ import streamlit as st
 import geopandas as gpd
 import pandas as pd
 import folium
-from folium.plugins import MarkerCluster
 from folium.features import DivIcon
-from shapely.geometry import Point
-import osmnx as ox
-import requests
 from streamlit_folium import st_folium
 import openai
 import math
 import os
-from urllib.parse import quote
-import io
-from itertools import permutations
+import time
+from jejuon import tracing
+from jejuon.basemap import add_base_layers, base_layer_payload, viewport_layer
+from jejuon.polyline import as_coords, compact_segments, fit_zoom, render_segments
+from jejuon.recommend import STYLES
+from jejuon.road_graph import network_for_mode
+from jejuon.guide import CompletionCache, GuideWriter
+from jejuon.service import LODGING_AUTO, TravelService, engine_name
 
 # ✅ 페이지 설정
 st.set_page_config(
@@ -22,206 +23,104 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
+# ✅ 실행(rerun)별 단계 계측 (JEJUON_METRICS_PORT / OTEL_EXPORTER_OTLP_ENDPOINT 가 있으면 내보내기)
+@st.cache_resource
+def setup_tracing():
+    return tracing.setup("jejuon-streamlit")
+
+tracing_status = setup_tracing()
+rerun_trace = tracing.begin("rerun")
+
 # ✅ 환경변수
 MAPBOX_TOKEN = st.secrets["MAPBOX_TOKEN"]
 openai.api_key = st.secrets["OPENAI_API_KEY"]
 
-# ✅ 데이터 로드
-@st.cache_data
-def load_data():
-    try:
-        tour = pd.read_csv("dataset/관광업_좌표추가.csv", encoding="utf-8").rename(columns={"X": "lon", "Y": "lat"})
-        tour["type"] = "관광업"
-
-        cafe = pd.read_csv("dataset/음식점_카페_좌표추가.csv", encoding="utf-8").rename(columns={"X": "lon", "Y": "lat"})
-        cafe["type"] = "음식점/카페"
-
-        natural = pd.read_csv("dataset/자연경관_좌표추가.csv", encoding="cp949").rename(columns={"X": "lon", "Y": "lat"})
-        natural["type"] = "자연경관"
+# ✅ 핵심 기능 (jejuon.service, HTTP API와 같은 코드/캐시 사용)
+# cache_resource: 세션마다 복사하지 않고 프로세스 안에서 공유 (읽기 전용으로만 사용)
+@st.cache_resource
+def get_service():
+    return TravelService(mapbox_token=MAPBOX_TOKEN)
 
-        if len(tour) > 100:
-            tour = tour.sample(n=100, random_state=42)
-        if len(cafe) > 100:
-            cafe = cafe.sample(n=100, random_state=42)
+service = get_service()
+# 점수 파이프라인(python -m jejuon.pipeline)이 새 버전을 쓰면 맛집/성향 표와 인덱스를 교체
+service.refresh()
 
-        data = pd.concat([tour, cafe, natural], ignore_index=True)
-        data = data.drop_duplicates(subset=["사업장명", "lon", "lat"])
-
-        geometry = [Point(xy) for xy in zip(data["lon"], data["lat"])]
-        gdf = gpd.GeoDataFrame(data, geometry=geometry, crs="EPSG:4326")
-
-        boundary = ox.geocode_to_gdf("Jeju Island, South Korea")
-        return gdf, boundary, data
+# ✅ 데이터 로드 (전처리 번들을 memory-map으로 읽기, 없으면 CSV에서 한 번 빌드)
+@st.cache_resource
+def load_data():
+    try:
+        data = service.tables["poi_data"]
+        gdf = gpd.GeoDataFrame(data, geometry=gpd.points_from_xy(data["lon"], data["lat"]), crs="EPSG:4326")
+        return gdf, service.boundary, data
     except Exception as e:
         st.error(f"❌ 데이터 로드 실패: {str(e)}")
         return None, None, None
 
-@st.cache_data
-def load_restaurant_data():
+def load_optional(name, label):
+    """서비스의 인덱스/요약 하나 가져오기. 실패하면 경고만 띄우고 None"""
     try:
-        df = pd.read_csv("final_result.csv", encoding="cp949")
-        return df
-    except:
-        try:
-            df = pd.read_csv("final_result.csv", encoding="utf-8")
-            return df
-        except Exception as e:
-            st.warning(f"⚠️ 맛집 데이터 로드 실패: {str(e)}")
-            return None
+        return getattr(service, name)
+    except Exception as e:
+        st.warning(f"⚠️ {label} 실패: {str(e)}")
+        return None
+
+# ✅ 지도 배경 레이어 (데이터 버전이 바뀔 때만 다시 생성)
+@st.cache_resource
+def get_base_layers(version):
+    gdf, boundary, _ = load_data()
+    return base_layer_payload(gdf, boundary)
+
+# ✅ 여러 날 일정의 숙소 선택 목록 (한 번만 정렬)
+@st.cache_resource
+def get_lodging_options():
+    return sorted(service.lodgings)
+
+# ✅ 오프라인 도로망 (python -m jejuon.road_graph 로 미리 빌드한 경우에만)
+def get_road_graph(network):
+    return service.road_graph(network)
+
+JEJU_BOUNDS = (126.10, 33.10, 127.00, 33.60)  # 서, 남, 동, 북 (초기 화면)
+REGION_ALL = "제주 전체"
 
 gdf, boundary, data = load_data()
-restaurant_df = load_restaurant_data()
+poi_index = load_optional("poi_index", "주변 장소 인덱스 생성")
+poi_clusters = load_optional("poi_clusters", "지도 장소 클러스터 생성")
+data_version = service.data_version
+name_index = load_optional("name_index", "장소명 인덱스 생성")
+spot_index = load_optional("spot_index", "관광지 리뷰 데이터 로드")
+restaurant_summaries = load_optional("restaurant_summaries", "맛집 요약 생성")
+review_index = load_optional("review_index", "리뷰 검색 인덱스 로드")
+region_names = (load_optional("regions", "지역 경계 로드") or []) if gdf is not None else []
 data_loaded = gdf is not None
 
 if not data_loaded:
     st.warning("⚠️ 관광 데이터 로드에 실패했어요.")
 
-# ✅ 카페 포맷 함수
-def format_cafes(cafes_df):
-    try:
-        cafes_df = cafes_df.drop_duplicates(subset=['c_name', 'c_value', 'c_review'])
-        if len(cafes_df) == 0:
-            return ("현재 이 관광지 주변에 등록된 카페 정보는 없어요. \n"
-                    "하지만 근처에 숨겨진 보석 같은 공간이 있을 수 있으니, \n"
-                    "지도를 활용해 천천히 걸어보시는 것도 추천드립니다 😊")
-        elif len(cafes_df) == 1:
-            row = cafes_df.iloc[0]
-            if all(x not in str(row["c_review"]) for x in ["없음", "없읍"]):
-                return f" **{row['c_name']}** (⭐ {row['c_value']}) \n\"{row['c_review']}\""
-            else:
-                return f"**{row['c_name']}** (⭐ {row['c_value']})"
-        else:
-            grouped = cafes_df.groupby(['c_name', 'c_value'])
-            lines = ["**주변의 평점 높은 카페들은 여기 있어요!** 🌼\n"]
-            for (name, value), group in grouped:
-                reviews = group['c_review'].dropna().unique()
-                reviews = [r for r in reviews if all(x not in str(r) for x in ["없음", "없읍"])]
-                top_reviews = reviews[:3]
-                if top_reviews:
-                    review_text = "\n".join([f"\"{r}\"" for r in top_reviews])
-                    lines.append(f"- **{name}** (⭐ {value}) \n{review_text}")
-                else:
-                    lines.append(f"- **{name}** (⭐ {value})")
-            return "\n\n".join(lines)
-    except Exception as e:
-        return f"카페 정보 처리 중 오류가 발생했습니다: {str(e)}"
-
 # ✅ 좌표 가져오기 함수
 def get_coordinates(place_name):
-    """장소명으로 좌표 가져오기"""
-    # 기존 데이터에서 찾기
-    matching_rows = gdf[gdf["사업장명"] == place_name]
-    if not matching_rows.empty:
-        r = matching_rows.iloc[0]
-        return (r.lon, r.lat)
-    
-    # restaurant_df에서 찾기
-    if restaurant_df is not None:
-        tourist_rows = restaurant_df[restaurant_df["name_2"] == place_name]
-        if not tourist_rows.empty:
-            r = tourist_rows.iloc[0]
-            return (r["X_2"], r["Y_2"])
-    
-    return None
+    """장소명으로 좌표 가져오기 (관광 데이터 우선, 없으면 맛집 데이터의 관광지)"""
+    if name_index is None:
+        return None
+    return service.coordinates(place_name)
 
 # ✅ 최단거리 경로 계산 함수
-def calculate_shortest_route(start, waypoints, mode="driving"):
-    """최단거리 기준으로 경로 최적화"""
-    if not waypoints:
-        return [start], [], 0.0, 0.0
-    
-    # 모든 지점의 좌표 가져오기
-    all_places = [start] + waypoints
-    coords_dict = {}
-    for place in all_places:
-        coord = get_coordinates(place)
-        if coord and not (pd.isna(coord[0]) or pd.isna(coord[1])):
-            coords_dict[place] = coord
-    
-    if len(coords_dict) < 2:
-        return [start], [], 0.0, 0.0
-    
-    # 출발지 좌표
-    start_coord = coords_dict.get(start)
-    if not start_coord:
-        return [start], [], 0.0, 0.0
-    
-    # 경유지만 추출
-    valid_waypoints = [w for w in waypoints if w in coords_dict]
-    
-    if not valid_waypoints:
-        return [start], [], 0.0, 0.0
-    
-    # 경유지가 5개 이하면 모든 순열 시도, 많으면 그리디 알고리즘
-    if len(valid_waypoints) <= 5:
-        best_order = None
-        best_distance = float('inf')
-        
-        for perm in permutations(valid_waypoints):
-            total_dist = 0
-            current = start_coord
-            
-            for place in perm:
-                next_coord = coords_dict[place]
-                dist = math.sqrt((current[0] - next_coord[0])**2 + (current[1] - next_coord[1])**2)
-                total_dist += dist
-                current = next_coord
-            
-            if total_dist < best_distance:
-                best_distance = total_dist
-                best_order = list(perm)
-        
-        optimized_waypoints = best_order
-    else:
-        # 그리디 알고리즘: 가장 가까운 지점부터 방문
-        remaining = valid_waypoints.copy()
-        optimized_waypoints = []
-        current = start_coord
-        
-        while remaining:
-            nearest = min(remaining, key=lambda p: math.sqrt(
-                (current[0] - coords_dict[p][0])**2 + 
-                (current[1] - coords_dict[p][1])**2
-            ))
-            optimized_waypoints.append(nearest)
-            current = coords_dict[nearest]
-            remaining.remove(nearest)
-    
-    # 최적화된 순서로 경로 계산
-    final_order = [start] + optimized_waypoints
-    segments = []
-    total_duration = 0.0
-    total_distance = 0.0
-    
-    api_mode = "walking" if mode == "도보" else "driving"
-    
-    for i in range(len(final_order) - 1):
-        coord1 = coords_dict[final_order[i]]
-        coord2 = coords_dict[final_order[i + 1]]
-        
-        coord_str = f"{coord1[0]},{coord1[1]};{coord2[0]},{coord2[1]}"
-        url = f"https://api.mapbox.com/directions/v5/mapbox/{api_mode}/{coord_str}"
-        params = {"geometries": "geojson", "overview": "full", "access_token": MAPBOX_TOKEN}
-        
-        try:
-            r = requests.get(url, params=params, timeout=10)
-            if r.status_code == 200:
-                data_resp = r.json()
-                if data_resp.get("routes"):
-                    route = data_resp["routes"][0]
-                    segments.append(route["geometry"]["coordinates"])
-                    total_duration += route.get("duration", 0)
-                    total_distance += route.get("distance", 0)
-                else:
-                    # API 실패시 직선 거리로 대체
-                    segments.append([[coord1[0], coord1[1]], [coord2[0], coord2[1]]])
-            else:
-                segments.append([[coord1[0], coord1[1]], [coord2[0], coord2[1]]])
-        except Exception as e:
-            st.warning(f"경로 계산 중 오류: {str(e)}")
-            segments.append([[coord1[0], coord1[1]], [coord2[0], coord2[1]]])
-    
-    return final_order, segments, total_duration / 60, total_distance / 1000
+def calculate_shortest_route(start, waypoints, mode="driving", end=None, engine="Mapbox", previous=None):
+    """최단거리 기준으로 경로 최적화 (end: None=도착 자유, start=출발지 복귀, 경유지명=그 곳에서 종료)
+
+    previous: 같은 모드/엔진의 이전 결과가 있으면 추가/삭제된 경유지만 반영하고 바뀐 구간만 다시 받는다
+    """
+    with tracing.span("route", stops=len(waypoints) + 1, incremental=previous is not None):
+        if previous is not None:
+            result = service.update_route(previous, start, waypoints, mode, end=end, engine=engine_name(engine))
+        else:
+            result = service.shortest_route(start, waypoints, mode, end=end, engine=engine_name(engine))
+    if result.warning:
+        st.warning(result.warning)
+    return result
+
+# ✅ 경로에 포함된 맛집 데이터 관광지
+def restaurant_spots(order):
+    return [place for place in order if name_index.in_source(place, "restaurant")]
 
 # ✅ Session 초기화
 DEFAULTS = {
@@ -231,7 +130,10 @@ DEFAULTS = {
     "distance": 0.0,
     "messages": [{"role": "system", "content": "당신은 제주 문화관광 전문 가이드입니다."}],
     "auto_gpt_input": "",
-    "selected_restaurants": []
+    "selected_restaurants": [],
+    "trip": [],
+    "route": None,  # 마지막 경로 결과 (경유지 편집 시 재사용)
+    "route_params": None  # 그 결과의 (이동 모드, 엔진)
 }
 for k, v in DEFAULTS.items():
     if k not in st.session_state:
@@ -283,13 +185,17 @@ with st.container():
     st.write("원하는 여행 분위기나 목적을 선택하세요. AI가 이에 맞는 장소를 추천합니다.")
     travel_style = st.multiselect(
         "여행 키워드 선택 (최대 3개)",
-        ["힐링","감성","자연","체험","커플","가족","액티비티","사진명소","카페투어","맛집탐방"],
+        STYLES,
         default=["힐링"]
     )
     if travel_style:
         st.success(f"선택한 여행 성향: {', '.join(travel_style)}")
     else:
         st.info("여행 성향을 하나 이상 선택해주세요.")
+    popularity_weight = st.slider("인기도 반영 비율", 0.0, 0.5, 0.0, step=0.05, key="popularity_key")
+    # 지역을 고르면 추천/출발지·경유지 목록/주변 장소를 그 지역 인덱스에서만 찾는다
+    region_choice = st.selectbox("여행 지역", [REGION_ALL] + region_names, key="region_key")
+    region = None if region_choice == REGION_ALL else region_choice
     show_recommend = st.button("🔍 AI 추천 보기", key="ai_recommend_button")
 
     if show_recommend:
@@ -297,50 +203,23 @@ with st.container():
             st.warning("먼저 여행 성향을 선택해주세요!")
         else:
             try:
-                base = "https://raw.githubusercontent.com/JeongWon4034/jeju/main/"
-                fname = "비짓제주_이름기반_감성분석결과.csv"
-                url = base + quote(fname)
-
-                @st.cache_data
-                def load_ai_recommendations(url_):
-                    r = requests.get(url_, timeout=15)
-                    r.raise_for_status()
-                    r.encoding = "utf-8"
-                    return pd.read_csv(io.StringIO(r.text))
-
-                rec_df = load_ai_recommendations(url)
+                # 선택한 성향 전체의 추천점수 가중합(+인기도)으로 상위 3곳
+                recommendations = service.recommend(travel_style, k=3, popularity=popularity_weight, region=region)
                 st.success(f"선택한 성향({', '.join(travel_style)})에 맞는 추천지를 추렸어요 💫")
 
-                pattern = "|".join(travel_style)
-                filtered = rec_df[rec_df["최고추천성향"].astype(str).str.contains(pattern, na=False)]
-
-                if filtered.empty:
+                if not recommendations:
                     st.error("해당 성향에 맞는 추천 결과가 없습니다 😢")
                 else:
-                    place_col = "관광지명" if "관광지명" in filtered.columns else filtered.columns[0]
-
-                    filtered = (
-                        filtered.sort_values(by="최고추천점수", ascending=False)
-                                .drop_duplicates(subset=[place_col], keep="first")
-                                .head(3)
-                    )
-
-                    for i, row in enumerate(filtered.to_dict("records"), 1):
-                        title = row.get(place_col, "추천지")
-                        style = row.get("최고추천성향", "")
-                        score = row.get("최고추천점수", float("nan"))
-                        cnt   = int(row.get("Cnt", 0)) if not pd.isna(row.get("Cnt", None)) else 0
-                        link  = row.get("URL", "#")
-
+                    for i, rec in enumerate(recommendations, 1):
                         st.markdown(f"""
                         <div style='background:linear-gradient(135deg,#fdfbfb 0%,#ebedee 100%);
                                     padding:16px;border-radius:12px;margin-bottom:12px;
                                     box-shadow:0 2px 5px rgba(0,0,0,0.05)'>
-                            <h4 style='margin-bottom:4px'>🌟 {i}. {title}</h4>
-                            <p style='margin:2px 0'>🧭 주요 성향: <b>{style}</b></p>
-                            <p style='margin:2px 0'>💫 추천점수: <b>{score:.3f}</b></p>
-                            <p style='margin:2px 0'>🔥 인기도(Cnt): {cnt}</p>
-                            <a href='{link}' target='_blank'>🔗 자세히 보기</a>
+                            <h4 style='margin-bottom:4px'>🌟 {i}. {rec.name}</h4>
+                            <p style='margin:2px 0'>🧭 주요 성향: <b>{rec.style}</b></p>
+                            <p style='margin:2px 0'>💫 추천점수: <b>{rec.score:.3f}</b></p>
+                            <p style='margin:2px 0'>🔥 인기도(Cnt): {rec.cnt}</p>
+                            <a href='{rec.url}' target='_blank'>🔗 자세히 보기</a>
                         </div>
                         """, unsafe_allow_html=True)
             except Exception as e:
@@ -358,12 +237,18 @@ if data_loaded:
         st.markdown('<div class="section-header">🚗 추천경로 설정</div>', unsafe_allow_html=True)
         st.markdown("**이동 모드**")
         mode = st.radio("", ["운전자", "도보"], horizontal=True, key="mode_key", label_visibility="collapsed")
+        engine = st.radio("경로 엔진", ["Mapbox", "오프라인 도로망"], horizontal=True, key="engine_key")
+        if engine == "오프라인 도로망" and get_road_graph(network_for_mode(mode)) is None:
+            st.caption("⚠️ 오프라인 도로망이 준비되지 않아 Mapbox로 계산합니다. (python -m jejuon.road_graph)")
         
-        # 출발지 옵션: 기존 데이터 + final_result의 name_2
-        start_options = list(gdf["사업장명"].dropna().unique())
-        if restaurant_df is not None:
-            tourist_spots = restaurant_df["name_2"].dropna().unique().tolist()
-            start_options = sorted(list(set(start_options + tourist_spots)))
+        # 출발지 옵션: 기존 데이터 + final_result의 name_2 (인덱스에서 한 번만 정렬, 지역을 고르면 그 지역만)
+        start_options = name_index.sorted_names
+        if region:
+            start_options = service.place_names(region)
+            # 지역을 바꿔도 이미 고른 출발지/경유지는 목록에 남긴다
+            chosen = [st.session_state.get("start_key")] + st.session_state.get("wps_key", [])
+            kept = [n for n in dict.fromkeys(chosen) if n and n not in start_options]
+            start_options = kept + start_options if kept else start_options
         
         st.markdown("**출발지**")
         start = st.selectbox("", start_options, key="start_key", label_visibility="collapsed")
@@ -372,20 +257,42 @@ if data_loaded:
         waypoint_options = [n for n in start_options if n != st.session_state.get("start_key", "")]
         wps = st.multiselect("", waypoint_options, key="wps_key", label_visibility="collapsed")
         
+        st.markdown("**도착지**")
+        end_labels = {"자유 (최적 순서의 마지막 경유지)": None, "출발지로 돌아오기": start}
+        end_labels.update({w: w for w in wps})
+        end_choice = st.selectbox("", list(end_labels), key="end_key", label_visibility="collapsed")
+        
+        st.markdown("**경로 주변 장소**")
+        nearby_categories = st.multiselect("", ["카페", "음식점", "숙박"], key="nearby_key", label_visibility="collapsed")
+        nearby_radius = st.slider("주변 반경(m)", 100, 2000, 300, step=100, key="nearby_radius_key")
+        
+        incremental = st.toggle("경유지만 바꾸면 바뀐 구간만 다시 계산", value=True, key="incremental_key")
+
         c1, c2 = st.columns(2, gap="small")
         with c1:
             create_clicked = st.button("경로 생성")
         with c2:
             clear_clicked = st.button("초기화")
 
+        # 출발지 + 경유지를 날짜별로 나누기 (숙소 왕복, 하루 시간 예산)
+        with st.expander("🗓️ 여러 날 일정 나누기", expanded=False):
+            trip_days = st.number_input("여행 일수", 1, 14, 2, key="trip_days_key")
+            day_hours = st.slider("하루 일정(시간)", 4, 14, 8, key="day_hours_key")
+            dwell_min = st.slider("장소별 체류시간(분)", 15, 180, 60, step=15, key="dwell_key")
+            lodging_labels = {"숙소 없이": None, "날마다 가까운 숙소": LODGING_AUTO}
+            lodging_choice = st.selectbox("숙소", list(lodging_labels) + get_lodging_options(), key="lodging_key")
+            plan_clicked = st.button("일정 나누기")
+
     if clear_clicked:
         try:
-            for k in ["segments", "order", "selected_restaurants"]:
+            for k in ["segments", "order", "selected_restaurants", "trip"]:
                 st.session_state[k] = []
             for k in ["duration", "distance"]:
                 st.session_state[k] = 0.0
+            st.session_state["route"] = st.session_state["route_params"] = None
             st.session_state["auto_gpt_input"] = ""
-            for widget_key in ["mode_key", "start_key", "wps_key"]:
+            for widget_key in ["mode_key", "engine_key", "start_key", "wps_key", "end_key", "nearby_key", "nearby_radius_key",
+                               "trip_days_key", "day_hours_key", "dwell_key", "lodging_key", "incremental_key"]:
                 if widget_key in st.session_state:
                     del st.session_state[widget_key]
             st.success("✅ 초기화가 완료되었습니다.")
@@ -393,23 +300,36 @@ if data_loaded:
         except Exception as e:
             st.error(f"❌ 초기화 중 오류: {str(e)}")
 
+    if plan_clicked:
+        trip_places = [start] + [w for w in wps if w != start]
+        try:
+            with st.spinner("날짜별 일정을 나누고 있어요..."):
+                st.session_state["trip"] = service.plan_trip(
+                    trip_places, int(trip_days), mode, engine=engine_name(engine),
+                    lodging=lodging_labels.get(lodging_choice, lodging_choice),
+                    dwell=dwell_min, day_hours=day_hours,
+                )
+        except Exception as e:
+            st.error(f"❌ 일정 나누기 중 오류: {str(e)}")
+
     if create_clicked:
         with st.spinner("최단거리 경로를 계산하고 있습니다..."):
-            final_order, segments, duration, distance = calculate_shortest_route(start, wps, mode)
+            route_params = (mode, engine_name(engine))
+            previous = st.session_state["route"] if incremental and st.session_state["route_params"] == route_params else None
+            result = calculate_shortest_route(start, wps, mode, end=end_labels[end_choice], engine=engine, previous=previous)
+            # 세션에는 단순화한 encoded polyline만 저장 (지도 그릴 때 풀어서 사용)
+            result = result._replace(segments=compact_segments(result.segments))
             
-            if segments:
-                st.session_state["order"] = final_order
-                st.session_state["segments"] = segments
-                st.session_state["duration"] = duration
-                st.session_state["distance"] = distance
+            if result.segments:
+                st.session_state["route"] = result
+                st.session_state["route_params"] = route_params
+                st.session_state["order"] = result.order
+                st.session_state["segments"] = result.segments
+                st.session_state["duration"] = result.duration
+                st.session_state["distance"] = result.distance
                 
                 # 맛집 관광지 리스트 저장
-                selected_restaurant_spots = []
-                for place in final_order:
-                    if restaurant_df is not None:
-                        if place in restaurant_df["name_2"].values:
-                            selected_restaurant_spots.append(place)
-                st.session_state["selected_restaurants"] = selected_restaurant_spots
+                st.session_state["selected_restaurants"] = restaurant_spots(result.order)
                 
                 st.success("✅ 최단거리 경로가 생성되었습니다!")
                 st.rerun()
@@ -433,8 +353,62 @@ if data_loaded:
         st.metric("⏱️ 소요시간", f"{st.session_state.get('duration', 0.0):.1f}분")
         st.metric("📏 이동거리", f"{st.session_state.get('distance', 0.0):.2f}km")
 
+        # 여러 날 일정: 날짜별 요약, 선택한 날을 지도 경로로
+        trip = st.session_state.get("trip", [])
+        if trip:
+            st.markdown("**🗓️ 날짜별 일정**")
+            for day in trip:
+                lodging_text = f" · 🏨 {day.lodging}" if day.lodging else ""
+                status = "⚠️ 예산 초과" if day.over_budget else "✅"
+                st.markdown(
+                    f"**{day.day}일차**{lodging_text}  \n"
+                    f"{' → '.join(day.order) if day.order else '방문 장소 없음'}  \n"
+                    f"이동 {day.travel:.0f}분 + 체류 {day.dwell:.0f}분 / {day.budget:.0f}분 {status}"
+                )
+                if day.order and st.button(f"{day.day}일차 지도에 표시", key=f"trip_day_{day.day}"):
+                    result = service.route_through(day.order, day.coords, mode, engine=engine_name(engine))
+                    result = result._replace(segments=compact_segments(result.segments))
+                    if result.warning:
+                        st.warning(result.warning)
+                    # 숙소 구간이 섞여 있어서 경유지 편집용 이전 결과로는 쓰지 않음
+                    st.session_state["route"] = st.session_state["route_params"] = None
+                    st.session_state["order"] = result.order
+                    st.session_state["segments"] = result.segments
+                    st.session_state["duration"] = result.duration
+                    st.session_state["distance"] = result.distance
+                    st.session_state["selected_restaurants"] = restaurant_spots(result.order)
+                    st.rerun()
+            if any(day.over_budget for day in trip):
+                st.caption("하루 예산을 넘는 날이 있어요. 여행 일수나 하루 일정 시간을 늘려 보세요.")
+
+        # 현재 경로에 끼워 넣기 좋은 장소 (성향 점수 - 우회 시간)
+        if current_order and travel_style:
+            with st.expander("🧭 경로에 맞는 추천", expanded=False):
+                try:
+                    route_recs = service.route_recommendations(
+                        current_order, travel_style, mode, engine=engine_name(engine), k=5, popularity=popularity_weight,
+                        region=region,
+                    )
+                    if not route_recs:
+                        st.caption("경로 근처에 추천할 장소가 없어요.")
+                    for rec in route_recs:
+                        after = current_order[rec.position]
+                        st.markdown(
+                            f"**{rec.name}** · {rec.style}  \n"
+                            f"'{after}' 다음에 넣으면 +{rec.detour / 60:.0f}분 (점수 {rec.score:.2f})"
+                        )
+                except Exception as e:
+                    st.caption(f"⚠️ 경로 기반 추천 실패: {str(e)}")
+
     with col3:
         st.markdown('<div class="section-header">🗺️ 추천경로 지도시각화</div>', unsafe_allow_html=True)
+        poi_layer_options = poi_clusters.categories if poi_clusters is not None else []
+        poi_layers = st.multiselect(
+            "지도 표시 장소",
+            [c for c in poi_layer_options if c != "자연경관"],
+            default=["관광업"] if "관광업" in poi_layer_options else [],
+            key="poi_layer_key",
+        )
         try:
             ctr = boundary.geometry.centroid
             clat, clon = float(ctr.y.mean()), float(ctr.x.mean())
@@ -444,6 +418,7 @@ if data_loaded:
             clat, clon = 33.38, 126.53
 
         # 지도 렌더링
+        map_span = tracing.span("map.build")
         try:
             m = folium.Map(
                 location=[clat, clon],
@@ -453,93 +428,71 @@ if data_loaded:
                 control_scale=True
             )
 
-            if boundary is not None:
-                folium.GeoJson(
-                    boundary,
-                    style_function=lambda f: {"color": "#9aa0a6", "weight": 2, "dashArray": "4,4", "fillOpacity": 0.05}
-                ).add_to(m)
+            # 배경 레이어 (경계/자연경관): 데이터 버전별로 한 번 만든 payload 재사용
+            add_base_layers(m, get_base_layers(data_version))
 
-            mc = MarkerCluster().add_to(m)
+            # POI 레이어: 현재 화면 범위/줌의 클러스터만 (지도 전체 재렌더링 없이 교체)
+            map_view = st.session_state.get("map_view", {"bounds": JEJU_BOUNDS, "zoom": 11})
+            poi_fg = None
+            if poi_clusters is not None and poi_layers:
+                with tracing.span("map.viewport", zoom=map_view["zoom"]):
+                    poi_fg = viewport_layer(poi_clusters.query(map_view["bounds"], map_view["zoom"], poi_layers))
 
-            # 기존 데이터 회색 마커 (백그라운드 - 마커클러스터)
-            for _, row in gdf[gdf["type"].isin(["관광업", "음식점/카페"])].iterrows():
-                if not (pd.isna(row.lat) or pd.isna(row.lon)):
-                    folium.Marker(
-                        [row.lat, row.lon],
-                        popup=folium.Popup(str(row["사업장명"]), max_width=200),
-                        tooltip=str(row["사업장명"]),
-                        icon=folium.Icon(color="gray", icon="info-sign")
-                    ).add_to(mc)
-
-            # 자연경관 초록 마커
-            try:
-                natural_df = gdf[gdf["type"] == "자연경관"]
-                for _, row in natural_df.iterrows():
-                    if not (pd.isna(row.lat) or pd.isna(row.lon)):
-                        parking = str(row.get("장애인주차여부", "정보 없음"))
-                        toilet = str(row.get("화장실", "정보 없음"))
-                        wheel = str(row.get("휠체어대여", "정보 없음"))
-                        braille = str(row.get("점자표시판", "정보 없음"))
-                        acc_url = str(row.get("열린광장url", ""))
+            # 선택된 관광지와 주변 맛집 표시
+            selected_restaurant_spots = st.session_state.get("selected_restaurants", [])
+            if restaurant_summaries is not None and selected_restaurant_spots:
+                for spot in selected_restaurant_spots:
+                    # 관광지 마커 (파란색)
+                    spot_coord = restaurant_summaries.location(spot)
+                    if spot_coord:
+                        folium.Marker(
+                            [spot_coord[1], spot_coord[0]],
+                            popup=folium.Popup(f"<b>🏛️ {spot}</b><br>관광지", max_width=200),
+                            tooltip=f"🏛️ {spot}",
+                            icon=folium.Icon(color="blue", icon="star")
+                        ).add_to(m)
 
+                    # 주변 맛집 마커 (주황색, 맛집별 하나)
+                    for rest in restaurant_summaries.for_spot(spot):
+                        if pd.isna(rest.lon) or pd.isna(rest.lat):
+                            continue
+                        review = rest.reviews[0] if rest.reviews else ""
+                        review_text = review[:80] + "..." if len(review) > 80 else review
                         popup_html = f"""
-                        <b>{row['사업장명']}</b><br>
-                        유형: 자연경관<br>
-                        🚗 장애인주차: {parking}<br>
-                        ♿ 휠체어대여: {wheel}<br>
-                        🚻 화장실: {toilet}<br>
-                        🔤 점자표시판: {braille}<br>
-                        <a href="{acc_url}" target="_blank">🔗 접근성 상세보기</a>
+                        <b>🍴 {rest.name}</b><br>
+                        <b>관광지:</b> {spot}<br>
+                        <b>감정:</b> 😊 {rest.positive} · 😞 {rest.negative} · 😐 {rest.other}<br>
+                        <b>리뷰:</b> {review_text}
                         """
-
                         folium.Marker(
-                            [row.lat, row.lon],
-                            popup=folium.Popup(popup_html, max_width=280),
-                            tooltip=f"🌿 {row['사업장명']}",
-                            icon=folium.Icon(color="green", icon="leaf")
+                            [rest.lat, rest.lon],
+                            popup=folium.Popup(popup_html, max_width=300),
+                            tooltip=f"🍴 {rest.name}",
+                            icon=folium.Icon(color="orange", icon="cutlery")
                         ).add_to(m)
-            except:
-                pass
 
-            # 선택된 관광지와 주변 맛집 표시
-            selected_restaurant_spots = st.session_state.get("selected_restaurants", [])
-            if restaurant_df is not None and selected_restaurant_spots:
-                for spot in selected_restaurant_spots:
-                    spot_data = restaurant_df[restaurant_df["name_2"] == spot]
-                    if not spot_data.empty:
-                        spot_row = spot_data.iloc[0]
-                        # 관광지 마커 (파란색)
-                        if not (pd.isna(spot_row["X_2"]) or pd.isna(spot_row["Y_2"])):
-                            folium.Marker(
-                                [spot_row["Y_2"], spot_row["X_2"]],
-                                popup=folium.Popup(f"<b>🏛️ {spot}</b><br>관광지", max_width=200),
-                                tooltip=f"🏛️ {spot}",
-                                icon=folium.Icon(color="blue", icon="star")
-                            ).add_to(m)
-                        
-                        # 주변 맛집 마커 (주황색)
-                        restaurants = spot_data[["name_1", "X", "Y", "review", "p_n"]].drop_duplicates()
-                        for _, rest in restaurants.iterrows():
-                            if not (pd.isna(rest["X"]) or pd.isna(rest["Y"])):
-                                sentiment = "긍정😊" if rest["p_n"] == "positive" else "부정😞" if rest["p_n"] == "negative" else "중립😐"
-                                review_text = str(rest['review'])[:80] + "..." if len(str(rest['review'])) > 80 else str(rest['review'])
-                                popup_html = f"""
-                                <b>🍴 {rest['name_1']}</b><br>
-                                <b>관광지:</b> {spot}<br>
-                                <b>감정:</b> {sentiment}<br>
-                                <b>리뷰:</b> {review_text}
-                                """
-                                folium.Marker(
-                                    [rest["Y"], rest["X"]],
-                                    popup=folium.Popup(popup_html, max_width=300),
-                                    tooltip=f"🍴 {rest['name_1']}",
-                                    icon=folium.Icon(color="orange", icon="cutlery")
-                                ).add_to(m)
+            # 경로 주변 카페/음식점/숙박 (공간 인덱스 질의)
+            if poi_index is not None and nearby_categories and st.session_state.get("segments"):
+                nearby_style = {"카페": ("pink", "coffee"), "음식점": ("cadetblue", "cutlery"), "숙박": ("purple", "home")}
+                stops = [c for c in (get_coordinates(p) for p in st.session_state.get("order", [])) if c]
+                route_lines = [as_coords(seg) for seg in st.session_state["segments"]]
+                nearby = service.nearby(stops, route_lines, nearby_categories, k=15, radius=nearby_radius, region=region)
+                for _, poi in nearby.iterrows():
+                    color, icon = nearby_style.get(poi["category"], ("gray", "info-sign"))
+                    folium.Marker(
+                        [poi["lat"], poi["lon"]],
+                        popup=folium.Popup(f"<b>{poi['name']}</b><br>{poi['category']} · 경로에서 {poi['distance_m']:.0f}m", max_width=250),
+                        tooltip=f"{poi['category']} {poi['name']}",
+                        icon=folium.Icon(color=color, icon=icon, prefix="fa")
+                    ).add_to(m)
 
             # 경로선 그리기 (각 구간별로 다른 색상)
             if st.session_state.get("segments"):
                 palette = ["#4285f4", "#34a853", "#ea4335", "#fbbc04", "#9c27b0", "#ff9800", "#00bcd4", "#ff5722"]
-                segments = st.session_state["segments"]
+                # 저장된 구간을 풀어서 지금 보이는 줌(경로 전체가 들어가는 줌 이상)의 1픽셀 허용오차로 단순화
+                route_lines = [as_coords(seg) for seg in st.session_state["segments"]]
+                route_ends = [pt for seg in route_lines if seg for pt in (seg[0], seg[-1])]
+                segments = render_segments(route_lines, max(map_view["zoom"], fit_zoom(route_ends)))
                 current_order = st.session_state.get("order", [])
                 
                 for i, seg in enumerate(segments):
@@ -594,13 +547,52 @@ if data_loaded:
                 m.location = [clat, clon]
                 m.zoom_start = 11
 
-            st_folium(m, key="main_map", width=None, height=520, returned_objects=[], use_container_width=True)
+            map_span.end()
+            with tracing.span("map.st_folium"):
+                map_state = st_folium(
+                    m, key="main_map", width=None, height=520,
+                    returned_objects=["bounds", "zoom"],
+                    feature_group_to_add=poi_fg,
+                    use_container_width=True
+                )
+
+            # 화면 범위/줌이 바뀌면 그 범위의 클러스터로 다시 그리기
+            bounds = (map_state or {}).get("bounds") or {}
+            sw, ne = bounds.get("_southWest") or {}, bounds.get("_northEast") or {}
+            if sw.get("lng") is not None and ne.get("lng") is not None and map_state.get("zoom") is not None:
+                new_view = {
+                    "bounds": tuple(round(v, 4) for v in (sw["lng"], sw["lat"], ne["lng"], ne["lat"])),
+                    "zoom": int(map_state["zoom"]),
+                }
+                if new_view != st.session_state.get("map_view"):
+                    st.session_state["map_view"] = new_view
+                    st.rerun()
 
         except Exception as map_error:
+            map_span.end(map_error)
             st.error(f"❌ 지도 렌더링 오류: {str(map_error)}")
 
-# ✅ OpenAI 클라이언트
-client = openai.OpenAI(api_key=st.secrets["OPENAI_API_KEY"])
+# ✅ OpenAI 클라이언트 + 소개 캐시 (프로세스 공유: 같은 장소 동시 요청은 한 번만 호출)
+@st.cache_resource
+def get_guide_writer():
+    # 소개 프롬프트에는 장소의 대표 리뷰 몇 줄만 근거로 넣는다 (리뷰 인덱스가 없으면 기존 프롬프트)
+    # 클라이언트를 만들 수 없으면(키 없음 등) None → 가이드 기능만 끈다
+    try:
+        client = openai.OpenAI(api_key=st.secrets["OPENAI_API_KEY"], base_url=os.environ.get("OPENAI_BASE_URL"))
+    except openai.OpenAIError:
+        return None
+    return GuideWriter(
+        client,
+        CompletionCache(),
+        context=(lambda place: [s.line for s in service.review_snippets(place)]) if review_index is not None else None,
+    )
+
+def split_guide_input(text):
+    """입력이 전부 아는 장소명이면 (장소 목록, None), 아니면 ([], 질문)"""
+    parts = [p.strip() for p in text.split(",") if p.strip()]
+    if parts and all(get_coordinates(p) is not None or (spot_index is not None and p in spot_index) for p in parts):
+        return parts, None
+    return [], text.strip()
 
 # ✅ 생성형 AI 가이드
 st.markdown("---")
@@ -617,83 +609,132 @@ with st.form("chat_form"):
         "관광지명을 쉼표로 구분해서 입력하거나 궁금한 것을 물어보세요 !",
         value=st.session_state.get("auto_gpt_input", "")
     )
+    stream_guide = st.toggle("답변 실시간 표시", value=True, key="stream_guide_key")
     submitted = st.form_submit_button("🔍 관광지 정보 요청")
 
-if submitted and user_input and client is not None:
-    if st.session_state["order"]:
-        st.markdown("---")
-        st.markdown("## ✨ 관광지별 상세 정보")
-        for place in st.session_state["order"][:3]:
-            try:
-                matched = data[data['t_name'].str.contains(place, na=False)]
-            except:
-                matched = pd.DataFrame()
+guide_writer = get_guide_writer()
+if submitted and user_input and guide_writer is not None:
+    typed_places, question = split_guide_input(user_input)
 
-            # GPT 소개
+    # 자유 질문: 리뷰 검색으로 근거 몇 줄을 골라서 답변
+    if question:
+        st.markdown("---")
+        st.markdown("## 💬 질문 답변")
+        evidence = []
+        if review_index is not None:
             try:
-                response = client.chat.completions.create(
-                    model="gpt-3.5-turbo",
-                    messages=[
-                        {"role": "system", "content": "당신은 제주 지역의 관광지 및 카페, 식당을 간단하게 소개하는 관광 가이드입니다."},
-                        {"role": "system", "content": "존댓말을 사용하세요."},
-                        {"role": "user", "content": f"{place}를 두 문단 이내로 간단히 설명해주세요."}
-                    ]
-                )
-                gpt_intro = response.choices[0].message.content
+                evidence = service.search_reviews(question, k=5)
             except Exception as e:
-                gpt_intro = f"❌ GPT 호출 실패: {place} 소개를 불러올 수 없어요."
-
-            score_text = ""; review_block = ""; cafe_info = ""
-            if not matched.empty:
+                st.warning(f"⚠️ 리뷰 검색 실패: {str(e)}")
+        snippets = [s.line for s in evidence]
+        answer_slot = st.empty()
+        answer = None
+        if stream_guide:
+            answer_slot.caption("✍️ 답변을 작성하고 있어요...")
+            with tracing.span("guide.answer", stream=True, evidence=len(snippets)):
+                for text, done in guide_writer.stream_answer(question, snippets):
+                    answer = text
+                    if text:
+                        answer_slot.markdown(text if done else text + " ▌")
+        else:
+            with st.spinner("답변을 준비하고 있어요..."), tracing.span("guide.answer", stream=False, evidence=len(snippets)):
                 try:
-                    t_value = matched['t_value'].dropna().unique()
-                    score_text = f"📊**관광지 평점**: ⭐ {t_value[0]}" if len(t_value) > 0 else ""
-                    reviews = matched['t_review'].dropna().unique()
-                    reviews = [r for r in reviews if all(x not in str(r) for x in ["없음", "없읍"])]
-                    if reviews:
-                        review_block = "\n".join([f'"{r}"' for r in reviews[:3]])
-                    cafes = matched[['c_name', 'c_value', 'c_review']].drop_duplicates()
-                    cafe_info = format_cafes(cafes)
-                except:
-                    cafe_info = ""
-
-            # 맛집 정보 추가 (final_result.csv 기반)
-            restaurant_info = ""
-            if restaurant_df is not None:
-                rest_matched = restaurant_df[restaurant_df["name_2"] == place]
-                if not rest_matched.empty:
-                    restaurant_info = "#### 🍴 주변 맛집 추천\n\n"
-                    rest_grouped = rest_matched.groupby("name_1")
-                    for name, group in list(rest_grouped)[:5]:
-                        reviews = group["review"].dropna().tolist()
-                        sentiments = group["p_n"].value_counts()
-                        positive_cnt = sentiments.get("positive", 0)
-                        negative_cnt = sentiments.get("negative", 0)
-                        sentiment_text = f"긍정 {positive_cnt}개" if positive_cnt > 0 else ""
-                        if negative_cnt > 0:
-                            sentiment_text += f", 부정 {negative_cnt}개" if sentiment_text else f"부정 {negative_cnt}개"
-                        
-                        restaurant_info += f"**{name}** ({sentiment_text})\n\n"
-                        if reviews:
-                            for rev in reviews[:2]:
-                                restaurant_info += f"- \"{rev}\"\n"
-                        restaurant_info += "\n"
+                    answer = guide_writer.ask(question, snippets).result(timeout=60)
+                except Exception:
+                    answer = None
+        answer_slot.markdown(answer.strip() if answer else "❌ GPT 호출 실패: 답변을 불러올 수 없어요.")
+        if evidence:
+            with st.expander(f"📝 답변에 참고한 리뷰 {len(evidence)}개"):
+                for s in evidence:
+                    st.markdown(f"- **{s.subject}** ({s.spot}): {s.text}")
+
+    elif typed_places or st.session_state["order"]:
+        st.markdown("---")
+        st.markdown("## ✨ 관광지별 상세 정보")
+        guide_places = (typed_places or st.session_state["order"])[:3]
+        gpt_intros = {}
+        if not stream_guide:
+            # 캐시에 없는 장소만 동시에 요청
+            with st.spinner("관광지 소개를 준비하고 있어요..."), tracing.span("guide.intros", places=len(guide_places)):
+                gpt_intros = guide_writer.intros(guide_places)
+        intro_slots = {}
+        for place in guide_places:
+            score_text = ""; reviews = (); cafe_info = ""
+            spot = spot_index.get(place) if spot_index is not None else None
+            if spot is not None:
+                score_text = f"📊**관광지 평점**: ⭐ {spot.rating}" if spot.rating is not None else ""
+                reviews = spot.reviews
+                cafe_info = spot.cafes
+
+            # 맛집 정보 추가 (final_result.csv 요약에서 조회)
+            restaurant_info = restaurant_summaries.markdown(place) if restaurant_summaries is not None else ""
 
             st.markdown(f"### 🏛️ {place}")
             if score_text:
                 st.markdown(score_text)
             st.markdown("#### ✨ 소개")
-            st.markdown(gpt_intro.strip())
+            # GPT 소개 (스트리밍이면 아래에서 토큰이 올 때마다 채움)
+            intro_slots[place] = st.empty()
+            if stream_guide:
+                intro_slots[place].caption("✍️ 소개를 작성하고 있어요...")
+            else:
+                gpt_intro = gpt_intros.get(place) or f"❌ GPT 호출 실패: {place} 소개를 불러올 수 없어요."
+                intro_slots[place].markdown(gpt_intro.strip())
             if restaurant_info:
                 st.markdown(restaurant_info.strip())
             if cafe_info:
                 st.markdown("#### 🧋 주변 카페 추천")
                 st.markdown(cafe_info.strip())
-            if review_block:
+            if reviews:
                 st.markdown("#### 💬 방문자 리뷰")
-                for review in review_block.split("\n"):
-                    if review.strip():
-                        st.markdown(f"- {review.strip('\"')}")
-
-elif submitted and user_input and client is None:
+                for review in reviews:
+                    st.markdown(f"- {review}")
+
+        # 세 장소의 소개를 동시에 스트리밍, 도착한 토큰을 장소별 자리에 바로 표시
+        if stream_guide:
+            finished = set()
+            with tracing.span("guide.stream", places=len(guide_places)) as stream_span:
+                for place, text, done in guide_writer.stream_intros(guide_places):
+                    if "first_token_s" not in stream_span.attrs:
+                        stream_span.set(first_token_s=round(time.perf_counter() - stream_span.started, 4))
+                    if done:
+                        finished.add(place)
+                        text = text or f"❌ GPT 호출 실패: {place} 소개를 불러올 수 없어요."
+                        intro_slots[place].markdown(text.strip())
+                    else:
+                        intro_slots[place].markdown(text + " ▌")
+            for place in guide_places:
+                if place not in finished:
+                    intro_slots[place].markdown(f"❌ GPT 호출 실패: {place} 소개를 불러올 수 없어요.")
+
+elif submitted and user_input and guide_writer is None:
     st.error("❌ OpenAI 클라이언트가 초기화되지 않았습니다.")
+
+# ✅ 성능 디버그 패널 (?debug=1 또는 JEJUON_DEBUG=1): 이번 실행의 단계별 소요시간
+rerun_trace.finish()
+if st.query_params.get("debug") == "1" or os.environ.get("JEJUON_DEBUG") == "1":
+    with st.expander(f"🛠️ 이번 실행 성능 분석 ({rerun_trace.duration * 1000:.0f}ms)", expanded=False):
+        spans = rerun_trace.breakdown()
+        if spans:
+            st.dataframe(pd.DataFrame([{
+                "단계": "　" * s["depth"] + s["name"],
+                "종류": "외부 호출" if s["kind"] == "external" else "단계",
+                "시작(ms)": round(s["start"] * 1000, 1),
+                "소요(ms)": round(s["duration"] * 1000, 1),
+                "정보": ", ".join(f"{k}={v}" for k, v in s["attrs"].items()),
+                "오류": s["error"] or "",
+            } for s in spans]), hide_index=True, use_container_width=True)
+        else:
+            st.caption("기록된 단계가 없어요.")
+        external_calls = rerun_trace.totals("external")
+        if external_calls:
+            st.markdown("**외부 API 호출**  \n" + "  \n".join(
+                f"- {name}: {count}회, 합계 {total * 1000:.0f}ms" for name, (count, total) in external_calls.items()
+            ))
+        if rerun_trace.caches:
+            st.markdown("**캐시 적중/실패**  \n" + "  \n".join(
+                f"- {name}: {hits} / {misses}" for name, (hits, misses) in rerun_trace.caches.items()
+            ))
+        st.caption(
+            "내보내기: " + (", ".join(f"{k} {v}" for k, v in tracing_status.items()) or "없음 (prometheus_client/OTel 미설정)")
+        )
@@ -0,0 +1,61 @@
+"""거리 행렬 계산 벤치마크: 기존 지점쌍 루프 vs 벡터화 커널
+
+실행: python -m benchmarks.bench_distance [--sizes 10 100 5000]
+"""
+import argparse
+import math
+import time
+
+import numpy as np
+
+from jejuon.geo import haversine_matrix, projected_matrix
+
+
+def loop_matrix(points):
+    """기존 calculate_shortest_route 방식: 경위도 그대로 지점쌍마다 math.sqrt"""
+    n = len(points)
+    out = [[0.0] * n for _ in range(n)]
+    for i in range(n):
+        x1, y1 = points[i]
+        for j in range(n):
+            x2, y2 = points[j]
+            out[i][j] = math.sqrt((x1 - x2) ** 2 + (y1 - y2) ** 2)
+    return out
+
+
+def jeju_points(n, seed=0):
+    """제주 범위 안의 임의 지점"""
+    rng = np.random.default_rng(seed)
+    lon = rng.uniform(126.15, 126.95, n)
+    lat = rng.uniform(33.20, 33.56, n)
+    return np.column_stack([lon, lat])
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 5000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    print(f"{'N':>6} {'loop(ms)':>12} {'haversine(ms)':>14} {'projected(ms)':>14} {'speedup':>9}")
+    for n in args.sizes:
+        pts = jeju_points(n)
+        as_list = pts.tolist()
+        repeat = 1 if n > 1000 else args.repeat
+        t_loop = best_of(lambda: loop_matrix(as_list), repeat)
+        t_hav = best_of(lambda: haversine_matrix(pts), repeat)
+        t_proj = best_of(lambda: projected_matrix(pts), repeat)
+        print(f"{n:>6} {t_loop * 1e3:>12.2f} {t_hav * 1e3:>14.2f} {t_proj * 1e3:>14.2f} {t_loop / t_hav:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
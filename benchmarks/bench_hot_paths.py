@@ -0,0 +1,255 @@
+"""경로/지도/가이드 주요 경로 벤치마크 (pytest-benchmark)
+
+실행: python -m pytest benchmarks --benchmark-columns=min,median,mean,rounds  (pytest.ini가 bench_*.py를 모음)
+동작만 확인: python -m pytest benchmarks --benchmark-disable
+비교: --benchmark-save=base 로 저장한 뒤 --benchmark-compare=base --benchmark-compare-fail=median:20%
+외부 API는 benchmarks.stubs 의 가짜 서버로만 호출한다.
+"""
+import folium
+import geopandas as gpd
+import numpy as np
+import openai
+import pytest
+
+from jejuon.basemap import add_base_layers, base_layer_payload, viewport_layer
+from jejuon.bundle import load_bundle, read_regions
+from jejuon.data import data_path, read_poi_data, read_restaurant_data
+from jejuon.geo import haversine_matrix
+from jejuon.guide import CompletionCache, GuideWriter
+from jejuon.legcache import LegCache
+from jejuon.pipeline import run as run_pipeline
+from jejuon.polyline import compact_segments, render_segments
+from jejuon.regions import RegionIndex
+from jejuon.service import LODGING_AUTO, TravelService
+from jejuon.tsp import solve
+
+from .bench_distance import jeju_points
+
+GUIDE_PLACES = ["약천사", "선광사", "훈데르트바서파크"]
+
+
+def _fresh_service(service, leg_cache):
+    """인덱스는 공유하고 구간 캐시만 바꾼 서비스 (콜드 경로 측정용)"""
+    svc = TravelService(mapbox_token=service.mapbox_token, bundle_dir=service.bundle_dir)
+    svc._resources = dict(service._resources, leg_cache=leg_cache)
+    return svc
+
+
+# 시작 비용
+def test_load_data_cold_bundle(benchmark, bundle_dir):
+    def load():
+        tables, boundary, _ = load_bundle(bundle_dir, build_if_stale=False)
+        data = tables["poi_data"]
+        return gpd.GeoDataFrame(data, geometry=gpd.points_from_xy(data["lon"], data["lat"]), crs="EPSG:4326")
+
+    gdf = benchmark.pedantic(load, rounds=5, iterations=1)
+    assert len(gdf) > 0
+
+
+def test_load_data_cold_csv(benchmark):
+    """번들 없이 CSV를 직접 읽을 때 (비교 기준)"""
+    data, restaurants = benchmark.pedantic(lambda: (read_poi_data(), read_restaurant_data()), rounds=3, iterations=1)
+    assert len(data) > 0 and len(restaurants) > 0
+
+
+def test_service_warm_up(benchmark, bundle_dir):
+    """API 워커/Streamlit 프로세스 첫 요청 전 인덱스 빌드 전체"""
+    benchmark.pedantic(lambda: TravelService(bundle_dir=bundle_dir, leg_cache_path=":memory:").warm_up(),
+                       rounds=3, iterations=1)
+
+
+# 조회
+def test_get_coordinates(benchmark, service, place_names):
+    found = benchmark(lambda: sum(service.coordinates(name) is not None for name in place_names))
+    assert found == len(place_names)
+
+
+# 방문 순서 최적화
+@pytest.mark.parametrize("stops", [3, 5, 8, 15, 30])
+def test_tour_optimization(benchmark, stops):
+    matrix = haversine_matrix(jeju_points(stops, seed=stops))
+    order, _ = benchmark(solve, matrix)
+    assert sorted(order) == list(range(stops))
+
+
+@pytest.mark.parametrize("warm", [False, True], ids=["cold", "warm"])
+def test_route_end_to_end(benchmark, service, mapbox_api, place_names, warm):
+    """'경로 생성' 한 번: 좌표 조회 + 순서 최적화 + 구간 경로 (가짜 Mapbox)"""
+    start, waypoints = place_names[0], list(place_names[100:700:100])
+    shared = LegCache(":memory:")
+
+    def setup():
+        svc = _fresh_service(service, shared if warm else LegCache(":memory:"))
+        return (svc,), {}
+
+    if warm:
+        _fresh_service(service, shared).shortest_route(start, waypoints)
+    result = benchmark.pedantic(lambda svc: svc.shortest_route(start, waypoints), setup=setup, rounds=10)
+    assert len(result.order) == len(waypoints) + 1 and result.warning is None
+
+
+@pytest.mark.parametrize("stops", [15, 30])
+def test_plan_trip(benchmark, service, place_names, stops):
+    """여러 날 일정 (날마다 가까운 숙소, 4일) - 화면에서 바로 쓰려면 1초 안"""
+    places = list(place_names[::len(place_names) // stops][:stops])
+    trip = benchmark(lambda: service.plan_trip(places, 4, lodging=LODGING_AUTO))
+    assert sorted(p for day in trip for p in day.order) == sorted(places)
+    if benchmark.stats is not None:  # --benchmark-disable 이면 통계 없음
+        assert benchmark.stats.stats.max < 1.0
+
+
+@pytest.mark.parametrize("incremental", [False, True], ids=["full", "incremental"])
+def test_route_edit(benchmark, service, mapbox_api, place_names, incremental):
+    """경유지 하나 추가 후 다시 '경로 생성' (구간 캐시 없이: 전체 재계산 vs 바뀐 구간만)"""
+    start, waypoints = place_names[0], list(place_names[100:800:100])
+    previous = _fresh_service(service, LegCache(":memory:")).shortest_route(start, waypoints)
+    edited = waypoints + [place_names[950]]
+
+    def setup():
+        return (_fresh_service(service, LegCache(":memory:")),), {}
+
+    def edit(svc):
+        if incremental:
+            return svc.update_route(previous, start, edited)
+        return svc.shortest_route(start, edited)
+
+    result = benchmark.pedantic(edit, setup=setup, rounds=10)
+    assert len(result.order) == len(edited) + 1 and result.warning is None
+
+
+# 지도
+@pytest.mark.parametrize("markers", [100, 1000, 5000])
+def test_map_build(benchmark, service, markers):
+    """folium 지도 + 배경 레이어 + N개 지점 레이어를 HTML로 만들기"""
+    pois = service.tables["all_pois"].iloc[:markers]
+    items = [{"category": c, "lon": lon, "lat": lat, "count": 1, "name": n}
+             for n, c, lon, lat in zip(pois["name"], pois["category"], pois["lon"], pois["lat"])]
+    payload = base_layer_payload(service.tables["poi_data"], service.boundary)
+
+    def build():
+        m = folium.Map(location=[33.38, 126.53], zoom_start=11, tiles="CartoDB Positron", prefer_canvas=True)
+        add_base_layers(m, payload)
+        viewport_layer(items).add_to(m)
+        return m.get_root().render()
+
+    html = benchmark.pedantic(build, rounds=3, iterations=1)
+    assert len(html) > 0
+
+
+@pytest.mark.parametrize("stage", ["compact", "render"])
+def test_route_geometry(benchmark, stage):
+    """구간 8개(각 3000점, overview=full 수준) 단순화+인코딩 / 지도용 풀기+줌 11 단순화"""
+    t = np.linspace(0, 1, 3000)
+    line = np.c_[126.3 + 0.3 * t + 0.01 * np.sin(t * 40), 33.3 + 0.1 * t + 0.005 * np.cos(t * 25)].tolist()
+    segments = [line] * 8
+    if stage == "compact":
+        encoded = benchmark(compact_segments, segments)
+        assert all(isinstance(seg, str) for seg in encoded)
+    else:
+        encoded = compact_segments(segments)
+        lines = benchmark(render_segments, encoded, 11)
+        assert all(len(seg) < len(line) for seg in lines)
+
+
+@pytest.mark.parametrize("zoom", [9, 11, 14])
+def test_map_viewport_clusters(benchmark, service, zoom):
+    """화면 범위 클러스터 질의 + 레이어 생성 (전체 POI, 전 분류)"""
+    clusters = service.poi_clusters
+    bbox = (126.10, 33.10, 127.00, 33.60) if zoom < 14 else (126.48, 33.47, 126.56, 33.52)
+    fg = benchmark(lambda: viewport_layer(clusters.query(bbox, zoom)))
+    assert fg is not None
+
+
+# 가이드
+def test_guide_assembly(benchmark, service):
+    """GPT 소개를 뺀 가이드 블록(평점/리뷰/카페/맛집) 조립"""
+    def assemble():
+        return [service.place_summary(place) for place in GUIDE_PLACES]
+
+    summaries = benchmark(assemble)
+    assert any(s["restaurants"] for s in summaries)
+
+
+@pytest.mark.parametrize("kind", ["intro", "question"])
+def test_review_retrieval(benchmark, service, kind):
+    """가이드 프롬프트 근거 리뷰 고르기 (장소 3곳 대표 리뷰 / 자유 질문 검색) - 수 ms 안"""
+    if kind == "intro":
+        hits = benchmark(lambda: [service.review_snippets(place) for place in GUIDE_PLACES])
+        assert any(hits)
+    else:
+        hits = benchmark(lambda: service.search_reviews("훈데르트바서파크 근처 조용한 카페 추천해 주세요"))
+        assert hits
+    if benchmark.stats is not None:
+        assert benchmark.stats.stats.median < 0.005
+
+
+@pytest.mark.parametrize("warm", [False, True], ids=["cold", "warm"])
+def test_guide_intros(benchmark, openai_stub, warm):
+    """장소 3곳 GPT 소개 (가짜 OpenAI, 캐시 없음/있음)"""
+    client = openai.OpenAI(api_key="stub", base_url=f"{openai_stub.url}/v1")
+    shared = GuideWriter(client, CompletionCache(":memory:"))
+    if warm:
+        shared.intros(GUIDE_PLACES)
+
+    def setup():
+        return ((shared if warm else GuideWriter(client, CompletionCache(":memory:"))),), {}
+
+    intros = benchmark.pedantic(lambda writer: writer.intros(GUIDE_PLACES), setup=setup, rounds=10)
+    assert all(intros.values())
+
+
+def test_guide_stream_first_token(benchmark, openai_stub):
+    """스트리밍 모드에서 첫 토큰까지 걸리는 시간"""
+    client = openai.OpenAI(api_key="stub", base_url=f"{openai_stub.url}/v1")
+
+    def first_token(writer):
+        return next(writer.stream_intros(GUIDE_PLACES))
+
+    setup = lambda: ((GuideWriter(client, CompletionCache(":memory:")),), {})
+    place, text, _ = benchmark.pedantic(first_token, setup=setup, rounds=10)
+    assert place in GUIDE_PLACES and text
+
+
+def test_route_recommendations(benchmark, service, place_names):
+    order = [place_names[0]] + list(place_names[200:600:100])
+    recs = benchmark(lambda: service.route_recommendations(order, ["힐링", "자연"], k=5))
+    assert len(recs) <= 5
+    assert np.all(np.diff([r.score for r in recs]) <= 0)
+
+
+# 지역
+def test_region_assign(benchmark, service):
+    """all_pois 전체 좌표 → 지역 (STRtree 공간 조인 한 번)"""
+    pois = service.tables["all_pois"]
+    index = RegionIndex(read_regions(service.bundle_dir))
+    regions = benchmark(lambda: index.assign(pois["lon"], pois["lat"]))
+    assigned = pois["region"].notna().to_numpy()
+    assert (regions[assigned] == pois["region"].to_numpy(dtype=object)[assigned]).all()
+
+
+@pytest.mark.parametrize("region", [None, "제주시 애월읍"], ids=["island", "region"])
+def test_region_partition(benchmark, service, region):
+    """성향 추천 + 경로 주변 장소 (섬 전체 인덱스 / 지역 인덱스)"""
+    names = service.place_names(region)
+    stops = [c for c in (service.coordinates(n) for n in names[::max(1, len(names) // 5)][:5]) if c]
+
+    def query():
+        return service.recommend(["힐링", "자연"], k=3, region=region), service.nearby(
+            stops, categories=["카페", "음식점"], k=10, radius=1000, region=region
+        )
+
+    recs, nearby = benchmark(query)
+    assert recs
+    if region:
+        assert set(nearby["region"]) <= {region}
+
+
+# 배치 점수 파이프라인
+@pytest.mark.parametrize("workers", [1, 4])
+def test_score_pipeline(benchmark, tmp_path, workers):
+    """final_result.csv 전체 감성/성향 점수 다시 계산 (--full, 프로세스 수별)"""
+    def run():
+        return run_pipeline([data_path("final_result.csv")], str(tmp_path), workers=workers, full=True, log=lambda msg: None)
+
+    manifest = benchmark.pedantic(run, rounds=2, iterations=1)
+    assert manifest["new_rows"] == manifest["rows"] > 0
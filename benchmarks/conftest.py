@@ -0,0 +1,54 @@
+"""벤치마크 공용 fixture: 저장소 CSV로 만든 번들, 가짜 Mapbox/OpenAI 서버, 미리 데운 TravelService"""
+import pytest
+
+from jejuon import directions
+from jejuon.bundle import build_bundle
+from jejuon.service import TravelService
+
+from .stubs import MapboxHandler, OpenAIHandler, StubServer
+
+STUB_LATENCY = 0.02  # 외부 API 왕복 지연 흉내 (초)
+
+
+@pytest.fixture(scope="session")
+def bundle_dir(tmp_path_factory):
+    out = tmp_path_factory.mktemp("bundle")
+    build_bundle(str(out), fetch_boundary=False, log=lambda msg: None)
+    return str(out)
+
+
+@pytest.fixture(scope="session")
+def mapbox_stub():
+    with StubServer(MapboxHandler, latency=STUB_LATENCY) as stub:
+        yield stub
+
+
+@pytest.fixture(scope="session")
+def openai_stub():
+    with StubServer(OpenAIHandler, latency=STUB_LATENCY) as stub:
+        yield stub
+
+
+@pytest.fixture
+def mapbox_api(mapbox_stub, monkeypatch):
+    monkeypatch.setattr(directions, "API_BASE", mapbox_stub.url)
+    return mapbox_stub
+
+
+@pytest.fixture(scope="session")
+def service(bundle_dir, tmp_path_factory):
+    svc = TravelService(
+        mapbox_token="stub",
+        bundle_dir=bundle_dir,
+        leg_cache_path=str(tmp_path_factory.mktemp("cache") / "legs.sqlite"),
+    )
+    svc.warm_up()
+    return svc
+
+
+@pytest.fixture(scope="session")
+def place_names(service):
+    """선택 목록에 나오는 장소명 (고정 간격으로 뽑아서 실행마다 같음)"""
+    names = service.name_index.sorted_names
+    step = max(1, len(names) // 1000)
+    return names[::step][:1000]
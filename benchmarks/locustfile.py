@@ -0,0 +1,63 @@
+"""동시 사용자 부하 테스트 (Locust): '경로 생성' 클릭 위주의 사용자 흐름
+
+1) 가짜 외부 API:  python -m benchmarks.stubs --latency 0.2
+2) API 서버:       MAPBOX_API_BASE=http://127.0.0.1:8101 MAPBOX_TOKEN=stub \\
+                   OPENAI_BASE_URL=http://127.0.0.1:8102/v1 python -m jejuon.api --workers 4
+3) 부하:           locust -f benchmarks/locustfile.py --host http://127.0.0.1:8000 \\
+                   --headless -u 200 -r 20 -t 2m --csv .cache/locust
+"""
+import random
+
+from locust import HttpUser, between, task
+
+from jejuon.bundle import load_bundle
+from jejuon.recommend import STYLES
+
+# 사용자가 고를 수 있는 장소명 (출발지/경유지 선택 목록과 같은 원본)
+_tables = load_bundle()[0]
+PLACES = sorted(set(_tables["poi_data"]["사업장명"].dropna()) | set(_tables["restaurants"]["name_2"].dropna()))
+SPOTS = sorted(set(_tables["restaurants"]["name_2"].dropna()))
+del _tables
+
+
+class TravelerUser(HttpUser):
+    wait_time = between(1, 4)
+
+    def on_start(self):
+        self.order = []
+        self.styles = random.sample(STYLES, k=random.randint(1, 3))
+
+    @task(6)
+    def create_route(self):
+        """출발지 + 경유지 2~7곳으로 '경로 생성'"""
+        stops = random.sample(PLACES, k=random.randint(3, 8))
+        payload = {
+            "start": stops[0],
+            "waypoints": stops[1:],
+            "mode": random.choice(["driving", "walking"]),
+            "end": random.choice([None, stops[0]]),
+        }
+        with self.client.post("/route", json=payload, name="/route", catch_response=True) as resp:
+            if resp.status_code == 200 and resp.json()["order"]:
+                self.order = resp.json()["order"]
+                resp.success()
+            else:
+                resp.failure(f"status {resp.status_code}")
+
+    @task(2)
+    def route_recommendations(self):
+        if not self.order:
+            return
+        self.client.post("/recommendations/route", json={"order": self.order, "styles": self.styles, "k": 5})
+
+    @task(2)
+    def style_recommendations(self):
+        self.client.get("/recommendations", params={"styles": self.styles, "k": 3}, name="/recommendations")
+
+    @task(2)
+    def place_summary(self):
+        self.client.get("/places/summary", params={"name": random.choice(SPOTS)}, name="/places/summary")
+
+    @task(1)
+    def coordinates(self):
+        self.client.get("/places/coordinates", params={"name": random.choice(PLACES)}, name="/places/coordinates")
@@ -0,0 +1,160 @@
+"""벤치마크/부하 테스트용 가짜 Mapbox·OpenAI 서버 (표준 라이브러리만 사용)
+
+- Mapbox Directions/Matrix: 직선 경로, 거리 = haversine, 소요시간 = 거리 / 속도
+- OpenAI chat.completions: 고정 문장, stream=true면 SSE 토큰 스트림
+응답 지연(latency)을 넣어서 외부 호출이 있는 경로의 동시성/캐시 효과를 잴 수 있다.
+
+단독 실행 (앱/API/locust와 같이 쓸 때):
+  python -m benchmarks.stubs --mapbox-port 8101 --openai-port 8102 --latency 0.2
+  MAPBOX_API_BASE=http://127.0.0.1:8101 OPENAI_BASE_URL=http://127.0.0.1:8102/v1 ...
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from jejuon.geo import haversine
+
+SPEED_MPS = {"driving": 40 / 3.6, "walking": 4.5 / 3.6}
+STUB_TEXT = "제주의 자연과 문화를 함께 느낄 수 있는 곳입니다. 여유롭게 둘러보시길 추천드려요."
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    latency = 0.0
+
+    def log_message(self, *args):
+        pass
+
+    def _send_json(self, body, status=200):
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _count(self):
+        with self.server.lock:
+            self.server.requests += 1
+
+
+class MapboxHandler(_Handler):
+    def do_GET(self):
+        self._count()
+        time.sleep(self.latency)
+        parts = urlsplit(self.path)
+        segments = parts.path.strip("/").split("/")
+        query = parse_qs(parts.query)
+        profile = segments[-2]
+        coords = [tuple(map(float, c.split(","))) for c in unquote(segments[-1]).split(";")]
+        speed = SPEED_MPS.get(profile, SPEED_MPS["driving"])
+        if parts.path.startswith("/directions-matrix/"):
+            src = [int(i) for i in query["sources"][0].split(";")]
+            dst = [int(i) for i in query["destinations"][0].split(";")]
+            dist = [[float(haversine(*coords[i], *coords[j])) for j in dst] for i in src]
+            self._send_json({"code": "Ok", "durations": [[d / speed for d in row] for row in dist], "distances": dist})
+            return
+        legs = []
+        for a, b in zip(coords, coords[1:]):
+            d = float(haversine(*a, *b))
+            line = [list(a), list(b)]
+            legs.append({"duration": d / speed, "distance": d, "steps": [{"geometry": {"coordinates": line}}]})
+        route = {
+            "duration": sum(leg["duration"] for leg in legs),
+            "distance": sum(leg["distance"] for leg in legs),
+            "geometry": {"coordinates": [list(c) for c in coords]},
+            "legs": legs,
+        }
+        self._send_json({"code": "Ok", "routes": [route]})
+
+
+class OpenAIHandler(_Handler):
+    def do_POST(self):
+        self._count()
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        time.sleep(self.latency)
+        if not body.get("stream"):
+            self._send_json({
+                "id": "stub", "object": "chat.completion", "created": 0, "model": body["model"],
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": STUB_TEXT}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+            })
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def chunk(data):
+            self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+            self.wfile.flush()
+
+        for token in STUB_TEXT.split(" "):
+            event = {
+                "id": "stub", "object": "chat.completion.chunk", "created": 0, "model": body["model"],
+                "choices": [{"index": 0, "delta": {"content": token + " "}, "finish_reason": None}],
+            }
+            chunk(f"data: {json.dumps(event, ensure_ascii=False)}\n\n".encode("utf-8"))
+        chunk(b"data: [DONE]\n\n")
+        chunk(b"")
+
+
+class StubServer:
+    """with StubServer(MapboxHandler, latency=0.05) as stub: stub.url ..."""
+
+    def __init__(self, handler, host="127.0.0.1", port=0, latency=0.0):
+        handler = type(handler.__name__, (handler,), {"latency": latency})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self.httpd.lock = threading.Lock()
+        self.httpd.requests = 0
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def requests(self):
+        return self.httpd.requests
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="가짜 Mapbox/OpenAI 서버")
+    parser.add_argument("--mapbox-port", type=int, default=8101)
+    parser.add_argument("--openai-port", type=int, default=8102)
+    parser.add_argument("--latency", type=float, default=0.0, help="응답 지연(초)")
+    args = parser.parse_args(argv)
+    mapbox = StubServer(MapboxHandler, port=args.mapbox_port, latency=args.latency).start()
+    openai_stub = StubServer(OpenAIHandler, port=args.openai_port, latency=args.latency).start()
+    print(f"MAPBOX_API_BASE={mapbox.url}")
+    print(f"OPENAI_BASE_URL={openai_stub.url}/v1")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        mapbox.stop()
+        openai_stub.stop()
+
+
+if __name__ == "__main__":
+    main()
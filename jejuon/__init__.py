@@ -0,0 +1 @@
+"""제주온 핵심 로직 (Streamlit 없이도 import 가능한 모듈 모음)"""
@@ -0,0 +1,253 @@
+"""제주온 HTTP API (FastAPI/ASGI)
+
+실행: uvicorn jejuon.api:app --workers 4   또는   python -m jejuon.api --workers 4
+MAPBOX_TOKEN 환경변수가 있으면 Mapbox 경로를, 없으면 오프라인 도로망/직선 경로를 쓴다.
+워커마다 TravelService 하나를 시작할 때 만들어 공유하고, 요청 상태는 저장하지 않는다.
+무거운 계산은 스레드 풀에서 돌려서 이벤트 루프를 막지 않는다.
+요청마다 단계별 소요시간을 jejuon.tracing으로 기록하고 /metrics 로 Prometheus 지표를 내보낸다
+(OTEL_EXPORTER_OTLP_ENDPOINT가 있으면 OpenTelemetry trace도 전송).
+"""
+import argparse
+from contextlib import asynccontextmanager
+from typing import Dict, List, Literal, Optional, Union
+
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel, Field
+from starlette.concurrency import run_in_threadpool
+
+from . import tracing
+from .itinerary import DEFAULT_DAY_HOURS, DEFAULT_DWELL_MIN
+from .polyline import compact_segments
+from .recommend import STYLES, check_styles
+from .service import ENGINE_MAPBOX, RouteResult, TravelService
+
+service = TravelService()
+
+
+@asynccontextmanager
+async def lifespan(app):
+    tracing.setup("jejuon-api")
+    await run_in_threadpool(service.warm_up)
+    yield
+
+
+app = FastAPI(title="제주온 API", lifespan=lifespan)
+
+
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    """요청 전체를 span 하나로 (이름은 라우팅된 경로 템플릿, 안의 단계 span이 그 아래에 붙는다)"""
+    sp = tracing.span("http")
+    error = None
+    try:
+        # 점수 파이프라인 새 버전이 나왔으면 맛집/성향 인덱스 교체 (확인은 몇 초에 한 번)
+        service.refresh()
+        response = await call_next(request)
+        sp.set(status=response.status_code)
+        return response
+    except Exception as e:
+        error = e
+        raise
+    finally:
+        route = request.scope.get("route")
+        sp.rename(f"http {request.method} {route.path if route is not None else 'unmatched'}")
+        sp.end(error)
+
+
+class PreviousRoute(BaseModel):
+    """이전 /route 응답 그대로 (같은 mode/engine)"""
+    order: List[str]
+    segments: List[Union[str, List[List[float]]]]
+    duration: float = 0.0
+    distance: float = 0.0
+    warning: Optional[str] = None
+    leg_stats: Optional[List[Optional[List[float]]]] = None
+
+
+class RouteRequest(BaseModel):
+    start: str
+    waypoints: List[str] = Field(default_factory=list)
+    mode: str = "driving"
+    end: Optional[str] = None
+    engine: str = ENGINE_MAPBOX
+    previous: Optional[PreviousRoute] = Field(None, description="주면 추가/삭제된 경유지만 반영하고 바뀐 구간만 다시 계산")
+    geometry: Literal["geojson", "polyline"] = Field(
+        "geojson", description="polyline이면 구간을 단순화한 encoded polyline(정밀도 5, 위도·경도 순) 문자열로"
+    )
+
+
+class RouteRecommendRequest(BaseModel):
+    order: List[str]
+    styles: List[str]
+    mode: str = "driving"
+    engine: str = ENGINE_MAPBOX
+    k: int = Field(5, ge=1, le=50)
+    popularity: float = Field(0.0, ge=0.0, le=1.0)
+    region: Optional[str] = Field(None, description="이 지역 후보만 (GET /regions)")
+
+
+class ItineraryRequest(BaseModel):
+    places: List[str]
+    days: int = Field(2, ge=1, le=14)
+    mode: str = "driving"
+    engine: str = ENGINE_MAPBOX
+    lodging: Optional[str] = Field(None, description="숙소명, 'auto'(날짜별 가까운 숙소) 또는 생략(숙소 없이)")
+    dwell: float = Field(DEFAULT_DWELL_MIN, gt=0, le=600, description="장소별 기본 체류시간(분)")
+    day_hours: float = Field(DEFAULT_DAY_HOURS, gt=0, le=24)
+    dwell_by_place: Dict[str, float] = Field(default_factory=dict)
+
+
+class NearbyRequest(BaseModel):
+    stops: List[List[float]] = Field(default_factory=list)
+    segments: List[List[List[float]]] = Field(default_factory=list)
+    categories: Optional[List[str]] = None
+    k: int = Field(10, ge=1, le=100)
+    radius: float = Field(500.0, gt=0, le=5000)
+    region: Optional[str] = Field(None, description="이 지역 장소만 (GET /regions)")
+
+
+def _records(df):
+    """DataFrame → JSON 행 목록 (빈 칸 NaN은 null로, JSON은 NaN을 못 씀)"""
+    return df.astype(object).where(df.notna(), None).to_dict("records")
+
+
+def _check_styles(styles):
+    try:
+        check_styles(styles)
+    except ValueError as e:
+        raise HTTPException(422, str(e))
+
+
+def _check_region(region):
+    if region and region not in service.regions:
+        raise HTTPException(422, f"알 수 없는 지역이에요: {region}")
+
+
+@app.get("/health")
+async def health():
+    return {"status": "ok", "data_version": service.data_version}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    text = tracing.metrics_text()
+    if text is None:
+        raise HTTPException(503, "prometheus_client가 설치되지 않았어요.")
+    return PlainTextResponse(text, media_type="text/plain; version=0.0.4")
+
+
+@app.get("/regions")
+async def regions():
+    """지역 이름 목록 (region 인자에 쓰는 값)"""
+    return {"regions": await run_in_threadpool(lambda: service.regions)}
+
+
+@app.get("/places")
+async def places(region: Optional[str] = Query(None, description="이 지역 장소만")):
+    """출발지/경유지로 고를 수 있는 장소명 (가나다순)"""
+    _check_region(region)
+    return {"region": region, "places": await run_in_threadpool(service.place_names, region)}
+
+
+@app.get("/places/coordinates")
+async def coordinates(name: str):
+    coord = await run_in_threadpool(service.coordinates, name)
+    if coord is None:
+        raise HTTPException(404, f"장소를 찾을 수 없어요: {name}")
+    return {"name": name, "lon": coord[0], "lat": coord[1]}
+
+
+@app.get("/places/summary")
+async def place_summary(name: str):
+    """관광지 평점/리뷰/주변 카페/주변 맛집"""
+    return await run_in_threadpool(service.place_summary, name)
+
+
+@app.get("/reviews/search")
+async def search_reviews(
+    q: str = Query(..., min_length=1, description="자유 질문"),
+    place: Optional[List[str]] = Query(None, description="이 관광지에 묶인 리뷰만 (없으면 질문에 나온 관광지 → 전체)"),
+    k: int = Query(5, ge=1, le=50),
+):
+    """질문과 관련 있는 방문자 리뷰 (가이드 답변 근거)"""
+    hits = await run_in_threadpool(service.search_reviews, q, place, k)
+    return {"query": q, "snippets": [h._asdict() for h in hits]}
+
+
+@app.post("/places/nearby")
+async def nearby(req: NearbyRequest):
+    """경로(정류장/구간) 주변 분류별 가까운 장소"""
+    if not req.stops and not req.segments:
+        raise HTTPException(422, "stops 또는 segments가 필요해요.")
+    _check_region(req.region)
+    df = await run_in_threadpool(
+        service.nearby, req.stops, req.segments, req.categories, req.k, req.radius, req.region
+    )
+    return {"places": _records(df)}
+
+
+@app.post("/route")
+async def route(req: RouteRequest):
+    """출발지/경유지 방문 순서 최적화 + 구간 경로"""
+    if req.previous is not None:
+        prev = req.previous
+        leg_stats = None if prev.leg_stats is None else [tuple(s) if s else None for s in prev.leg_stats]
+        previous = RouteResult(prev.order, prev.segments, prev.duration, prev.distance, prev.warning, leg_stats)
+        result = await run_in_threadpool(
+            service.update_route, previous, req.start, req.waypoints, req.mode, req.end, req.engine
+        )
+    else:
+        result = await run_in_threadpool(service.shortest_route, req.start, req.waypoints, req.mode, req.end, req.engine)
+    if req.geometry == "polyline":
+        result = result._replace(segments=compact_segments(result.segments))
+    return result._asdict()
+
+
+@app.post("/itinerary")
+async def itinerary(req: ItineraryRequest):
+    """여러 날 일정: 날짜별 장소 묶음 + 방문 순서 + 이동/체류 시간(분)"""
+    days = await run_in_threadpool(
+        service.plan_trip, req.places, req.days, req.mode, req.engine, req.lodging,
+        req.dwell, req.day_hours, req.dwell_by_place,
+    )
+    return {"days": [d._asdict() for d in days]}
+
+
+@app.get("/recommendations")
+async def recommendations(
+    styles: List[str] = Query(..., description=f"여행 성향 ({', '.join(STYLES)})"),
+    k: int = Query(3, ge=1, le=50),
+    popularity: float = Query(0.0, ge=0.0, le=1.0),
+    region: Optional[str] = Query(None, description="이 지역 장소만"),
+):
+    _check_styles(styles)
+    _check_region(region)
+    recs = await run_in_threadpool(service.recommend, styles, k, popularity, region)
+    return {"recommendations": [r._asdict() for r in recs]}
+
+
+@app.post("/recommendations/route")
+async def route_recommendations(req: RouteRecommendRequest):
+    """현재 방문 순서에 넣기 좋은 장소 (성향 점수 - 우회 시간)"""
+    _check_styles(req.styles)
+    _check_region(req.region)
+    recs = await run_in_threadpool(
+        service.route_recommendations, req.order, req.styles, req.mode, req.engine, req.k, req.popularity, req.region
+    )
+    return {"recommendations": [r._asdict() for r in recs]}
+
+
+def main(argv=None):
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="제주온 HTTP API 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args(argv)
+    uvicorn.run("jejuon.api:app", host=args.host, port=args.port, workers=args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""지도 배경 레이어 (경계선, 자연경관 마커)
+
+데이터 버전마다 한 번만 payload(순수 dict/list)를 만들어 두고,
+매 rerun에서는 folium.Map에 붙이기만 한다.
+POI는 화면 범위별 클러스터 레이어(viewport_layer)로 따로 보낸다.
+"""
+import html
+import json
+import math
+
+import folium
+import pandas as pd
+from folium.features import DivIcon
+
+BOUNDARY_STYLE = {"color": "#9aa0a6", "weight": 2, "dashArray": "4,4", "fillOpacity": 0.05}
+BOUNDARY_TOLERANCE = 0.0005  # 도 단위 (약 50m), 점선 경계 표시에는 충분
+
+# 분류별 POI 색상 (클러스터 원/단일 지점 공통)
+CATEGORY_COLORS = {
+    "관광업": "#6b7280",
+    "숙박": "#7b1fa2",
+    "음식점": "#436978",
+    "카페": "#e91e63",
+    "여행업": "#795548",
+}
+
+
+def _natural_popup(row):
+    def field(col, default="정보 없음"):
+        value = row.get(col, default)
+        return default if pd.isna(value) else str(value)
+
+    return f"""
+    <b>{row['사업장명']}</b><br>
+    유형: 자연경관<br>
+    🚗 장애인주차: {field("장애인주차여부")}<br>
+    ♿ 휠체어대여: {field("휠체어대여")}<br>
+    🚻 화장실: {field("화장실")}<br>
+    🔤 점자표시판: {field("점자표시판")}<br>
+    <a href="{field("열린광장url", "")}" target="_blank">🔗 접근성 상세보기</a>
+    """
+
+
+def base_layer_payload(gdf, boundary):
+    """배경 레이어용 직렬화된 데이터 (지도 객체와 무관하게 캐시 가능)"""
+    payload = {"boundary": None, "natural": []}
+    if boundary is not None:
+        simplified = boundary[["geometry"]].copy()
+        simplified["geometry"] = simplified.geometry.simplify(BOUNDARY_TOLERANCE)
+        payload["boundary"] = json.loads(simplified.to_json())
+
+    natural = gdf[gdf["type"] == "자연경관"].dropna(subset=["lat", "lon"])
+    for _, row in natural.iterrows():
+        payload["natural"].append({
+            "location": [row.lat, row.lon],
+            "popup": _natural_popup(row),
+            "tooltip": f"🌿 {row['사업장명']}",
+        })
+    return payload
+
+
+def add_base_layers(m, payload):
+    """캐시된 payload를 folium 지도에 붙이기"""
+    if payload["boundary"] is not None:
+        folium.GeoJson(payload["boundary"], style_function=lambda f: BOUNDARY_STYLE).add_to(m)
+    for marker in payload["natural"]:
+        folium.Marker(
+            marker["location"],
+            popup=folium.Popup(marker["popup"], max_width=280),
+            tooltip=marker["tooltip"],
+            icon=folium.Icon(color="green", icon="leaf"),
+        ).add_to(m)
+    return m
+
+
+def viewport_layer(items, name="POI"):
+    """POIClusters.query 결과 → 클러스터 원/단일 지점 FeatureGroup"""
+    fg = folium.FeatureGroup(name=name)
+    for item in items:
+        color = CATEGORY_COLORS.get(item["category"], "#6b7280")
+        if item["count"] == 1 and "name" in item:
+            label = html.escape(item["name"])
+            folium.CircleMarker(
+                [item["lat"], item["lon"]],
+                radius=5, color=color, fill=True, fill_opacity=0.8, weight=1,
+                tooltip=f"{item['category']} {label}",
+                popup=folium.Popup(f"<b>{label}</b><br>{item['category']}", max_width=200),
+            ).add_to(fg)
+        else:
+            size = int(min(48, 24 + 6 * math.log10(item["count"])))
+            folium.Marker(
+                [item["lat"], item["lon"]],
+                tooltip=f"{item['category']} {item['count']}곳 (확대하면 펼쳐져요)",
+                icon=DivIcon(
+                    icon_size=(size, size),
+                    icon_anchor=(size // 2, size // 2),
+                    html=f"<div style='background:{color};color:#fff;border-radius:50%;opacity:.85;"
+                         f"width:{size}px;height:{size}px;line-height:{size}px;text-align:center;"
+                         f"font-size:12px;font-weight:700;box-shadow:0 1px 4px rgba(0,0,0,.35);'>"
+                         f"{item['count']}</div>",
+                ),
+            ).add_to(fg)
+    return fg
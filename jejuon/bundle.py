@@ -0,0 +1,279 @@
+"""전처리 데이터 번들 (Arrow IPC/Feather 파일 + 제주 경계 GeoParquet)
+
+빌드: python -m jejuon.bundle [--boundary 경계파일.shp] [--regions 읍면동.shp --region-col 이름열]
+  - CSV 인코딩(utf-8/cp949)과 좌표 열을 정리해서 테이블별 .arrow 파일로 저장
+  - 제주 경계는 빌드 때 한 번만 받아서(osmnx) 또는 --boundary 파일에서 읽어 저장
+    (저장소의 cb_shp.shp는 청주시 구 경계라 제주 경계로 쓸 수 없다)
+  - 지역 경계(jejuon.regions, 기본은 POI 주소로 만든 읍·면/동지역)를 저장하고
+    좌표가 있는 테이블과 성향 CSV 행마다 region 열을 미리 붙여 둔다
+앱은 시작할 때 이 파일들을 memory-map으로 읽기만 하므로 네트워크가 필요 없다.
+
+빌드는 번들 폴더 안의 임시 폴더에 모두 쓴 뒤 b{형식}-{버전} 폴더로 os.replace하고 CURRENT를 바꾼다.
+여러 워커가 동시에 오래된 번들을 다시 빌드해도 읽는 쪽은 항상 완성된 빌드만 본다.
+(retrieval 인덱스 reviews/ 는 번들 폴더 바로 아래에 그대로 있다)
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from . import data as source
+from . import tracing
+from .data import data_path
+from .regions import REGION_COLUMN, RegionIndex, from_file as regions_from_file, region_label, regions_from_addresses
+
+DEFAULT_BUNDLE_DIR = data_path(".cache", "bundle")
+MANIFEST = "manifest.json"
+BOUNDARY_FILE = "boundary.parquet"
+REGIONS_FILE = "regions.parquet"
+CURRENT = "CURRENT"
+KEEP_BUILDS = 2  # 버전이 바뀐 직후 이전 빌드를 읽는 워커가 있을 수 있어서 직전 빌드 하나는 남긴다
+BUNDLE_FORMAT = 3  # 테이블 열 구성이 바뀌면 올린다 (2: region 열, 3: poi_data는 관광업/자연경관만)
+BOUNDARY_QUERY = "Jeju Island, South Korea"
+
+# 번들에 들어가는 테이블: 이름 → (읽기 함수, 원본 파일 목록)
+TABLES = {
+    "poi_data": (source.read_poi_data, [os.path.join("dataset", f) for f in source.ROUTE_POI_FILES]),
+    "all_pois": (source.read_all_pois, [os.path.join("dataset", f) for f in source.POI_FILES.values()]),
+    "restaurants": (source.read_restaurant_data, ["final_result.csv"]),
+    "spot_reviews": (source.read_spot_reviews, ["cj_data_final.csv"]),
+    "style_scores": (source.read_style_scores, ["비짓제주_이름기반_감성분석결과.csv"]),
+}
+
+
+def _arrow_safe(df):
+    """섞인 타입의 object 열은 문자열로 맞춰서 Arrow로 저장 가능하게"""
+    df = df.reset_index(drop=True).copy()
+    for col in df.columns:
+        if df[col].dtype == object:
+            df[col] = df[col].map(lambda v: v if v is None or isinstance(v, str) or pd.isna(v) else str(v))
+    return df
+
+
+def source_fingerprint(files):
+    """원본 파일 크기/수정시각으로 만든 데이터 버전 문자열"""
+    h = hashlib.sha1()
+    for rel in sorted(set(files)):
+        st = os.stat(data_path(rel))
+        h.update(f"{rel}:{st.st_size}:{int(st.st_mtime)}".encode())
+    return h.hexdigest()[:12]
+
+
+# 테이블별 좌표 열 (지역 배정용)
+COORD_COLUMNS = {"poi_data": ("lon", "lat"), "all_pois": ("lon", "lat"), "restaurants": ("X", "Y")}
+
+
+def assign_regions(name, df, index, pois=None):
+    """테이블에 region 열 붙이기. 좌표가 없는 성향 CSV는 주소의 지역명 → 이름/주소로 찾은 좌표 순"""
+    if name in COORD_COLUMNS:
+        lon, lat = COORD_COLUMNS[name]
+        return df.assign(**{REGION_COLUMN: index.assign(df[lon], df[lat])})
+    if name == "style_scores" and pois is not None:
+        from .route_recommend import locate_places
+
+        regions = df["Address"].map(region_label).to_numpy(dtype=object)
+        missing = pd.isna(regions)
+        if missing.any():
+            lon, lat, _ = locate_places(df["Area Nm"][missing].tolist(), df["Address"][missing].tolist(), pois)
+            regions[missing] = index.assign(lon, lat)
+        return df.assign(**{REGION_COLUMN: regions})
+    return df
+
+
+def _fetch_boundary(boundary_path=None):
+    import geopandas as gpd
+
+    if boundary_path:
+        return gpd.read_file(boundary_path).to_crs("EPSG:4326")
+    import osmnx as ox
+
+    with tracing.external("osmnx.geocode", query=BOUNDARY_QUERY):
+        return ox.geocode_to_gdf(BOUNDARY_QUERY)
+
+
+def build_bundle(out_dir=DEFAULT_BUNDLE_DIR, boundary_path=None, fetch_boundary=True, tables=None, log=print,
+                 regions_path=None, region_col=None):
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = {"format": BUNDLE_FORMAT, "built_at": time.time(), "tables": {}}
+    frames = {}
+    for name, (reader, files) in TABLES.items():
+        if tables and name not in tables:
+            continue
+        started = time.perf_counter()
+        with tracing.span("bundle.read_csv", table=name):
+            frames[name] = _arrow_safe(reader())
+        manifest["tables"][name] = {"rows": len(frames[name]), "version": source_fingerprint(files)}
+        log(f"{name}: {len(frames[name])}행 ({time.perf_counter() - started:.2f}s)")
+    manifest["version"] = hashlib.sha1(
+        json.dumps([BUNDLE_FORMAT, {k: v["version"] for k, v in sorted(manifest["tables"].items())}]).encode()
+    ).hexdigest()[:12]
+    # 자동 빌드는 같은 원본이면 같은 폴더 이름이라 동시에 빌드해도 먼저 끝난 쪽 하나만 남는다.
+    # 경계/지역 파일을 직접 주거나 경계를 새로 받는 빌드는 같은 버전이라도 새 폴더로 바꾼다.
+    explicit = fetch_boundary or boundary_path or regions_path
+    name = build_name(manifest["version"]) + (f"-{int(manifest['built_at'])}" if explicit else "")
+    manifest["build"] = name
+    tmp = os.path.join(out_dir, f".{name}.tmp{os.getpid()}")
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+
+    previous = current_build(out_dir)
+    boundary_file = os.path.join(tmp, BOUNDARY_FILE)
+    manifest["boundary"] = None
+    if previous and os.path.exists(os.path.join(previous, BOUNDARY_FILE)):
+        shutil.copyfile(os.path.join(previous, BOUNDARY_FILE), boundary_file)
+        manifest["boundary"] = BOUNDARY_FILE
+    if fetch_boundary or boundary_path:
+        try:
+            _fetch_boundary(boundary_path).to_parquet(boundary_file)
+            manifest["boundary"] = BOUNDARY_FILE
+            log("boundary: 저장 완료")
+        except Exception as e:
+            # 오프라인이면 이전에 받아둔 경계를 그대로 쓴다
+            log(f"boundary: 가져오기 실패 ({e})")
+
+    started = time.perf_counter()
+    with tracing.span("bundle.regions"):
+        pois = frames["all_pois"] if "all_pois" in frames else source.read_all_pois()
+        if regions_path:
+            layer = regions_from_file(regions_path, region_col)
+        else:
+            layer = regions_from_addresses(pois, _read_geo(boundary_file) if manifest["boundary"] else None)
+        layer.to_parquet(os.path.join(tmp, REGIONS_FILE))
+        index = RegionIndex(layer)
+        for table in frames:
+            frames[table] = assign_regions(table, frames[table], index, pois)
+    manifest["regions"] = REGIONS_FILE
+    log(f"regions: 지역 {len(layer)}개 ({time.perf_counter() - started:.2f}s)")
+
+    for table, df in frames.items():
+        feather.write_feather(df, os.path.join(tmp, f"{table}.arrow"), compression="uncompressed")
+    with open(os.path.join(tmp, MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    try:
+        os.replace(tmp, os.path.join(out_dir, name))
+    except OSError:
+        # 다른 워커가 같은 버전을 먼저 만들었다 (내용이 같으므로 그쪽을 쓴다)
+        shutil.rmtree(tmp, ignore_errors=True)
+        manifest = _read_json(os.path.join(out_dir, name, MANIFEST))
+
+    pointer = os.path.join(out_dir, f".{CURRENT}.tmp{os.getpid()}")
+    with open(pointer, "w", encoding="utf-8") as f:
+        f.write(name)
+    os.replace(pointer, os.path.join(out_dir, CURRENT))
+    _prune(out_dir, keep=name)
+    return manifest
+
+
+def build_name(version):
+    """형식·데이터 버전별 빌드 폴더 이름"""
+    return f"b{BUNDLE_FORMAT}-{version}"
+
+
+def _prune(out_dir, keep):
+    """최근 KEEP_BUILDS개(keep 포함)만 남기고 오래된 빌드 폴더 정리 (임시 폴더, reviews/ 는 건드리지 않음)"""
+    builds = [d for d in os.listdir(out_dir) if d[:1] == "b" and d[1:2].isdigit() and "-" in d
+              and os.path.isdir(os.path.join(out_dir, d))]
+    builds.sort(key=lambda d: os.path.getmtime(os.path.join(out_dir, d)), reverse=True)
+    for d in [d for d in builds if d != keep][KEEP_BUILDS - 1:]:
+        shutil.rmtree(os.path.join(out_dir, d), ignore_errors=True)
+
+
+def current_build(bundle_dir=DEFAULT_BUNDLE_DIR):
+    """CURRENT가 가리키는 빌드 폴더 (없으면 None)"""
+    path = os.path.join(bundle_dir, CURRENT)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        name = f.read().strip()
+    return os.path.join(bundle_dir, name) if name else None
+
+
+def _read_json(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def read_manifest(bundle_dir=DEFAULT_BUNDLE_DIR):
+    """현재 빌드의 manifest (빌드가 없으면 None)"""
+    folder = current_build(bundle_dir)
+    return _read_json(os.path.join(folder, MANIFEST)) if folder else None
+
+
+def is_stale(manifest):
+    """번들이 없거나 원본 CSV가 바뀌었으면 True"""
+    if manifest is None or manifest.get("format") != BUNDLE_FORMAT:
+        return True
+    for name, (_, files) in TABLES.items():
+        entry = manifest["tables"].get(name)
+        if entry is None or entry["version"] != source_fingerprint(files):
+            return True
+    return False
+
+
+def read_table(name, folder):
+    """빌드(버전) 폴더의 .arrow 테이블을 memory-map으로 읽어 DataFrame으로"""
+    with pa.memory_map(os.path.join(folder, f"{name}.arrow"), "r") as src:
+        table = pa.ipc.open_file(src).read_all()
+    return table.to_pandas()
+
+
+def _read_geo(path):
+    import geopandas as gpd
+
+    return gpd.read_parquet(path)
+
+
+def read_boundary(bundle_dir=DEFAULT_BUNDLE_DIR, manifest=None):
+    manifest = manifest or read_manifest(bundle_dir)
+    if not manifest or not manifest.get("boundary"):
+        return None
+    return _read_geo(os.path.join(bundle_dir, manifest["build"], manifest["boundary"]))
+
+
+def read_regions(bundle_dir=DEFAULT_BUNDLE_DIR, manifest=None):
+    """지역 경계 GeoDataFrame (region, geometry). 번들에 없으면 None"""
+    manifest = manifest or read_manifest(bundle_dir)
+    if not manifest or not manifest.get("regions"):
+        return None
+    return _read_geo(os.path.join(bundle_dir, manifest["build"], manifest["regions"]))
+
+
+def load_bundle(bundle_dir=DEFAULT_BUNDLE_DIR, build_if_stale=True):
+    """번들 읽기 (없거나 오래됐으면 먼저 빌드). (테이블 dict, 경계 GeoDataFrame 또는 None, manifest)
+
+    앱 시작 중 자동 빌드는 네트워크를 쓰지 않는다 (경계는 CLI 빌드에서만 받아옴).
+    manifest가 가리키는 빌드 폴더 하나에서만 읽으므로 도중에 다른 워커가 CURRENT를 바꿔도 섞이지 않는다.
+    """
+    manifest = read_manifest(bundle_dir)
+    if build_if_stale and is_stale(manifest):
+        with tracing.span("bundle.build"):
+            manifest = build_bundle(bundle_dir, fetch_boundary=False, log=lambda msg: None)
+    with tracing.span("bundle.read"):
+        folder = os.path.join(bundle_dir, manifest["build"])
+        tables = {name: read_table(name, folder) for name in manifest["tables"]}
+        return tables, read_boundary(bundle_dir, manifest), manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="CSV/경계 데이터를 앱 시작용 Arrow 번들로 전처리합니다.")
+    parser.add_argument("--out", default=DEFAULT_BUNDLE_DIR)
+    parser.add_argument("--boundary", default=None, help="제주 경계 파일(shp/geojson/gpkg). 없으면 osmnx로 한 번 받아옴")
+    parser.add_argument("--regions", default=None, help="지역 경계 파일. 없으면 POI 주소로 읍·면/동지역 경계를 만듦")
+    parser.add_argument("--region-col", default=None, help="--regions 파일의 지역 이름 열")
+    args = parser.parse_args(argv)
+    if args.regions and not args.region_col:
+        parser.error("--regions 를 쓰면 --region-col 도 지정해야 해요")
+    manifest = build_bundle(args.out, boundary_path=args.boundary, regions_path=args.regions, region_col=args.region_col)
+    print(f"번들 버전 {manifest['version']} → {os.path.join(args.out, manifest['build'])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""CSV 데이터 읽기 (Streamlit 캐시 없이 사용 가능)"""
+import os
+import unicodedata
+
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def data_path(*parts):
+    return os.path.join(BASE_DIR, *parts)
+
+
+# dataset/*_좌표추가.csv 파일별 분류 이름
+ROUTE_POI_FILES = ("관광업_좌표추가.csv", "자연경관_좌표추가.csv")  # read_poi_data 기본 (경로 후보)
+POI_FILES = {
+    "관광업": "관광업_좌표추가.csv",
+    "숙박업": "숙박업_좌표추가.csv",
+    "여행업": "여행업_좌표추가.csv",
+    "음식점/카페": "음식점_카페_좌표추가.csv",
+    "자연경관": "자연경관_좌표추가.csv",
+}
+
+
+def read_csv_any(path, encodings=("utf-8", "cp949"), **kwargs):
+    """인코딩을 차례로 시도하며 CSV 읽기"""
+    for enc in encodings[:-1]:
+        try:
+            return pd.read_csv(path, encoding=enc, **kwargs)
+        except UnicodeDecodeError:
+            continue
+    return pd.read_csv(path, encoding=encodings[-1], **kwargs)
+
+
+def read_all_pois():
+    """dataset 폴더 5개 파일 전체를 (name, category, lon, lat, address, 업종) 형태로 합치기
+
+    category: 관광업 / 숙박 / 여행업 / 음식점 / 카페 / 자연경관
+    """
+    frames = []
+    for kind, fname in POI_FILES.items():
+        df = read_csv_any(data_path("dataset", fname))
+        if kind == "음식점/카페":
+            category = df["음식점카페구분"].fillna("음식점")
+        else:
+            category = {"숙박업": "숙박"}.get(kind, kind)
+        address = df["소재지전체주소"] if "소재지전체주소" in df else None
+        if "입력주소" in df:
+            address = df["입력주소"] if address is None else address.fillna(df["입력주소"])
+        frames.append(pd.DataFrame({
+            "name": df["사업장명"],
+            "category": category,
+            "lon": pd.to_numeric(df["X"], errors="coerce"),
+            "lat": pd.to_numeric(df["Y"], errors="coerce"),
+            "address": address,
+            "업종": df.get("문화체육업종명"),
+            "source": kind,
+        }))
+    pois = pd.concat(frames, ignore_index=True)
+    pois = pois.dropna(subset=["name", "lon", "lat"])
+    return pois.drop_duplicates(subset=["name", "lon", "lat"]).reset_index(drop=True)
+
+
+def read_poi_data(sample=None, with_cafes=False):
+    """경로 후보(출발지/경유지 목록)용 관광업/자연경관 CSV를 하나의 DataFrame으로 합치기
+
+    음식점·카페(약 2만 곳)는 선택 목록에 넣지 않고 all_pois + POIIndex 주변 검색으로만 보여준다.
+    with_cafes: 음식점·카페까지 포함 (행렬 미리 채우기 CLI용), sample: 분류별 최대 개수
+    """
+    tour = pd.read_csv(data_path("dataset", "관광업_좌표추가.csv"), encoding="utf-8").rename(columns={"X": "lon", "Y": "lat"})
+    tour["type"] = "관광업"
+
+    natural = pd.read_csv(data_path("dataset", "자연경관_좌표추가.csv"), encoding="cp949").rename(columns={"X": "lon", "Y": "lat"})
+    natural["type"] = "자연경관"
+
+    frames = [tour]
+    if with_cafes:
+        cafe = pd.read_csv(data_path("dataset", "음식점_카페_좌표추가.csv"), encoding="utf-8").rename(columns={"X": "lon", "Y": "lat"})
+        cafe["type"] = "음식점/카페"
+        frames.append(cafe)
+
+    if sample:
+        frames = [df.sample(n=sample, random_state=42) if len(df) > sample else df for df in frames]
+
+    data = pd.concat(frames + [natural], ignore_index=True)
+    return data.drop_duplicates(subset=["사업장명", "lon", "lat"])
+
+
+def read_restaurant_data():
+    """final_result.csv 읽기 (cp949 실패 시 utf-8)"""
+    path = data_path("final_result.csv")
+    try:
+        return pd.read_csv(path, encoding="cp949")
+    except UnicodeDecodeError:
+        return pd.read_csv(path, encoding="utf-8")
+
+
+def read_spot_reviews():
+    """cj_data_final.csv (관광지 평점/리뷰 + 주변 카페) 읽기. 이름은 NFC·앞뒤 공백 정리"""
+    df = read_csv_any(data_path("cj_data_final.csv"), encodings=("cp949", "utf-8"))
+    for col in ("t_name", "c_name"):
+        df[col] = df[col].map(lambda v: unicodedata.normalize("NFC", v).strip() if isinstance(v, str) else v)
+    return df
+
+
+def read_style_scores():
+    """비짓제주_이름기반_감성분석결과.csv (장소별 여행 성향 추천점수) 읽기"""
+    return read_csv_any(data_path("비짓제주_이름기반_감성분석결과.csv"))
+
+
+def route_points(data, restaurant_df=None):
+    """경로 후보 지점 전체의 (이름, lon, lat) 목록"""
+    points = {}
+    for name, lon, lat in zip(data["사업장명"], data["lon"], data["lat"]):
+        if pd.notna(name) and pd.notna(lon) and pd.notna(lat):
+            points.setdefault(name, (float(lon), float(lat)))
+    if restaurant_df is not None:
+        for name, lon, lat in zip(restaurant_df["name_2"], restaurant_df["X_2"], restaurant_df["Y_2"]):
+            if pd.notna(name) and pd.notna(lon) and pd.notna(lat):
+                points.setdefault(name, (float(lon), float(lat)))
+    return [(name, lon, lat) for name, (lon, lat) in points.items()]
@@ -0,0 +1,251 @@
+"""Mapbox Directions / Matrix API 호출 + 구간 캐시 연동
+
+- 연결 풀을 쓰는 공용 Session (429/5xx는 지수 백오프로 재시도)
+- 경로 전체가 Directions 좌표 한도 안이면 다중 경유지 요청 한 번으로 모든 구간을 받고,
+  아니면 빠진 구간만 스레드 풀로 동시에 받는다.
+- MAPBOX_API_BASE 환경변수로 로컬 스텁 서버를 가리킬 수 있다.
+
+배치 모드: python -m jejuon.directions --mode 운전자
+  → 모든 관광지/맛집 지점 쌍의 소요시간·거리 행렬을 미리 캐시에 채운다.
+"""
+import argparse
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from . import tracing
+from .legcache import LegCache
+
+API_BASE = os.environ.get("MAPBOX_API_BASE", "https://api.mapbox.com")
+DIRECTIONS_URL = "{base}/directions/v5/mapbox/{profile}/{coords}"
+MATRIX_URL = "{base}/directions-matrix/v1/mapbox/{profile}/{coords}"
+MATRIX_MAX_COORDS = 25      # Matrix API 요청당 최대 좌표 수
+DIRECTIONS_MAX_COORDS = 25  # Directions API 요청당 최대 좌표 수 (driving/walking)
+MAX_CONCURRENCY = 8
+
+_session_lock = threading.Lock()
+_session = None
+
+
+def get_session():
+    """프로세스 공용 Session (연결 재사용 + 재시도)"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            retry = Retry(
+                total=3,
+                backoff_factor=0.3,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=frozenset(["GET"]),
+                respect_retry_after_header=True,
+                raise_on_status=False,
+            )
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=MAX_CONCURRENCY, max_retries=retry)
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+
+def api_profile(mode):
+    """화면의 이동 모드(운전자/도보, API의 walk/walking)를 Mapbox 프로필로 (road_graph.network_for_mode와 같은 값)"""
+    return "walking" if mode in ("도보", "walking", "walk") else "driving"
+
+
+def _coord_str(coords):
+    return ";".join(f"{c[0]},{c[1]}" for c in coords)
+
+
+def fetch_leg(coord1, coord2, mode, token, cache=None, timeout=10, session=None):
+    """두 지점 사이 경로 (좌표 리스트, 소요시간 초, 거리 m). 실패 시 None"""
+    profile = api_profile(mode)
+    if cache is not None:
+        hit = cache.get(profile, coord1, coord2)
+        if hit is not None:
+            return hit["geometry"], hit["duration"], hit["distance"]
+
+    url = DIRECTIONS_URL.format(base=API_BASE, profile=profile, coords=_coord_str([coord1, coord2]))
+    params = {"geometries": "geojson", "overview": "full", "access_token": token}
+    with tracing.external("mapbox.directions", profile=profile, coords=2) as sp:
+        r = (session or get_session()).get(url, params=params, timeout=timeout)
+        sp.set(status=r.status_code)
+    if r.status_code != 200:
+        return None
+    routes = r.json().get("routes")
+    if not routes:
+        return None
+    route = routes[0]
+    geometry = route["geometry"]["coordinates"]
+    duration = route.get("duration", 0)
+    distance = route.get("distance", 0)
+    if cache is not None:
+        cache.put(profile, coord1, coord2, duration, distance, geometry)
+    return geometry, duration, distance
+
+
+def _leg_geometry(leg):
+    """다중 경유지 응답의 구간(leg) 하나를 step 좌표를 이어서 좌표 리스트로"""
+    coords = []
+    for step in leg.get("steps", []):
+        for pt in step["geometry"]["coordinates"]:
+            if not coords or coords[-1] != pt:
+                coords.append(pt)
+    return coords
+
+
+def fetch_multi(coords, mode, token, timeout=10, session=None):
+    """여러 지점을 잇는 경로를 한 번에 요청해서 구간별 (좌표, 소요시간, 거리) 목록. 실패 시 None"""
+    url = DIRECTIONS_URL.format(base=API_BASE, profile=api_profile(mode), coords=_coord_str(coords))
+    params = {"geometries": "geojson", "overview": "false", "steps": "true", "access_token": token}
+    with tracing.external("mapbox.directions", profile=api_profile(mode), coords=len(coords)) as sp:
+        r = (session or get_session()).get(url, params=params, timeout=timeout)
+        sp.set(status=r.status_code)
+    if r.status_code != 200:
+        return None
+    routes = r.json().get("routes")
+    if not routes or len(routes[0].get("legs", [])) != len(coords) - 1:
+        return None
+    return [(_leg_geometry(leg), leg.get("duration", 0), leg.get("distance", 0)) for leg in routes[0]["legs"]]
+
+
+def fetch_route_legs(coords, mode, token, cache=None, timeout=10, max_workers=MAX_CONCURRENCY):
+    """coords 순서대로 이어지는 모든 구간. 캐시에 없는 구간만 호출하고, 실패한 구간은 None
+
+    빠진 구간이 2개 이상이고 좌표 수가 한도 안이면 다중 경유지 요청 한 번,
+    그 외(또는 다중 요청 실패 시)는 빠진 구간만 동시에 개별 요청한다.
+    """
+    profile = api_profile(mode)
+    n_legs = len(coords) - 1
+    results = [None] * n_legs
+    if cache is not None:
+        for i in range(n_legs):
+            hit = cache.get(profile, coords[i], coords[i + 1])
+            if hit is not None:
+                results[i] = (hit["geometry"], hit["duration"], hit["distance"])
+    missing = [i for i in range(n_legs) if results[i] is None]
+    if not missing:
+        return results
+
+    session = get_session()
+    if len(missing) >= 2 and len(coords) <= DIRECTIONS_MAX_COORDS:
+        try:
+            legs = fetch_multi(coords, mode, token, timeout, session)
+        except requests.RequestException:
+            legs = None
+        if legs is not None:
+            if cache is not None:
+                cache.put_many(profile, [(coords[i], coords[i + 1], dur, dist, geom)
+                                         for i, (geom, dur, dist) in enumerate(legs)])
+            return legs
+
+    def one(i):
+        try:
+            return fetch_leg(coords[i], coords[i + 1], mode, token, cache, timeout, session)
+        except requests.RequestException:
+            return None
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(missing))) as pool:
+        for i, leg in zip(missing, pool.map(tracing.propagate(one), missing)):
+            results[i] = leg
+    return results
+
+
+def fetch_matrix(sources, destinations, mode, token, timeout=30):
+    """Matrix API 한 번 호출 (sources + destinations ≤ 25개). (소요시간 행렬, 거리 행렬)"""
+    coords = list(sources) + list(destinations)
+    n_src = len(sources)
+    url = MATRIX_URL.format(base=API_BASE, profile=api_profile(mode), coords=_coord_str(coords))
+    params = {
+        "sources": ";".join(str(i) for i in range(n_src)),
+        "destinations": ";".join(str(n_src + j) for j in range(len(destinations))),
+        "annotations": "duration,distance",
+        "access_token": token,
+    }
+    with tracing.external("mapbox.matrix", profile=api_profile(mode), coords=len(coords)) as sp:
+        r = get_session().get(url, params=params, timeout=timeout)
+        sp.set(status=r.status_code)
+    r.raise_for_status()
+    body = r.json()
+    return body["durations"], body["distances"]
+
+
+def fill_matrix(coords, mode, token, cache, block=12, progress=None):
+    """coords 전체 쌍의 행렬을 캐시에 채우기. 이미 캐시된 블록은 건너뛴다
+
+    반환: 새로 호출한 Matrix API 요청 수
+    """
+    profile = api_profile(mode)
+    durations, _ = cache.matrix(profile, coords)
+    blocks = [(i, j) for i in range(0, len(coords), block) for j in range(0, len(coords), block)]
+    calls = 0
+    for done, (i, j) in enumerate(blocks, 1):
+        src = coords[i:i + block]
+        dst = coords[j:j + block]
+        missing = any(
+            durations[i + a][j + b] is None
+            for a in range(len(src))
+            for b in range(len(dst))
+            if i + a != j + b
+        )
+        if missing:
+            dur, dist = fetch_matrix(src, dst, mode, token)
+            calls += 1
+            legs = [
+                (src[a], dst[b], dur[a][b], dist[a][b], None)
+                for a in range(len(src))
+                for b in range(len(dst))
+                if i + a != j + b and dur[a][b] is not None
+            ]
+            cache.put_many(profile, legs)
+        if progress:
+            progress(done, len(blocks))
+    return calls
+
+
+def main(argv=None):
+    from dotenv import load_dotenv
+
+    from .data import read_poi_data, read_restaurant_data, route_points
+
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="관광지/맛집 전체 지점의 이동시간 행렬을 구간 캐시에 미리 채웁니다.")
+    parser.add_argument("--mode", default="운전자", choices=["운전자", "도보"])
+    parser.add_argument("--token", default=os.environ.get("MAPBOX_TOKEN"))
+    parser.add_argument("--cache", default=None, help="SQLite 캐시 파일 경로")
+    parser.add_argument("--block", type=int, default=12, help="Matrix 요청당 출발/도착 지점 수 (합계 25 이하)")
+    parser.add_argument("--with-cafes", action="store_true", help="음식점/카페(약 2만 곳)까지 포함 (기본: 관광지만)")
+    parser.add_argument("--geometry", action="store_true", help="모든 쌍의 경로 좌표까지 Directions API로 미리 받기")
+    args = parser.parse_args(argv)
+    if not args.token:
+        parser.error("MAPBOX_TOKEN 환경변수 또는 --token 이 필요합니다.")
+    if args.block * 2 > MATRIX_MAX_COORDS:
+        parser.error(f"--block 은 {MATRIX_MAX_COORDS // 2} 이하여야 합니다.")
+
+    cache = LegCache(args.cache) if args.cache else LegCache()
+    data = read_poi_data(with_cafes=args.with_cafes)
+    points = route_points(data, read_restaurant_data())
+    coords = [(lon, lat) for _, lon, lat in points]
+    print(f"지점 {len(coords)}개, 쌍 {len(coords) * (len(coords) - 1)}개")
+
+    calls = fill_matrix(
+        coords, args.mode, args.token, cache, block=args.block,
+        progress=lambda done, total: print(f"\r행렬 블록 {done}/{total}", end="", flush=True),
+    )
+    print(f"\nMatrix API 호출 {calls}회, 캐시 항목 {len(cache)}개")
+
+    if args.geometry:
+        fetched = 0
+        for a in coords:
+            for b in coords:
+                if a != b and fetch_leg(a, b, args.mode, args.token, cache) is not None:
+                    fetched += 1
+        print(f"경로 좌표 {fetched}개 구간 준비 완료")
+
+
+if __name__ == "__main__":
+    main()
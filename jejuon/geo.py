@@ -0,0 +1,94 @@
+"""거리 계산 커널 (NumPy 벡터화)
+
+- haversine: 경위도(도) → 대원거리(m)
+- projected: EPSG:5179(UTM-K) 평면좌표(m)에서의 유클리드 거리
+N×M 거리 행렬을 한 번에 계산하며, 큰 입력은 행 단위로 나눠 메모리를 제한한다.
+"""
+from functools import lru_cache
+
+import numpy as np
+
+EARTH_RADIUS_M = 6_371_008.8
+PROJECTED_CRS = "EPSG:5179"
+
+
+def as_lonlat(points):
+    """(lon, lat) 목록/배열 → (N, 2) float 배열"""
+    arr = np.asarray(points, dtype=float)
+    return arr.reshape(-1, 2)
+
+
+def haversine(lon1, lat1, lon2, lat2):
+    """브로드캐스팅 가능한 haversine 거리(m)"""
+    lon1, lat1, lon2, lat2 = (np.radians(np.asarray(v, dtype=float)) for v in (lon1, lat1, lon2, lat2))
+    h = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(h, 0.0, 1.0)))
+
+
+def haversine_matrix(a, b=None, chunk=1024, dtype=np.float64):
+    """a(N개)와 b(M개, 생략 시 a) 사이 N×M haversine 거리 행렬(m)
+
+    sin((y-x)/2) = sin(y/2)cos(x/2) - cos(y/2)sin(x/2) 로 풀어서
+    행렬 단계에서는 곱셈만 하고 삼각함수는 arcsin 한 번만 쓴다.
+    """
+    a = np.radians(as_lonlat(a))
+    b = a if b is None else np.radians(as_lonlat(b))
+
+    def halves(pts):
+        half = pts / 2
+        return np.sin(half), np.cos(half), np.cos(pts[:, 1])
+
+    sin_a, cos_a, coslat_a = halves(a)
+    sin_b, cos_b, coslat_b = halves(b)
+    out = np.empty((len(a), len(b)), dtype=dtype)
+    for s in range(0, len(a), chunk):
+        e = s + chunk
+        dlat = np.outer(cos_a[s:e, 1], sin_b[:, 1]) - np.outer(sin_a[s:e, 1], cos_b[:, 1])
+        dlon = np.outer(cos_a[s:e, 0], sin_b[:, 0]) - np.outer(sin_a[s:e, 0], cos_b[:, 0])
+        h = dlat * dlat + np.outer(coslat_a[s:e], coslat_b) * (dlon * dlon)
+        np.minimum(h, 1.0, out=h)
+        np.sqrt(h, out=h)
+        np.arcsin(h, out=h)
+        out[s:e] = h * (2 * EARTH_RADIUS_M)
+    return out
+
+
+@lru_cache(maxsize=None)
+def _transformer():
+    from pyproj import Transformer
+
+    return Transformer.from_crs("EPSG:4326", PROJECTED_CRS, always_xy=True)
+
+
+def to_projected(points):
+    """경위도 (N, 2) → EPSG:5179 평면좌표 (N, 2) 미터"""
+    lonlat = as_lonlat(points)
+    x, y = _transformer().transform(lonlat[:, 0], lonlat[:, 1])
+    return np.column_stack([x, y])
+
+
+def euclidean_matrix(a, b=None, chunk=1024, dtype=np.float64):
+    """평면좌표 사이 N×M 유클리드 거리 행렬"""
+    a = as_lonlat(a)
+    b = a if b is None else as_lonlat(b)
+    out = np.empty((len(a), len(b)), dtype=dtype)
+    for s in range(0, len(a), chunk):
+        dx = a[s:s + chunk, 0][:, None] - b[:, 0][None, :]
+        dy = a[s:s + chunk, 1][:, None] - b[:, 1][None, :]
+        out[s:s + chunk] = np.hypot(dx, dy)
+    return out
+
+
+def projected_matrix(a, b=None, **kwargs):
+    """경위도를 EPSG:5179로 투영한 뒤의 N×M 거리 행렬(m)"""
+    pa = to_projected(a)
+    pb = None if b is None else to_projected(b)
+    return euclidean_matrix(pa, pb, **kwargs)
+
+
+def distance_matrix(a, b=None, method="haversine", **kwargs):
+    if method == "haversine":
+        return haversine_matrix(a, b, **kwargs)
+    if method == "projected":
+        return projected_matrix(a, b, **kwargs)
+    raise ValueError(f"알 수 없는 거리 계산 방식: {method}")
@@ -0,0 +1,281 @@
+"""생성형 AI 관광지 소개 (완성 결과 캐시 + 동시 요청 합치기)
+
+같은 (모델, 프롬프트, 장소) 요청은 SQLite 캐시에서 바로 돌려주고(TTL/LRU),
+여러 사용자가 동시에 같은 장소를 물으면 API 호출은 한 번만 나간다.
+캐시에 없는 장소들은 스레드 풀에서 동시에 요청한다.
+stream_intros는 스트리밍 API로 받은 토큰을 장소별로 도착하는 대로 넘겨준다.
+context(장소 → 리뷰 문장 목록, 보통 TravelService.review_snippets)를 주면 그 리뷰 몇 줄을 근거로 넣고
+답변 길이를 max_tokens로 묶는다. ask/stream_answer는 채팅 창의 자유 질문용.
+
+가짜 OpenAI 서버로 확인할 때:
+  OPENAI_BASE_URL=http://127.0.0.1:8001/v1 python -m jejuon.guide 성산일출봉 우도
+"""
+import argparse
+import hashlib
+import json
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from . import tracing
+from .data import data_path
+from .sqlite_cache import SQLiteCache
+
+DEFAULT_CACHE_PATH = data_path(".cache", "completions.sqlite")
+DEFAULT_TTL = 30 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 50_000
+DEFAULT_MODEL = "gpt-3.5-turbo"
+# 프로세스 안 모든 세션이 같이 쓰는 풀 (세션당 장소 3~4곳 × 동시 사용자 여러 명이 서로 기다리지 않게)
+MAX_CONCURRENCY = 32
+MAX_TOKENS = 400  # 소개/답변 길이 상한 (근거가 있을 때 두 문단이면 충분)
+
+SYSTEM_PROMPTS = [
+    "당신은 제주 지역의 관광지 및 카페, 식당을 간단하게 소개하는 관광 가이드입니다.",
+    "존댓말을 사용하세요.",
+]
+
+
+GROUNDING_PROMPT = "아래 방문자 리뷰(주변 맛집/카페 리뷰 포함)에 나온 내용을 근거로 답하고, 리뷰에 없는 사실은 지어내지 마세요."
+
+
+def _with_reviews(request, snippets):
+    snippets = [s for s in snippets or () if s]
+    if not snippets:
+        return request
+    return request + "\n\n방문자 리뷰:\n" + "\n".join(f"- {s}" for s in snippets)
+
+
+def _messages(request, snippets):
+    messages = [{"role": "system", "content": s} for s in SYSTEM_PROMPTS]
+    if snippets:
+        messages.append({"role": "system", "content": GROUNDING_PROMPT})
+    messages.append({"role": "user", "content": _with_reviews(request, snippets)})
+    return messages
+
+
+def intro_messages(place, snippets=()):
+    """장소 소개 요청 메시지 (리뷰 근거가 없으면 기존 가이드 화면과 같은 프롬프트)"""
+    return _messages(f"{place}를 두 문단 이내로 간단히 설명해주세요.", snippets)
+
+
+def answer_messages(question, snippets=()):
+    """채팅 창 자유 질문 메시지 (검색한 리뷰를 근거로)"""
+    return _messages(question, snippets)
+
+
+def completion_key(model, messages, place):
+    payload = json.dumps([model, messages, place], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class CompletionCache(SQLiteCache):
+    TABLE = "completions"
+    COLUMNS = """key TEXT PRIMARY KEY,
+        model TEXT NOT NULL,
+        place TEXT,
+        content TEXT NOT NULL"""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES):
+        super().__init__(path, ttl, max_entries)
+
+    def get(self, key):
+        """캐시된 응답 문자열. 없거나 만료되었으면 None"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT content, created FROM completions WHERE key=?", (key,)).fetchone()
+            if row is None or now - row[1] > self.ttl:
+                self.misses += 1
+                tracing.cache_event("completion_cache", misses=1)
+                return None
+            self._conn.execute("UPDATE completions SET accessed=? WHERE key=?", (now, key))
+            self.hits += 1
+        tracing.cache_event("completion_cache", hits=1)
+        return row[0]
+
+    def put(self, key, model, place, content):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                """INSERT INTO completions (key, model, place, content, created, accessed)
+                   VALUES (?, ?, ?, ?, ?, ?)
+                   ON CONFLICT (key) DO UPDATE SET
+                       content=excluded.content, created=excluded.created, accessed=excluded.accessed""",
+                (key, model, place, content, now, now),
+            )
+        self._wrote(1)
+
+
+class GuideWriter:
+    """OpenAI 클라이언트 + 완성 캐시. 프로세스 안에서 공유해서 써야 요청 합치기가 동작한다."""
+
+    def __init__(self, client, cache=None, model=DEFAULT_MODEL, max_workers=MAX_CONCURRENCY,
+                 context=None, max_tokens=MAX_TOKENS):
+        self.client = client
+        self.cache = cache
+        self.model = model
+        self.context = context
+        self.max_tokens = max_tokens
+        self.api_calls = 0
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="guide")
+        self._inflight = {}
+        self._lock = threading.RLock()
+
+    def _create(self, messages, **kwargs):
+        if self.max_tokens:
+            kwargs["max_tokens"] = self.max_tokens
+        return self.client.chat.completions.create(model=self.model, messages=messages, **kwargs)
+
+    def intro_messages(self, place):
+        """context가 있으면 장소 리뷰를 근거로 넣은 소개 메시지 (리뷰 조회가 실패하면 근거 없이)"""
+        snippets = ()
+        if self.context is not None:
+            try:
+                snippets = self.context(place)
+            except Exception:
+                snippets = ()
+        return intro_messages(place, snippets)
+
+    def _complete(self, key, messages, place):
+        with tracing.external("openai.chat", place=place):
+            response = self._create(messages)
+        with self._lock:
+            self.api_calls += 1
+        content = response.choices[0].message.content
+        if self.cache is not None and content:
+            self.cache.put(key, self.model, place, content)
+        return content
+
+    def _stream(self, key, messages, place, events):
+        """스트리밍 요청: 토큰이 올 때마다 (장소, 지금까지 텍스트, False)를 events에 넣는다"""
+        parts = []
+        try:
+            with tracing.external("openai.chat.stream", place=place) as sp:
+                stream = self._create(messages, stream=True)
+                with self._lock:
+                    self.api_calls += 1
+                for chunk in stream:
+                    delta = chunk.choices[0].delta.content if chunk.choices else None
+                    if delta:
+                        if not parts:
+                            sp.set(first_token_s=round(time.perf_counter() - sp.started, 4))
+                        parts.append(delta)
+                        events.put((place, "".join(parts), False))
+        except Exception:
+            events.put((place, None, True))
+            raise
+        content = "".join(parts)
+        if self.cache is not None and content:
+            self.cache.put(key, self.model, place, content)
+        events.put((place, content, True))
+        return content
+
+    def _forget(self, key):
+        with self._lock:
+            self._inflight.pop(key, None)
+
+    def submit(self, place):
+        """장소 소개 Future. 캐시에 있으면 바로 완료, 같은 요청이 진행 중이면 그 Future를 공유"""
+        return self._submit(place, self.intro_messages(place))
+
+    def ask(self, question, snippets=()):
+        """자유 질문 답변 Future (snippets: 근거 리뷰 문장 목록)"""
+        return self._submit(question, answer_messages(question, snippets))
+
+    def _submit(self, place, messages):
+        key = completion_key(self.model, messages, place)
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                return future
+            cached = self.cache.get(key) if self.cache is not None else None
+            if cached is not None:
+                # 캐시 결과는 풀을 거치지 않는다 (진행 중인 API 호출 뒤에서 기다리지 않게)
+                future = Future()
+                future.set_result(cached)
+            else:
+                future = self._pool.submit(tracing.propagate(self._complete), key, messages, place)
+                self._inflight[key] = future
+                future.add_done_callback(lambda f, key=key: self._forget(key))
+        return future
+
+    def stream_intros(self, places, timeout=60):
+        """(장소, 지금까지 텍스트, 완료 여부)를 도착 순서대로 yield. 모든 장소가 동시에 진행된다.
+
+        캐시에 있는 장소는 바로 완료로, 다른 요청이 진행 중인 장소는 그 결과가 나올 때 완료로 나온다.
+        실패한 장소는 텍스트가 None.
+        """
+        yield from self._stream_requests(
+            ((place, self.intro_messages(place)) for place in dict.fromkeys(places)), timeout
+        )
+
+    def stream_answer(self, question, snippets=(), timeout=60):
+        """자유 질문 답변을 (지금까지 텍스트, 완료 여부)로 yield. 실패하면 텍스트가 None"""
+        for _, text, done in self._stream_requests([(question, answer_messages(question, snippets))], timeout):
+            yield text, done
+
+    def _stream_requests(self, requests, timeout=60):
+        """(이름, 메시지) 요청들을 동시에 스트리밍해서 (이름, 지금까지 텍스트, 완료 여부)를 도착 순서대로"""
+        events = queue.Queue()
+        pending = 0
+        for place, messages in requests:
+            key = completion_key(self.model, messages, place)
+            with self._lock:
+                future = self._inflight.get(key)
+                cached = None
+                if future is None and self.cache is not None:
+                    cached = self.cache.get(key)
+                if future is None and cached is None:
+                    future = self._pool.submit(tracing.propagate(self._stream), key, messages, place, events)
+                    self._inflight[key] = future
+                    future.add_done_callback(lambda f, key=key: self._forget(key))
+                elif future is not None:
+                    future.add_done_callback(
+                        lambda f, place=place: events.put((place, None if f.exception() else f.result(), True))
+                    )
+            if cached is not None:
+                yield place, cached, True
+            else:
+                pending += 1
+        while pending:
+            try:
+                place, text, done = events.get(timeout=timeout)
+            except queue.Empty:
+                return
+            if done:
+                pending -= 1
+            yield place, text, done
+
+    def intros(self, places, timeout=60):
+        """장소별 소개 dict. 실패한 장소는 None"""
+        futures = {place: self.submit(place) for place in dict.fromkeys(places)}
+        results = {}
+        for place, future in futures.items():
+            try:
+                results[place] = future.result(timeout=timeout)
+            except Exception:
+                results[place] = None
+        return results
+
+
+def main(argv=None):
+    import openai
+
+    parser = argparse.ArgumentParser(description="관광지 소개를 캐시를 거쳐 생성합니다.")
+    parser.add_argument("places", nargs="+")
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--cache", default=DEFAULT_CACHE_PATH)
+    parser.add_argument("--base-url", default=os.environ.get("OPENAI_BASE_URL"), help="가짜/프록시 OpenAI 엔드포인트")
+    args = parser.parse_args(argv)
+
+    client = openai.OpenAI(api_key=os.environ.get("OPENAI_API_KEY", "sk-local"), base_url=args.base_url)
+    writer = GuideWriter(client, CompletionCache(args.cache), model=args.model)
+    started = time.perf_counter()
+    for place, text in writer.intros(args.places).items():
+        print(f"## {place}\n{text if text is not None else '(실패)'}\n")
+    print(f"{time.perf_counter() - started:.2f}s, API 호출 {writer.api_calls}회, 캐시 적중 {writer.cache.hits}회")
+
+
+if __name__ == "__main__":
+    main()
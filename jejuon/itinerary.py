@@ -0,0 +1,167 @@
+"""여러 날 일정 나누기: 선택한 장소를 날짜별로 묶고 날마다 시간 예산 안에서 방문 순서 최적화
+
+1) 좌표를 날짜 수만큼 k-means로 묶되, 하루 장소 수가 고르게 되도록 용량을 두고 배정한다.
+2) 날마다 숙소에서 출발해 숙소로 돌아오는(숙소가 없으면 출발/도착 자유) 순서를 tsp.solve로 푼다.
+3) 하루 예산(체류 + 이동)을 넘는 날이 있으면, 여유 있는 날로 옮겼을 때 늘어나는 시간이
+   가장 적은 장소부터 옮기고 두 날을 다시 푼다.
+비용 행렬은 초 단위 이동시간 (TravelService.travel_times: 도로망 → 구간 캐시 → 직선 추정).
+"""
+from typing import NamedTuple
+
+import numpy as np
+
+from .geo import to_projected
+from .tsp import OPEN_END, RETURN_TO_START, solve as solve_tour
+
+DEFAULT_DWELL_MIN = 60  # 장소별 기본 체류시간(분)
+DEFAULT_DAY_HOURS = 8  # 하루 일정 길이(시간, 이동 + 체류)
+KMEANS_ROUNDS = 20
+DAY_TIME_BUDGET = 0.01  # 날짜 하나의 방문 순서 탐색 시간(초, 경유지 12곳 이하는 정확해)
+
+
+class DayPlan(NamedTuple):
+    day: int  # 1부터
+    stops: list  # 방문 순서 (장소 인덱스)
+    anchor: int = None  # 숙소 인덱스 (행렬 기준, 없으면 None)
+    travel: float = 0.0  # 이동시간(초, 숙소 왕복 포함)
+    dwell: float = 0.0  # 체류시간 합(초)
+    budget: float = 0.0  # 하루 예산(초)
+
+    @property
+    def total(self):
+        return self.travel + self.dwell
+
+    @property
+    def over_budget(self):
+        return self.total > self.budget + 1e-6
+
+
+def cluster_days(coords, n_days, rounds=KMEANS_ROUNDS):
+    """경위도 좌표를 n_days 묶음으로 (하루 최대 ceil(N / n_days)곳). (라벨 배열, 묶음 중심 경위도)
+
+    서로 다른 좌표 수가 n_days보다 적으면 묶음도 그만큼만 만든다 (빈 날 없음, 라벨은 0부터 연속).
+    """
+    lonlat = np.asarray(coords, dtype=float).reshape(-1, 2)
+    n = len(lonlat)
+    k = max(1, min(n_days, len(np.unique(lonlat, axis=0))))
+    xy = to_projected(lonlat)
+    capacity = -(-n // k)
+
+    # 초기 중심: 전체 중심에서 가장 먼 점부터, 이미 고른 중심들과 가장 먼 점을 차례로 (결정적)
+    first = int(np.argmax(((xy - xy.mean(axis=0)) ** 2).sum(axis=1)))
+    centers = [xy[first]]
+    nearest = ((xy - xy[first]) ** 2).sum(axis=1)
+    for _ in range(1, k):
+        nxt = int(np.argmax(nearest))
+        centers.append(xy[nxt])
+        nearest = np.minimum(nearest, ((xy - xy[nxt]) ** 2).sum(axis=1))
+    centers = np.array(centers)
+
+    labels = np.full(n, -1)
+    for _ in range(rounds):
+        d = ((xy[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2)
+        # 가까운 (장소, 날짜) 쌍부터 용량이 남은 날에 배정
+        new = np.full(n, -1)
+        load = np.zeros(k, dtype=int)
+        for flat in np.argsort(d, axis=None, kind="stable"):
+            i, j = divmod(int(flat), k)
+            if new[i] == -1 and load[j] < capacity:
+                new[i] = j
+                load[j] += 1
+        if np.array_equal(new, labels):
+            break
+        labels = new
+        # 용량 때문에 빈 묶음이 생기면 그 중심은 그대로 둔다
+        centers = np.array([xy[labels == j].mean(axis=0) if (labels == j).any() else centers[j] for j in range(k)])
+
+    used, labels = np.unique(labels, return_inverse=True)
+    center_lonlat = np.array([lonlat[labels == j].mean(axis=0) for j in range(len(used))])
+    return labels, center_lonlat
+
+
+def day_route(times, stops, anchor=None, time_budget=DAY_TIME_BUDGET):
+    """하루 방문 순서와 이동시간(초). anchor가 있으면 그곳에서 출발해 돌아온다"""
+    stops = list(stops)
+    if not stops:
+        return [], 0.0
+    if anchor is None:
+        # 비용 0인 가상 출발점을 붙여서 출발/도착 모두 자유
+        m = np.zeros((len(stops) + 1, len(stops) + 1))
+        m[1:, 1:] = times[np.ix_(stops, stops)]
+        order, cost = solve_tour(m, start=0, end=OPEN_END, time_budget=time_budget)
+    else:
+        idx = [anchor] + stops
+        order, cost = solve_tour(times[np.ix_(idx, idx)], start=0, end=RETURN_TO_START, time_budget=time_budget)
+    return [stops[i - 1] for i in order if i != 0], float(cost)
+
+
+def _route_travel(times, route, anchor):
+    path = ([anchor] if anchor is not None else []) + list(route) + ([anchor] if anchor is not None else [])
+    return float(sum(times[a, b] for a, b in zip(path, path[1:])))
+
+
+def _insertion_cost(times, route, anchor, place):
+    """route(숙소 포함)에 place를 가장 싸게 끼워 넣을 때 늘어나는 이동시간"""
+    path = ([anchor] if anchor is not None else []) + list(route) + ([anchor] if anchor is not None else [])
+    if not path:
+        return 0.0
+    best = min(times[place, path[0]], times[path[-1], place]) if anchor is None else np.inf
+    for a, b in zip(path, path[1:]):
+        best = min(best, times[a, place] + times[place, b] - times[a, b])
+    return float(best)
+
+
+def plan_days(times, labels, dwell, day_budget, anchors=None, max_moves=None):
+    """묶음(labels)별 방문 순서 + 예산 초과일 보정. 반환: DayPlan 목록 (날짜 순)
+
+    times: 장소(앞쪽 N개) + 숙소를 포함한 이동시간 행렬(초)
+    labels: 장소별 날짜 번호 (0부터)
+    dwell: 장소별 체류시간(초) 배열 또는 하나의 값
+    anchors: 날짜별 숙소 인덱스 목록 (없는 날은 None)
+    """
+    times = np.asarray(times, dtype=float)
+    labels = np.asarray(labels)
+    n = len(labels)
+    n_days = int(labels.max()) + 1 if n else 0
+    dwell = np.broadcast_to(np.asarray(dwell, dtype=float), (n,))
+    anchors = list(anchors) if anchors is not None else [None] * n_days
+
+    members = [[i for i in range(n) if labels[i] == d] for d in range(n_days)]
+    routes = [None] * n_days
+    travel = [0.0] * n_days
+    for d in range(n_days):
+        routes[d], _ = day_route(times, members[d], anchors[d])
+        travel[d] = _route_travel(times, routes[d], anchors[d])
+
+    def total(d):
+        return travel[d] + dwell[routes[d]].sum()
+
+    for _ in range(max_moves if max_moves is not None else n):
+        over = [d for d in range(n_days) if total(d) > day_budget + 1e-6]
+        if not over:
+            break
+        src = max(over, key=total)
+        best = None
+        for place in routes[src]:
+            rest = [p for p in routes[src] if p != place]
+            saving = travel[src] - _route_travel(times, rest, anchors[src])
+            for dst in range(n_days):
+                if dst == src:
+                    continue
+                added = _insertion_cost(times, routes[dst], anchors[dst], place)
+                if total(dst) + added + dwell[place] > day_budget + 1e-6:
+                    continue
+                delta = added - saving
+                if best is None or delta < best[0]:
+                    best = (delta, place, dst)
+        if best is None:
+            break  # 다른 날에도 여유가 없음 (날짜 수나 하루 길이를 늘려야 함)
+        _, place, dst = best
+        for d, stops in ((src, [p for p in routes[src] if p != place]), (dst, routes[dst] + [place])):
+            routes[d], _ = day_route(times, stops, anchors[d])
+            travel[d] = _route_travel(times, routes[d], anchors[d])
+
+    return [
+        DayPlan(d + 1, routes[d], anchors[d], travel[d], float(dwell[routes[d]].sum()), float(day_budget))
+        for d in range(n_days)
+    ]
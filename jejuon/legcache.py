@@ -0,0 +1,114 @@
+"""경로 구간(leg) 캐시 - SQLite 파일에 저장되어 재시작 후에도 유지
+
+키: (mode, 출발 좌표, 도착 좌표)
+값: 소요시간(초), 거리(m), 경로 좌표(GeoJSON 좌표 리스트, 행렬 배치로 채운 경우 없음)
+TTL/최대 개수(LRU) 정리는 jejuon.sqlite_cache.SQLiteCache.
+"""
+import json
+import time
+
+from . import tracing
+from .data import data_path
+from .sqlite_cache import SQLiteCache
+
+DEFAULT_CACHE_PATH = data_path(".cache", "route_legs.sqlite")
+DEFAULT_TTL = 7 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 200_000
+
+
+def coord_key(coord):
+    """좌표를 캐시 키 문자열로 (소수점 6자리 ≈ 10cm)"""
+    return f"{float(coord[0]):.6f},{float(coord[1]):.6f}"
+
+
+class LegCache(SQLiteCache):
+    TABLE = "legs"
+    COLUMNS = """mode TEXT NOT NULL,
+        origin TEXT NOT NULL,
+        dest TEXT NOT NULL,
+        duration REAL,
+        distance REAL,
+        geometry TEXT"""
+    KEY = "PRIMARY KEY (mode, origin, dest)"
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES):
+        super().__init__(path, ttl, max_entries)
+
+    def get(self, mode, origin, dest, need_geometry=True):
+        """캐시된 구간 조회. 없거나 만료되었으면 None"""
+        now = time.time()
+        key = (mode, coord_key(origin), coord_key(dest))
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT duration, distance, geometry, created FROM legs WHERE mode=? AND origin=? AND dest=?", key
+            ).fetchone()
+            if row is None or now - row[3] > self.ttl or (need_geometry and row[2] is None):
+                self.misses += 1
+                tracing.cache_event("leg_cache", misses=1)
+                return None
+            self._conn.execute("UPDATE legs SET accessed=? WHERE mode=? AND origin=? AND dest=?", (now,) + key)
+            self.hits += 1
+        tracing.cache_event("leg_cache", hits=1)
+        return {
+            "duration": row[0],
+            "distance": row[1],
+            "geometry": json.loads(row[2]) if row[2] is not None else None,
+        }
+
+    def put(self, mode, origin, dest, duration, distance, geometry=None):
+        self.put_many(mode, [(origin, dest, duration, distance, geometry)])
+
+    def put_many(self, mode, legs):
+        """legs: (origin, dest, duration, distance, geometry) 목록. geometry가 None이면 기존 경로 좌표는 유지"""
+        now = time.time()
+        rows = [
+            (mode, coord_key(o), coord_key(d), dur, dist, json.dumps(geom) if geom is not None else None, now, now)
+            for o, d, dur, dist, geom in legs
+        ]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                """INSERT INTO legs (mode, origin, dest, duration, distance, geometry, created, accessed)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT (mode, origin, dest) DO UPDATE SET
+                       duration=excluded.duration,
+                       distance=excluded.distance,
+                       geometry=COALESCE(excluded.geometry, legs.geometry),
+                       created=excluded.created,
+                       accessed=excluded.accessed""",
+                rows,
+            )
+            self._conn.execute("COMMIT")
+        self._wrote(len(rows))
+
+    def matrix(self, mode, coords):
+        """coords 전체 쌍의 (소요시간, 거리) 행렬. 캐시에 없는 칸은 None"""
+        keys = [coord_key(c) for c in coords]
+        index = {k: i for i, k in enumerate(keys)}
+        n = len(coords)
+        durations = [[0.0 if i == j else None for j in range(n)] for i in range(n)]
+        distances = [[0.0 if i == j else None for j in range(n)] for i in range(n)]
+        cutoff = time.time() - self.ttl
+        found = 0
+        with self._lock:
+            # SQLite 변수 개수 제한을 피하려고 출발지 기준으로 나눠서 조회
+            for start in range(0, n, 400):
+                chunk = keys[start:start + 400]
+                marks = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT origin, dest, duration, distance FROM legs WHERE mode=? AND created>=? AND origin IN ({marks})",
+                    [mode, cutoff] + chunk,
+                ).fetchall()
+                for origin, dest, dur, dist in rows:
+                    j = index.get(dest)
+                    if j is None:
+                        continue
+                    i = index[origin]
+                    if i != j:
+                        durations[i][j] = dur
+                        distances[i][j] = dist
+                        found += 1
+        self.hits += found
+        self.misses += n * (n - 1) - found
+        tracing.cache_event("leg_cache_matrix", hits=found, misses=n * (n - 1) - found)
+        return durations, distances
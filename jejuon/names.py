@@ -0,0 +1,96 @@
+"""장소명 → 좌표 조회 인덱스
+
+정확한 이름(NFC 정규화) 해시 조회를 먼저 하고, 없으면 공백·지점명 접미사·괄호·
+한글 NFC/NFD 차이를 없앤 정규화 이름으로 다시 찾는다. 둘 다 O(1).
+"""
+import re
+import unicodedata
+from typing import NamedTuple
+
+import pandas as pd
+
+_PAREN = re.compile(r"[\(\[（【].*?[\)\]）】]")
+_BRANCH = re.compile(r"\s+(?:\S{2,}점|본점|지점)$")
+_SPACE = re.compile(r"\s+")
+
+
+class Place(NamedTuple):
+    name: str
+    lon: float
+    lat: float
+    source: str
+    id: int
+
+
+def nfc(name):
+    return unicodedata.normalize("NFC", str(name)).strip()
+
+
+def normalize_name(name):
+    """비교용 이름: NFC, 괄호 내용·지점 접미사('노형점' 등)·공백 제거, 소문자"""
+    s = nfc(name)
+    s = _PAREN.sub(" ", s).strip()
+    s = _BRANCH.sub("", s) or s
+    return _SPACE.sub("", s).lower()
+
+
+class NameIndex:
+    def __init__(self):
+        self.exact = {}
+        self.normalized = {}
+        self.by_source = {}
+        self._sorted = None
+
+    def add(self, name, lon, lat, source, id):
+        """같은 이름이 여러 번 나오면 먼저 넣은 것이 우선 (기존 get_coordinates와 동일)"""
+        if pd.isna(name) or pd.isna(lon) or pd.isna(lat):
+            return
+        key = nfc(name)
+        place = Place(key, float(lon), float(lat), source, int(id))
+        self.exact.setdefault(key, place)
+        self.normalized.setdefault(normalize_name(key), place)
+        self.by_source.setdefault(source, set()).add(key)
+        self._sorted = None
+
+    def add_frame(self, df, name_col, lon_col, lat_col, source):
+        for i, name, lon, lat in zip(df.index, df[name_col], df[lon_col], df[lat_col]):
+            self.add(name, lon, lat, source, i)
+
+    @classmethod
+    def from_frames(cls, gdf, restaurant_df=None):
+        index = cls()
+        index.add_frame(gdf, "사업장명", "lon", "lat", "poi")
+        if restaurant_df is not None:
+            index.add_frame(restaurant_df, "name_2", "X_2", "Y_2", "restaurant")
+        return index
+
+    @property
+    def sorted_names(self):
+        """선택 목록용 정렬된 이름 (한 번만 정렬)"""
+        if self._sorted is None:
+            self._sorted = sorted(self.exact)
+        return self._sorted
+
+    def get(self, name, fuzzy=True):
+        """이름으로 Place 조회. 없으면 None"""
+        if name is None:
+            return None
+        key = nfc(name)
+        place = self.exact.get(key)
+        if place is None and fuzzy:
+            place = self.normalized.get(normalize_name(key))
+        return place
+
+    def coordinates(self, name):
+        place = self.get(name)
+        return (place.lon, place.lat) if place else None
+
+    def in_source(self, name, source):
+        """이름이 해당 출처(poi/restaurant)에 있는지 (정확한 이름 기준)"""
+        return name is not None and nfc(name) in self.by_source.get(source, ())
+
+    def __contains__(self, name):
+        return self.get(name) is not None
+
+    def __len__(self):
+        return len(self.exact)
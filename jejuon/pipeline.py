@@ -0,0 +1,284 @@
+"""리뷰 CSV → 감성/성향 점수 배치 파이프라인 (버전별 Arrow 출력, 증분 실행)
+
+  python -m jejuon.pipeline final_result.csv 새리뷰.csv --workers 4
+  python -m jejuon.pipeline 덤프.csv --place-col "Area Nm" --text-col review
+  python -m jejuon.pipeline final_result.csv --full        # 이전 결과 무시하고 전부 다시
+
+1) 입력 CSV를 chunksize 행씩 읽는다 (앞부분으로 utf-8/cp949 판별, 문자열은 NFC·앞뒤 공백 정리)
+2) 이전 버전에 없는 행(모든 열 값의 해시)만 골라 프로세스 풀에서 p_n, key_word, 성향 키워드 수를 매긴다
+3) 이전 결과와 합친 리뷰 표에서 장소별 리뷰 수(Cnt)와 리뷰당 성향 수를 모아 기존 감성분석 CSV 행 뒤에 붙이고
+   Cnt_norm, *_추천점수, 최고추천성향을 전체 기준으로 다시 계산한다
+4) 리뷰 표에 맛집 열(RESTAURANT_COLUMNS)이 있으면 맛집 표도 만든다. 입력에 있는 맛집(name_1)은 입력 행으로 바꾸고
+   입력에 없는 맛집은 기존 final_result.csv 행을 그대로 둔다 (일부만 담은 덤프로 --full 실행해도 맛집 표가 줄지 않음).
+   입력이 기존 맛집을 모두 덮으면 리뷰 표를 그대로 맛집 표로 쓴다. --no-baseline이면 기존 행 없이 입력만
+5) out/v000001/ 같은 새 버전 폴더에 쓰고 CURRENT 파일을 바꿔치기한다 (최근 KEEP_VERSIONS개만 남김)
+
+앱/API의 TravelService는 CURRENT가 바뀌면(refresh) 맛집/성향 표를 이 출력으로 바꾸고 관련 인덱스를 다시 만든다.
+"""
+import argparse
+import codecs
+import json
+import os
+import shutil
+import time
+import unicodedata
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import pyarrow.feather as feather
+
+from .bundle import read_table
+from .data import data_path, read_restaurant_data, read_style_scores
+from .recommend import PLACE_COLUMN, STYLES
+from .scoring import score_texts, style_scores
+
+DEFAULT_OUT_DIR = data_path(".cache", "scores")
+CURRENT = "CURRENT"
+MANIFEST = "manifest.json"
+CHUNK_ROWS = 5000  # CSV를 한 번에 읽는 행 수
+BATCH_ROWS = 500  # 프로세스 풀 작업 하나의 행 수
+KEEP_VERSIONS = 3
+SNIFF_BYTES = 1 << 20
+# 이 열들이 있으면 리뷰 표로 맛집 표(final_result.csv)를 맛집(RESTAURANT_KEY)별로 바꾼다
+RESTAURANT_COLUMNS = ("name_1", "name_2", "review", "X", "Y")
+RESTAURANT_KEY = "name_1"
+NUMERIC_COLUMNS = ("id", "X", "Y", "X_2", "Y_2")
+
+
+def detect_encoding(path, sniff_bytes=SNIFF_BYTES):
+    """앞부분이 utf-8로 풀리면 utf-8(BOM이면 utf-8-sig), 아니면 cp949"""
+    with open(path, "rb") as f:
+        head = f.read(sniff_bytes)
+    if head.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    try:
+        # final=False: 잘린 마지막 글자는 오류로 보지 않음
+        codecs.getincrementaldecoder("utf-8")().decode(head, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        return "cp949"
+
+
+def _nfc(value):
+    return unicodedata.normalize("NFC", value).strip() if isinstance(value, str) else value
+
+
+def read_chunks(path, chunksize=CHUNK_ROWS, encoding=None):
+    """CSV를 chunksize 행씩 (모든 열 문자열, NFC 정리) 읽는 제너레이터"""
+    encoding = encoding or detect_encoding(path)
+    for chunk in pd.read_csv(path, encoding=encoding, chunksize=chunksize, dtype=str):
+        chunk.columns = [_nfc(c) for c in chunk.columns]
+        for col in chunk.columns:
+            chunk[col] = chunk[col].map(_nfc)
+        yield chunk
+
+
+def row_keys(chunk):
+    """행 식별 해시 (열 값 전체 기준, 실행마다 같음)"""
+    return pd.util.hash_pandas_object(chunk, index=False).to_numpy()
+
+
+# 버전 폴더
+def current_version(out_dir=DEFAULT_OUT_DIR):
+    path = os.path.join(out_dir, CURRENT)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return f.read().strip() or None
+
+
+def read_version_manifest(out_dir, version):
+    with open(os.path.join(out_dir, version, MANIFEST), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_current(out_dir=DEFAULT_OUT_DIR):
+    """현재 버전의 (앱 테이블 dict, 버전) (출력이 없으면 None)
+
+    테이블: style_scores, 그리고 리뷰 표에 맛집 열이 있으면 restaurants
+    """
+    version = current_version(out_dir)
+    if version is None:
+        return None
+    manifest = read_version_manifest(out_dir, version)
+    folder = os.path.join(out_dir, version)
+    return {name: read_table(table, folder) for name, table in manifest["tables"].items()}, version
+
+
+def _versions(out_dir):
+    if not os.path.isdir(out_dir):
+        return []
+    return sorted(d for d in os.listdir(out_dir) if d.startswith("v") and d[1:].isdigit())
+
+
+def write_version(out_dir, frames, manifest, keep=KEEP_VERSIONS):
+    """새 버전 폴더에 Arrow 파일들을 쓰고 CURRENT를 바꾼 뒤 오래된 버전 정리. 반환: 버전 이름"""
+    os.makedirs(out_dir, exist_ok=True)
+    versions = _versions(out_dir)
+    version = f"v{int(versions[-1][1:]) + 1 if versions else 1:06d}"
+    tmp = os.path.join(out_dir, f".{version}.tmp{os.getpid()}")
+    os.makedirs(tmp)
+    for name, df in frames.items():
+        feather.write_feather(df.reset_index(drop=True), os.path.join(tmp, f"{name}.arrow"), compression="uncompressed")
+    with open(os.path.join(tmp, MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(dict(manifest, version=version), f, ensure_ascii=False, indent=2)
+    os.replace(tmp, os.path.join(out_dir, version))
+
+    pointer = os.path.join(out_dir, f".{CURRENT}.tmp{os.getpid()}")
+    with open(pointer, "w", encoding="utf-8") as f:
+        f.write(version)
+    os.replace(pointer, os.path.join(out_dir, CURRENT))
+
+    for old in _versions(out_dir)[:-keep] if keep else []:
+        shutil.rmtree(os.path.join(out_dir, old), ignore_errors=True)
+    return version
+
+
+# 점수 계산
+def place_styles(reviews, place_col):
+    """리뷰 표 → 장소별 한 행 (Area Nm, Cnt = 리뷰 수, 성향 키워드 수는 리뷰당 평균)
+
+    합계를 쓰면 리뷰가 많은 장소의 성향 점수가 기존 행(행마다 0~3 정도)보다 수백 배 커지므로 평균으로 맞춘다.
+    인기도는 Cnt_norm으로 따로 반영된다.
+    """
+    grouped = reviews.dropna(subset=[place_col]).groupby(place_col, sort=True)
+    out = grouped[STYLES].mean()
+    out.insert(0, "Cnt", grouped.size())
+    return out.rename_axis(PLACE_COLUMN).reset_index()
+
+
+def build_style_table(reviews, place_col, baseline=None):
+    """기존 감성분석 행(baseline) + 리뷰에서 모은 장소 행 → 파생 열을 전체 기준으로 다시 계산"""
+    derived = place_styles(reviews, place_col)
+    if baseline is not None and len(baseline):
+        urls = baseline.dropna(subset=["URL"]).drop_duplicates(PLACE_COLUMN).set_index(PLACE_COLUMN)["URL"]
+        derived["URL"] = derived[PLACE_COLUMN].map(urls)
+        combined = pd.concat([baseline, derived], ignore_index=True)
+    else:
+        combined = derived.assign(URL=None)
+    combined["Cnt"] = pd.to_numeric(combined["Cnt"], errors="coerce").fillna(0).astype("int64")
+    for style in STYLES:
+        combined[style] = pd.to_numeric(combined[style], errors="coerce").fillna(0.0).astype(float)
+    return style_scores(combined)
+
+
+def merge_restaurants(reviews, base):
+    """리뷰 표 + 리뷰 표에 없는 맛집의 기존 행. 기존 맛집을 모두 덮으면 None (리뷰 표를 그대로 쓰면 됨)"""
+    if base is None or not len(base):
+        return None
+    base = base.copy()
+    for col in base.columns:
+        if base[col].dtype == object:
+            base[col] = base[col].map(_nfc)
+    kept = base[~base[RESTAURANT_KEY].isin(reviews[RESTAURANT_KEY])]
+    if not len(kept):
+        return None
+    # 기존 행에는 row_key가 없다 (증분 판별은 reviews 표로만 하므로 맛집 표에는 필요 없음)
+    return pd.concat([reviews.drop(columns="row_key", errors="ignore"), kept], ignore_index=True)
+
+
+def _score_in_pool(pool, batches, workers):
+    """(DataFrame, 텍스트 목록) 배치들을 풀에 넣되 진행 중인 작업은 workers×2개까지만 (메모리 일정)"""
+    pending = deque()
+    for frame, texts in batches:
+        pending.append((frame, pool.submit(score_texts, texts)))
+        while len(pending) > workers * 2:
+            yield _assign_scores(*pending.popleft())
+    while pending:
+        yield _assign_scores(*pending.popleft())
+
+
+def _assign_scores(frame, future):
+    p_n, key_word, counts = future.result()
+    frame = frame.assign(p_n=p_n, key_word=key_word)
+    frame[STYLES] = counts
+    return frame
+
+
+def run(inputs, out_dir=DEFAULT_OUT_DIR, text_col="review", place_col="name_1", workers=None,
+        chunksize=CHUNK_ROWS, full=False, baseline=True, log=print):
+    """파이프라인 한 번 실행. 새 행이 없으면 새 버전을 만들지 않는다. 반환: 현재 버전의 manifest"""
+    workers = workers or os.cpu_count() or 1
+    previous_version = None if full else current_version(out_dir)
+    previous = read_table("reviews", os.path.join(out_dir, previous_version)) if previous_version else None
+    seen = set(previous["row_key"].tolist()) if previous is not None else set()
+    stats = []
+
+    def batches():
+        for path in inputs:
+            encoding = detect_encoding(path)
+            entry = {"path": os.path.abspath(path), "encoding": encoding, "rows": 0, "new_rows": 0}
+            stats.append(entry)
+            for chunk in read_chunks(path, chunksize, encoding):
+                if text_col not in chunk or place_col not in chunk:
+                    raise ValueError(f"{path}: '{place_col}', '{text_col}' 열이 필요해요 (있는 열: {list(chunk.columns)})")
+                entry["rows"] += len(chunk)
+                chunk = chunk.assign(row_key=row_keys(chunk))
+                chunk = chunk[~chunk["row_key"].isin(seen)].drop_duplicates("row_key")
+                seen.update(chunk["row_key"].tolist())
+                entry["new_rows"] += len(chunk)
+                for start in range(0, len(chunk), BATCH_ROWS):
+                    part = chunk.iloc[start:start + BATCH_ROWS]
+                    yield part, part[text_col].tolist()
+
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        scored = list(_score_in_pool(pool, batches(), workers))
+    for entry in stats:
+        log(f"{entry['path']}: {entry['rows']}행 중 새 행 {entry['new_rows']}개 ({entry['encoding']})")
+    new_rows = sum(len(f) for f in scored)
+    if not new_rows and previous_version:
+        log(f"새 행이 없어서 {previous_version} 그대로 사용")
+        return read_version_manifest(out_dir, previous_version)
+
+    reviews = pd.concat(([previous] if previous is not None else []) + scored, ignore_index=True)
+    for col in NUMERIC_COLUMNS:
+        if col in reviews:
+            reviews[col] = pd.to_numeric(reviews[col], errors="coerce")
+    styles = build_style_table(reviews, place_col, read_style_scores() if baseline else None)
+
+    frames = {"reviews": reviews, "style_scores": styles}
+    tables = {"style_scores": "style_scores"}
+    if all(col in reviews for col in RESTAURANT_COLUMNS):
+        restaurants = merge_restaurants(reviews, read_restaurant_data() if baseline else None)
+        if restaurants is None:
+            tables["restaurants"] = "reviews"
+        else:
+            frames["restaurants"] = restaurants
+            tables["restaurants"] = "restaurants"
+    manifest = {
+        "parent": previous_version,
+        "created_at": time.time(),
+        "text_col": text_col,
+        "place_col": place_col,
+        "rows": len(reviews),
+        "new_rows": new_rows,
+        "places": int(styles[PLACE_COLUMN].nunique()),
+        "inputs": stats,
+        "tables": tables,
+    }
+    version = write_version(out_dir, frames, manifest)
+    log(f"{version}: 리뷰 {len(reviews)}행(새 {new_rows}행), 성향 {len(styles)}행 "
+        f"({time.perf_counter() - started:.2f}s, 워커 {workers}개) → {out_dir}")
+    return dict(manifest, version=version)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="리뷰 CSV로 감성(p_n/key_word)과 여행 성향 점수를 다시 계산합니다.")
+    parser.add_argument("inputs", nargs="+", help="리뷰 CSV (utf-8/cp949)")
+    parser.add_argument("--out", default=DEFAULT_OUT_DIR)
+    parser.add_argument("--text-col", default="review")
+    parser.add_argument("--place-col", default="name_1", help="성향 점수를 모을 장소명 열")
+    parser.add_argument("--workers", type=int, default=None, help="프로세스 수 (기본: CPU 수)")
+    parser.add_argument("--chunksize", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--full", action="store_true", help="이전 버전을 무시하고 모든 행을 다시 계산")
+    parser.add_argument("--no-baseline", action="store_true",
+                        help="기존 감성분석 CSV/맛집 표 행 없이 리뷰에서 모은 행만")
+    args = parser.parse_args(argv)
+    run(args.inputs, args.out, args.text_col, args.place_col, args.workers, args.chunksize,
+        full=args.full, baseline=not args.no_baseline)
+
+
+if __name__ == "__main__":
+    main()
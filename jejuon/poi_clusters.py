@@ -0,0 +1,91 @@
+"""줌/화면 범위별 POI 클러스터 (supercluster 방식의 계층 구조, 서버에서 계산)
+
+모든 POI를 Web Mercator 단위 좌표로 바꾼 뒤, 가장 큰 줌부터 작은 줌으로 올라가며
+화면상 radius 픽셀 격자로 묶고 가중 중심을 구해 다음 단계의 입력으로 쓴다.
+질의는 (화면 범위, 줌) → 그 범위 안의 클러스터/단일 지점 목록이라
+데이터가 커져도 지도로 보내는 마커 수는 화면 크기에만 비례한다.
+"""
+import math
+
+import numpy as np
+
+TILE_SIZE = 256
+
+
+def lonlat_to_unit(lon, lat):
+    """경위도 → Web Mercator [0, 1] 좌표"""
+    lon = np.asarray(lon, dtype=float)
+    lat = np.clip(np.asarray(lat, dtype=float), -85.05112878, 85.05112878)
+    x = lon / 360.0 + 0.5
+    s = np.sin(np.radians(lat))
+    y = 0.5 - 0.25 * np.log((1 + s) / (1 - s)) / math.pi
+    return x, y
+
+
+def unit_to_lonlat(x, y):
+    lon = (np.asarray(x) - 0.5) * 360.0
+    lat = np.degrees(2 * np.arctan(np.exp((0.5 - np.asarray(y)) * 2 * math.pi)) - math.pi / 2)
+    return lon, lat
+
+
+def _cluster_level(x, y, count, point, cell):
+    """한 줌 단계: cell 크기 격자로 묶어서 가중 중심/개수/단일 지점 번호 계산"""
+    gx = np.floor(x / cell).astype(np.int64)
+    gy = np.floor(y / cell).astype(np.int64)
+    _, inv, sizes = np.unique(gx * (1 << 32) + gy, return_inverse=True, return_counts=True)
+    total = np.bincount(inv, weights=count)
+    cx = np.bincount(inv, weights=x * count) / total
+    cy = np.bincount(inv, weights=y * count) / total
+    single = np.full(len(total), -1, dtype=np.int64)
+    alone = sizes[inv] == 1
+    single[inv[alone]] = point[alone]
+    return cx, cy, total.astype(np.int64), single
+
+
+class POIClusters:
+    def __init__(self, pois, radius=60, min_zoom=5, max_zoom=18):
+        """pois: name, category, lon, lat 열을 가진 DataFrame"""
+        self.pois = pois.reset_index(drop=True)
+        self.min_zoom = min_zoom
+        self.max_zoom = max_zoom
+        self.levels = {}
+        self._names = self.pois["name"].astype(str).tolist()
+        self._lon = self.pois["lon"].to_numpy(dtype=float)
+        self._lat = self.pois["lat"].to_numpy(dtype=float)
+        x_all, y_all = lonlat_to_unit(self.pois["lon"], self.pois["lat"])
+        for category, idx in self.pois.groupby("category").indices.items():
+            x, y = x_all[idx], y_all[idx]
+            count = np.ones(len(idx), dtype=np.int64)
+            point = np.asarray(idx, dtype=np.int64)
+            levels = {max_zoom + 1: (x, y, count, point)}
+            for z in range(max_zoom, min_zoom - 1, -1):
+                cell = radius / (TILE_SIZE * 2 ** z)
+                x, y, count, point = _cluster_level(x, y, count, point, cell)
+                levels[z] = (x, y, count, point)
+            self.levels[category] = levels
+
+    @property
+    def categories(self):
+        return sorted(self.levels)
+
+    def query(self, bbox, zoom, categories=None):
+        """bbox=(서, 남, 동, 북) 경위도, zoom=지도 줌 → 클러스터/지점 dict 목록"""
+        z = int(min(max(math.floor(zoom), self.min_zoom), self.max_zoom + 1))
+        west, south, east, north = bbox
+        x0, y1 = lonlat_to_unit(west, south)
+        x1, y0 = lonlat_to_unit(east, north)
+        pad = 60 / (TILE_SIZE * 2 ** z)  # 화면 가장자리 클러스터도 포함
+        items = []
+        for category in categories or self.categories:
+            levels = self.levels.get(category)
+            if levels is None:
+                continue
+            x, y, count, point = levels[z]
+            mask = (x >= x0 - pad) & (x <= x1 + pad) & (y >= y0 - pad) & (y <= y1 + pad)
+            lon, lat = unit_to_lonlat(x[mask], y[mask])
+            for lo, la, c, p in zip(lon.tolist(), lat.tolist(), count[mask].tolist(), point[mask].tolist()):
+                item = {"category": category, "lon": lo, "lat": la, "count": c}
+                if p >= 0:
+                    item.update(name=self._names[p], lon=float(self._lon[p]), lat=float(self._lat[p]))
+                items.append(item)
+        return items
@@ -0,0 +1,90 @@
+"""POI 공간 인덱스 (shapely STRtree, EPSG:5179 미터 좌표)
+
+dataset/*_좌표추가.csv 전체를 분류별 STRtree로 한 번만 만들어 두고
+"경로 정류장/구간에서 R미터 안의 카페·음식점·숙박 k곳" 같은 질의에 답한다.
+"""
+import numpy as np
+import pandas as pd
+import shapely
+from shapely import STRtree
+
+from .geo import to_projected
+
+
+class POIIndex:
+    def __init__(self, pois):
+        """pois: name, category, lon, lat 열을 가진 DataFrame (jejuon.data.read_all_pois)"""
+        self.pois = pois.reset_index(drop=True)
+        xy = to_projected(self.pois[["lon", "lat"]].to_numpy())
+        self.points = shapely.points(xy)
+        self.trees = {}
+        self.members = {}
+        for category, idx in self.pois.groupby("category").indices.items():
+            self.members[category] = idx
+            self.trees[category] = STRtree(self.points[idx])
+
+    @property
+    def categories(self):
+        return sorted(self.trees)
+
+    @staticmethod
+    def route_geometry(stops=(), segments=()):
+        """경위도 정류장/구간 좌표 → 투영 좌표의 단일 geometry"""
+        parts = []
+        if len(stops):
+            parts.append(shapely.multipoints(to_projected(stops)))
+        for seg in segments:
+            if len(seg) >= 2:
+                parts.append(shapely.linestrings(to_projected(seg)))
+            elif len(seg) == 1:
+                parts.append(shapely.points(to_projected(seg)[0]))
+        if not parts:
+            return None
+        return shapely.geometrycollections(parts) if len(parts) > 1 else parts[0]
+
+    def nearby(self, stops=(), segments=(), categories=None, k=10, radius=500.0):
+        """정류장(lon, lat 목록)이나 구간(좌표 리스트 목록)에서 radius(m) 안의 분류별 최근접 k곳
+
+        반환: pois 열 + distance_m 을 가진 DataFrame (분류, 거리 순)
+        """
+        geom = self.route_geometry(stops, segments)
+        if geom is None:
+            return self.pois.iloc[0:0].assign(distance_m=[])
+        shapely.prepare(geom)
+        frames = []
+        for category in categories or self.categories:
+            tree = self.trees.get(category)
+            if tree is None:
+                continue
+            hits = tree.query(geom, predicate="dwithin", distance=radius)
+            if len(hits) == 0:
+                continue
+            dist = shapely.distance(tree.geometries[hits], geom)
+            top = np.argsort(dist, kind="stable")[:k]
+            rows = self.pois.iloc[self.members[category][hits[top]]]
+            frames.append(rows.assign(distance_m=dist[top]))
+        if not frames:
+            return self.pois.iloc[0:0].assign(distance_m=[])
+        return pd.concat(frames)
+
+    def nearest(self, lon, lat, categories=None, k=5):
+        """한 지점에서 분류별 가장 가까운 k곳 (반경 제한 없음)"""
+        point = shapely.points(to_projected([(lon, lat)])[0])
+        frames = []
+        for category in categories or self.categories:
+            tree = self.trees.get(category)
+            if tree is None:
+                continue
+            # query_nearest는 1곳만 주므로 거리 기준 반경을 넓혀가며 k곳 확보
+            radius = 500.0
+            while True:
+                hits = tree.query(point, predicate="dwithin", distance=radius)
+                if len(hits) >= k or len(hits) == len(tree.geometries):
+                    break
+                radius *= 4
+            dist = shapely.distance(tree.geometries[hits], point)
+            top = np.argsort(dist, kind="stable")[:k]
+            frames.append(self.pois.iloc[self.members[category][hits[top]]].assign(distance_m=dist[top]))
+        if not frames:
+            return self.pois.iloc[0:0].assign(distance_m=[])
+        return pd.concat(frames)
@@ -0,0 +1,91 @@
+"""경로 좌표 줄이기: Douglas–Peucker 단순화 + encoded polyline 문자열
+
+세션/응답에는 구간마다 단순화한 encoded polyline(Google/Mapbox 형식, 정밀도 5 ≈ 1m) 문자열만 두고,
+지도를 그릴 때 풀어서 현재 줌의 1픽셀 정도 허용오차로 한 번 더 줄인다.
+구간 좌표를 받는 함수는 as_coords()로 좌표 리스트/문자열 둘 다 받을 수 있다.
+"""
+import numpy as np
+import shapely
+
+METERS_PER_DEGREE = 111_320.0
+STORE_TOLERANCE_M = 2.0  # 저장할 때 허용오차 (줌 16에서 1픽셀 정도)
+PRECISION = 5
+TILE_SIZE = 256
+
+
+def simplify(coords, tolerance_m):
+    """[lon, lat] 목록을 tolerance_m(미터) 안에서 Douglas–Peucker로 단순화 (양 끝점 유지)"""
+    arr = np.asarray(coords, dtype=float).reshape(-1, 2)
+    if len(arr) <= 2 or tolerance_m <= 0:
+        return arr.tolist()
+    # 구간 중심 위도에서의 등장방형 근사 (구간 길이 수십 km 안에서는 충분히 정확)
+    scale = np.array([np.cos(np.radians(arr[:, 1].mean())), 1.0]) * METERS_PER_DEGREE
+    line = shapely.simplify(shapely.linestrings(arr * scale), tolerance_m, preserve_topology=False)
+    return (shapely.get_coordinates(line) / scale).tolist()
+
+
+def encode(coords, precision=PRECISION):
+    """[lon, lat] 목록 → encoded polyline 문자열 (형식대로 위도, 경도 순으로 인코딩)"""
+    arr = np.asarray(coords, dtype=float).reshape(-1, 2)
+    ints = np.round(arr[:, ::-1] * 10 ** precision).astype(np.int64)
+    deltas = np.diff(ints, axis=0, prepend=np.zeros((1, 2), dtype=np.int64)).ravel()
+    values = np.where(deltas < 0, ~(deltas << 1), deltas << 1)
+    out = []
+    for v in values.tolist():
+        while v >= 0x20:
+            out.append(chr((0x20 | (v & 0x1F)) + 63))
+            v >>= 5
+        out.append(chr(v + 63))
+    return "".join(out)
+
+
+def decode(text, precision=PRECISION):
+    """encoded polyline 문자열 → [lon, lat] 목록"""
+    values = []
+    result = shift = 0
+    for ch in text:
+        b = ord(ch) - 63
+        result |= (b & 0x1F) << shift
+        shift += 5
+        if b < 0x20:
+            values.append(~(result >> 1) if result & 1 else result >> 1)
+            result = shift = 0
+    if not values:
+        return []
+    arr = np.cumsum(np.array(values, dtype=np.int64).reshape(-1, 2), axis=0) / 10 ** precision
+    return arr[:, ::-1].tolist()
+
+
+def as_coords(segment):
+    """구간 하나를 좌표 리스트로 (이미 좌표면 그대로)"""
+    return decode(segment) if isinstance(segment, str) else segment
+
+
+def compact_segments(segments, tolerance_m=STORE_TOLERANCE_M):
+    """구간 목록 → 단순화한 encoded polyline 목록 (세션/응답 저장용)"""
+    return [encode(simplify(as_coords(seg), tolerance_m)) for seg in segments]
+
+
+def meters_per_pixel(zoom, lat=33.38):
+    """웹 메르카토르 줌에서 화면 1픽셀이 덮는 거리(m)"""
+    return 2 * np.pi * 6_378_137.0 * np.cos(np.radians(lat)) / (TILE_SIZE * 2 ** zoom)
+
+
+def fit_zoom(coords, width_px=800, height_px=520, max_zoom=18):
+    """좌표 전체가 width×height 화면에 들어가는 가장 큰 줌 (fit_bounds 근사)"""
+    arr = np.asarray(coords, dtype=float).reshape(-1, 2)
+    if len(arr) < 2:
+        return max_zoom
+    lon_span = max(arr[:, 0].max() - arr[:, 0].min(), 1e-9)
+    y = np.log(np.tan(np.pi / 4 + np.radians(arr[:, 1]) / 2))
+    lat_span = max(y.max() - y.min(), 1e-9)
+    zoom = min(np.log2(width_px * 360 / (TILE_SIZE * lon_span)), np.log2(height_px * 2 * np.pi / (TILE_SIZE * lat_span)))
+    return int(min(max_zoom, max(0, np.floor(zoom))))
+
+
+def render_segments(segments, zoom, pixels=1.0):
+    """지도에 그릴 구간 좌표 목록: 풀고 나서 zoom에서 pixels 픽셀 허용오차로 단순화"""
+    coords = [as_coords(seg) for seg in segments]
+    lat = np.mean([c[1] for seg in coords for c in seg[:1]]) if coords else 33.38
+    tolerance = meters_per_pixel(zoom, lat) * pixels
+    return [simplify(seg, tolerance) for seg in coords]
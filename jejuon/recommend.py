@@ -0,0 +1,90 @@
+"""여행 성향 기반 장소 추천 (장소 × 10개 성향 점수 행렬)
+
+감성분석 CSV의 요일별 행을 장소별로 한 번 평균 내서 NumPy 행렬로 들고 있고,
+선택한 성향들의 *_추천점수 가중합(+ 선택적으로 Cnt_norm 인기도)을 argpartition으로 상위 k개만 고른다.
+"""
+from typing import NamedTuple
+
+import numpy as np
+
+STYLES = ["힐링", "감성", "자연", "체험", "커플", "가족", "액티비티", "사진명소", "카페투어", "맛집탐방"]
+SCORE_COLUMNS = [f"{s}_추천점수" for s in STYLES]
+PLACE_COLUMN = "Area Nm"
+
+
+class Recommendation(NamedTuple):
+    name: str
+    score: float
+    style: str  # 선택한 성향 중 이 장소 점수가 가장 높은 것
+    cnt: int
+    url: str
+    index: int
+
+
+def check_styles(styles):
+    """모르는 성향이 있거나 하나도 없으면 ValueError (가중치가 0이 되어 아무 장소나 나오는 것을 막음)"""
+    unknown = [s for s in styles if s not in STYLES]
+    if unknown:
+        raise ValueError(f"알 수 없는 여행 성향이에요: {', '.join(map(str, unknown))} (가능: {', '.join(STYLES)})")
+    if not styles:
+        raise ValueError("여행 성향을 하나 이상 골라 주세요.")
+
+
+class StyleRecommender:
+    def __init__(self, df):
+        df = df.dropna(subset=[PLACE_COLUMN])
+        grouped = df.groupby(PLACE_COLUMN, sort=True)
+        means = grouped[SCORE_COLUMNS + ["Cnt_norm"]].mean()
+        self.names = means.index.astype(str).to_numpy(dtype=object)
+        self.scores = means[SCORE_COLUMNS].to_numpy(dtype=np.float64)
+        self.popularity = means["Cnt_norm"].to_numpy(dtype=np.float64)
+        self.cnt = grouped["Cnt"].sum().reindex(means.index).fillna(0).to_numpy(dtype=np.int64)
+        self.urls = grouped["URL"].first().reindex(means.index).fillna("#").to_numpy(dtype=object)
+        self.index = {name: i for i, name in enumerate(self.names)}
+
+    def __len__(self):
+        return len(self.names)
+
+    def weights(self, styles, weights=None):
+        """성향 이름 목록 → 합이 1인 길이 10 가중치 벡터 (모르는 성향은 무시)"""
+        w = np.zeros(len(STYLES))
+        for i, style in enumerate(styles):
+            if style in STYLES:
+                w[STYLES.index(style)] += 1.0 if weights is None else float(weights[i])
+        total = w.sum()
+        return w / total if total > 0 else w
+
+    def score(self, styles, popularity=0.0, weights=None):
+        """장소별 점수 벡터: (1-popularity)·성향 점수 가중합 + popularity·Cnt_norm"""
+        combined = self.scores @ self.weights(styles, weights)
+        if popularity:
+            combined = (1.0 - popularity) * combined + popularity * self.popularity
+        return combined
+
+    def top_style(self, i, styles):
+        """선택한 성향 중 장소 i의 점수가 가장 높은 성향"""
+        selected = [STYLES.index(s) for s in styles if s in STYLES]
+        if not selected:
+            return ""
+        return STYLES[selected[int(np.argmax(self.scores[i, selected]))]]
+
+    def top(self, styles, k=3, popularity=0.0, weights=None, exclude=()):
+        """점수 상위 k개 Recommendation (높은 순)"""
+        scores = self.score(styles, popularity, weights)
+        if exclude:
+            scores = scores.copy()
+            for name in exclude:
+                i = self.index.get(name)
+                if i is not None:
+                    scores[i] = -np.inf
+        k = min(k, len(scores))
+        if k <= 0:
+            return []
+        idx = np.argpartition(-scores, k - 1)[:k]
+        idx = idx[np.argsort(-scores[idx], kind="stable")]
+        results = []
+        for i in idx:
+            if not np.isfinite(scores[i]):
+                continue
+            results.append(Recommendation(self.names[i], float(scores[i]), self.top_style(i, styles), int(self.cnt[i]), self.urls[i], int(i)))
+        return results
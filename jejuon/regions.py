@@ -0,0 +1,119 @@
+"""지역(읍·면, 시 동지역) 경계와 좌표 → 지역 일괄 배정 (shapely STRtree 공간 조인)
+
+저장소의 cb_shp.shp/cb_tour.shp는 청주시 자료라 제주 좌표와 겹치지 않는다. 그래서 기본 경계는
+dataset POI 주소에서 읽을 수 있는 지역 이름('제주시 애월읍', '서귀포시 동지역' 등)을 가진 점들로 만든다:
+  1) 200m 격자마다 가장 많은 지역 이름 하나만 남기고 (주소 오기 정리)
+  2) 그 점들의 Voronoi 셀을 지역별로 합친 뒤 제주 경계(없으면 점들의 볼록 껍질 + 여유)로 자른다
+읍면동 경계 파일이 있으면 from_file()로 그대로 쓸 수 있다 (예: --regions emd.shp --region-col EMD_KOR_NM).
+
+배정은 점 배열 전체를 STRtree.query(predicate="within") 한 번으로 하고,
+경계 밖(해안선 바깥 등)은 query_nearest로 MAX_NEAREST_M 안의 가장 가까운 지역에 붙인다.
+"""
+import re
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+from shapely import STRtree
+
+from .geo import PROJECTED_CRS, to_projected
+
+REGION_COLUMN = "region"
+GRID_M = 200.0
+HULL_MARGIN_M = 3000.0
+MAX_NEAREST_M = 5000.0
+
+_CITY = r"(제주시|서귀포시)"
+_EUPMYEON = re.compile(_CITY + r"\s+([가-힣]+[읍면])(?:\s|$)")
+_DONG = re.compile(_CITY + r"\s+\(?[가-힣0-9]+동(?:\s|\)|$)")
+
+
+def region_label(address):
+    """주소 → '제주시 애월읍' / '서귀포시 동지역' (읽을 수 없으면 None)"""
+    if not isinstance(address, str):
+        return None
+    m = _EUPMYEON.search(address)
+    if m:
+        return f"{m.group(1)} {m.group(2)}"
+    m = _DONG.search(address)
+    if m:
+        return f"{m.group(1)} 동지역"
+    return None
+
+
+def _majority_by_grid(xy, labels, grid_m):
+    """격자 칸마다 가장 많은 지역 이름 하나의 (대표 좌표, 이름)"""
+    df = pd.DataFrame({"gx": np.floor(xy[:, 0] / grid_m), "gy": np.floor(xy[:, 1] / grid_m),
+                       "x": xy[:, 0], "y": xy[:, 1], "label": labels})
+    counts = df.groupby(["gx", "gy", "label"], sort=False).agg(n=("x", "size"), x=("x", "mean"), y=("y", "mean"))
+    best = counts.sort_values("n", ascending=False, kind="stable").reset_index().drop_duplicates(["gx", "gy"])
+    return best[["x", "y"]].to_numpy(), best["label"].to_numpy(dtype=object)
+
+
+def derive_regions(lonlat, labels, boundary=None, grid_m=GRID_M, margin_m=HULL_MARGIN_M):
+    """지역 이름이 붙은 점들 → 지역 경계 GeoDataFrame (region, geometry, EPSG:4326)
+
+    boundary: 제주 경계 GeoDataFrame (있으면 그 안으로 자름)
+    """
+    lonlat = np.asarray(lonlat, dtype=float).reshape(-1, 2)
+    labels = np.asarray(labels, dtype=object)
+    keep = np.isfinite(lonlat).all(axis=1) & pd.notna(labels)
+    xy, names = _majority_by_grid(to_projected(lonlat[keep]), labels[keep], grid_m)
+    points = shapely.points(xy)
+    if boundary is not None and len(boundary):
+        clip = shapely.union_all(boundary.to_crs(PROJECTED_CRS).geometry.values)
+    else:
+        clip = shapely.buffer(shapely.convex_hull(shapely.multipoints(xy)), margin_m)
+    cells = shapely.get_parts(shapely.voronoi_polygons(shapely.multipoints(xy), extend_to=clip, ordered=True))
+    # ordered=True: 셀 순서가 입력 점 순서와 같음 (중복 좌표가 없을 때) - 아니면 점이 든 셀로 다시 맞춤
+    if len(cells) != len(points):
+        point_idx, cell_idx = STRtree(cells).query(points, predicate="within")
+        cells = cells[cell_idx[np.argsort(point_idx, kind="stable")]]
+    regions = []
+    for name in sorted(set(names)):
+        merged = shapely.intersection(shapely.union_all(cells[names == name]), clip)
+        if not shapely.is_empty(merged):
+            regions.append((name, merged))
+    return gpd.GeoDataFrame(
+        {REGION_COLUMN: [r[0] for r in regions]}, geometry=[r[1] for r in regions], crs=PROJECTED_CRS
+    ).to_crs("EPSG:4326")
+
+
+def regions_from_addresses(pois, boundary=None):
+    """all_pois(주소 열)에서 지역 경계 만들기"""
+    labels = pois["address"].map(region_label).to_numpy(dtype=object)
+    return derive_regions(pois[["lon", "lat"]].to_numpy(dtype=float), labels, boundary)
+
+
+def from_file(path, name_col):
+    """지역 경계 파일(shp/geojson/gpkg/parquet) → region, geometry (EPSG:4326)"""
+    layer = gpd.read_parquet(path) if str(path).endswith(".parquet") else gpd.read_file(path)
+    return layer[[name_col, "geometry"]].rename(columns={name_col: REGION_COLUMN}).to_crs("EPSG:4326")
+
+
+class RegionIndex:
+    def __init__(self, layer):
+        """layer: region, geometry 열의 GeoDataFrame"""
+        self.names = layer[REGION_COLUMN].astype(str).to_numpy(dtype=object)
+        self.geoms = np.asarray(layer.to_crs(PROJECTED_CRS).geometry.values, dtype=object)
+        self.tree = STRtree(self.geoms)
+
+    def __len__(self):
+        return len(self.names)
+
+    def assign(self, lon, lat, max_distance=MAX_NEAREST_M):
+        """좌표 배열 → 지역 이름 배열 (좌표가 없거나 어느 지역에서도 max_distance 밖이면 None)"""
+        lonlat = np.column_stack([np.asarray(lon, dtype=float), np.asarray(lat, dtype=float)])
+        out = np.full(len(lonlat), None, dtype=object)
+        valid = np.flatnonzero(np.isfinite(lonlat).all(axis=1))
+        if len(valid) == 0 or len(self.names) == 0:
+            return out
+        points = shapely.points(to_projected(lonlat[valid]))
+        point_idx, region_idx = self.tree.query(points, predicate="within")
+        out[valid[point_idx]] = self.names[region_idx]
+        missing = np.flatnonzero(pd.isna(out[valid]))
+        if len(missing):
+            point_idx, region_idx = self.tree.query_nearest(points[missing], max_distance=max_distance, all_matches=False)
+            out[valid[missing[point_idx]]] = self.names[region_idx]
+        return out
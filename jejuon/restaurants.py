@@ -0,0 +1,122 @@
+"""관광지별 주변 맛집 요약 (final_result.csv 리뷰 테이블을 한 번만 집계)
+
+관광지(name_2) → 긍정 리뷰가 많은 순 상위 N개 맛집의 좌표, 긍정/부정/기타 개수, 대표 리뷰.
+맛집들은 관광지 순으로 정렬된 열 배열에 담고 관광지별 (시작, 끝) 구간만 들고 있어서
+지도와 가이드는 리뷰 행 수와 상관없이 구간을 잘라 읽기만 한다.
+"""
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from .names import nfc
+
+TOP_N = 5
+REVIEWS_PER_RESTAURANT = 2
+
+
+class Restaurant(NamedTuple):
+    name: str
+    lon: float
+    lat: float
+    positive: int
+    negative: int
+    other: int
+    reviews: tuple
+
+
+def sentiment_text(positive, negative):
+    """'긍정 3개, 부정 1개' (0개인 쪽은 생략)"""
+    parts = []
+    if positive > 0:
+        parts.append(f"긍정 {positive}개")
+    if negative > 0:
+        parts.append(f"부정 {negative}개")
+    return ", ".join(parts)
+
+
+def _first_reviews(reviews, n):
+    out = []
+    for r in reviews:
+        if isinstance(r, str) and r.strip():
+            out.append(r.strip())
+            if len(out) == n:
+                break
+    return tuple(out)
+
+
+class RestaurantSummaries:
+    def __init__(self, df, top_n=TOP_N, reviews_per=REVIEWS_PER_RESTAURANT):
+        df = df.dropna(subset=["name_2", "name_1"]).copy()
+        df["spot"] = df["name_2"].map(nfc)
+        df["positive"] = df["p_n"].eq("positive").astype(np.int64)
+        df["negative"] = df["p_n"].eq("negative").astype(np.int64)
+        df["other"] = 1 - df["positive"] - df["negative"]
+
+        grouped = df.groupby(["spot", "name_1"], sort=False)
+        agg = grouped.agg(
+            lon=("X", "first"), lat=("Y", "first"),
+            positive=("positive", "sum"), negative=("negative", "sum"), other=("other", "sum"),
+        )
+        agg["reviews"] = grouped["review"].agg(lambda s: _first_reviews(s, reviews_per))
+        agg["total"] = agg["positive"] + agg["negative"] + agg["other"]
+        agg = agg.reset_index().sort_values(
+            ["spot", "positive", "total", "name_1"], ascending=[True, False, False, True], kind="stable"
+        )
+        agg = agg.groupby("spot", sort=False).head(top_n).reset_index(drop=True)
+
+        # 열 배열 (관광지 순으로 연속 구간)
+        self.spot = agg["spot"].to_numpy(dtype=object)
+        self.name = agg["name_1"].astype(str).to_numpy(dtype=object)
+        self.lon = agg["lon"].to_numpy(dtype=float)
+        self.lat = agg["lat"].to_numpy(dtype=float)
+        self.positive = agg["positive"].to_numpy(dtype=np.int64)
+        self.negative = agg["negative"].to_numpy(dtype=np.int64)
+        self.other = agg["other"].to_numpy(dtype=np.int64)
+        self.reviews = agg["reviews"].to_numpy(dtype=object)
+        self.offsets = {}
+        for i, spot in enumerate(self.spot):
+            lo, _ = self.offsets.get(spot, (i, i))
+            self.offsets[spot] = (lo, i + 1)
+
+        first = df.drop_duplicates("spot").set_index("spot")
+        self.spot_coords = {
+            spot: (float(x), float(y))
+            for spot, x, y in zip(first.index, first["X_2"], first["Y_2"])
+            if pd.notna(x) and pd.notna(y)
+        }
+        self._markdown = {spot: self._build_markdown(spot) for spot in self.offsets}
+
+    def __contains__(self, place):
+        return place is not None and nfc(place) in self.offsets
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def location(self, place):
+        """관광지 좌표 (lon, lat) 또는 None"""
+        return self.spot_coords.get(nfc(place)) if place is not None else None
+
+    def for_spot(self, place):
+        """관광지 주변 맛집 Restaurant 목록 (긍정 리뷰 많은 순)"""
+        if place is None:
+            return []
+        lo, hi = self.offsets.get(nfc(place), (0, 0))
+        return [
+            Restaurant(self.name[i], self.lon[i], self.lat[i],
+                       int(self.positive[i]), int(self.negative[i]), int(self.other[i]), self.reviews[i])
+            for i in range(lo, hi)
+        ]
+
+    def _build_markdown(self, spot):
+        lines = ["#### 🍴 주변 맛집 추천\n\n"]
+        for r in self.for_spot(spot):
+            lines.append(f"**{r.name}** ({sentiment_text(r.positive, r.negative)})\n\n")
+            for rev in r.reviews:
+                lines.append(f"- \"{rev}\"\n")
+            lines.append("\n")
+        return "".join(lines)
+
+    def markdown(self, place):
+        """가이드용 '주변 맛집 추천' 마크다운 (미리 만들어 둔 것). 없으면 빈 문자열"""
+        return self._markdown.get(nfc(place), "") if place is not None else ""
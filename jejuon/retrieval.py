@@ -0,0 +1,348 @@
+"""방문자 리뷰 검색 인덱스 (BM25, 디스크에 저장한 배열을 memory-map으로 읽음)
+
+final_result.csv 맛집 리뷰(+key_word)와 cj_data_final.csv 관광지/카페 리뷰를 리뷰 하나 = 문서 하나로 모으고,
+한글은 음절 2-gram, 영문/숫자는 단어 단위로 토큰화해서 BM25 가중치를 미리 계산해 둔다.
+  - search(질문): 질문 토큰의 posting만 더해서 점수 (문서 1만 개 안팎에서 1ms 정도)
+  - representative(장소): 그 장소 리뷰 중 전체 리뷰와 가장 비슷한(대표적인) 것
+가이드 프롬프트에는 이렇게 고른 짧은 리뷰 몇 개만 근거로 넣는다.
+
+빌드: python -m jejuon.retrieval  (앱/API는 번들 버전이 바뀌었으면 처음 쓸 때 다시 만든다)
+저장: reviews/f1-<번들 버전>/ 처럼 형식·버전별 폴더에 쓰고 CURRENT 파일을 바꿔치기한다 (jejuon.pipeline과 같은 방식).
+워커 여러 개가 동시에 빌드해도 먼저 끝난 폴더를 같이 쓰고, 읽는 중인 폴더를 지우지 않는다.
+"""
+import argparse
+import json
+import os
+import re
+import shutil
+import time
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+from scipy import sparse
+
+from .bundle import DEFAULT_BUNDLE_DIR, load_bundle
+from .names import nfc
+from .spots import has_review
+
+INDEX_DIR = "reviews"  # 번들 폴더 안의 하위 폴더
+INDEX_FORMAT = 1  # 저장 형식/토큰화가 바뀌면 올린다
+MANIFEST = "manifest.json"
+CURRENT = "CURRENT"
+KEEP_BUILDS = 2  # 버전이 바뀐 직후 이전 버전을 읽는 워커가 있을 수 있어서 직전 빌드 하나는 남긴다
+K1 = 1.2
+B = 0.75
+MIN_CHARS = 8  # 이보다 짧은 리뷰('좋아요' 등)는 근거로 쓰지 않음
+MAX_SNIPPET_CHARS = 160
+
+_TOKEN = re.compile(r"[가-힣]+|[a-z0-9]+")
+_BROKEN = re.compile(r"\?{2,}")  # 인코딩이 깨진 이모지
+_SPACE = re.compile(r"\s+")
+_ARRAYS = ("post_indptr", "post_docs", "post_weights", "doc_indptr", "doc_terms", "doc_weights")
+
+
+class Snippet(NamedTuple):
+    text: str  # 정리하고 MAX_SNIPPET_CHARS로 자른 리뷰
+    subject: str  # 리뷰 대상 (관광지/맛집/카페 이름)
+    spot: str  # 묶인 관광지
+    source: str  # spot / cafe / restaurant
+    score: float
+
+    @property
+    def line(self):
+        """프롬프트/화면용 한 줄"""
+        return f"{self.subject}: {self.text}"
+
+
+def tokenize(text):
+    """한글 어절은 음절 2-gram(한 글자면 그대로), 영문/숫자는 단어"""
+    tokens = []
+    for word in _TOKEN.findall(nfc(text).lower()):
+        if len(word) > 1 and "가" <= word[0] <= "힣":
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+        else:
+            tokens.append(word)
+    return tokens
+
+
+def clean_review(text):
+    """깨진 이모지와 줄바꿈을 정리한 한 줄 (근거로 쓸 수 없으면 None)"""
+    if not isinstance(text, str) or not has_review(text):
+        return None
+    text = _SPACE.sub(" ", _BROKEN.sub(" ", text)).strip().strip('"').strip()
+    return text if len(text) >= MIN_CHARS else None
+
+
+def shorten(text, limit=MAX_SNIPPET_CHARS):
+    return text if len(text) <= limit else text[:limit - 1].rstrip() + "…"
+
+
+def review_documents(restaurants, spot_reviews):
+    """리뷰 문서 DataFrame (spot, subject 순 정렬, 같은 대상의 같은 리뷰는 하나만)
+
+    열: spot, subject, source, keywords, text
+    """
+    frames = [
+        pd.DataFrame({
+            "spot": restaurants["name_2"], "subject": restaurants["name_1"], "source": "restaurant",
+            "keywords": restaurants["key_word"], "text": restaurants["review"],
+        }),
+        pd.DataFrame({
+            "spot": spot_reviews["t_name"], "subject": spot_reviews["t_name"], "source": "spot",
+            "keywords": None, "text": spot_reviews["t_review"],
+        }),
+        pd.DataFrame({
+            "spot": spot_reviews["t_name"], "subject": spot_reviews["c_name"], "source": "cafe",
+            "keywords": None, "text": spot_reviews["c_review"],
+        }),
+    ]
+    docs = pd.concat(frames, ignore_index=True).dropna(subset=["spot", "subject"])
+    docs["text"] = docs["text"].map(clean_review)
+    docs = docs.dropna(subset=["text"])
+    for col in ("spot", "subject"):
+        docs[col] = docs[col].map(nfc)
+    docs["keywords"] = docs["keywords"].map(lambda v: v.strip() if isinstance(v, str) else "")
+    docs = docs.drop_duplicates(subset=["spot", "subject", "source", "text"])
+    # 관광지 자체 리뷰가 그 관광지 구간의 앞쪽에 오도록
+    docs["own"] = docs["subject"] != docs["spot"]
+    docs = docs.sort_values(["spot", "own", "subject"], kind="stable").drop(columns="own")
+    return docs.reset_index(drop=True)
+
+
+def bm25_matrix(texts, k1=K1, b=B):
+    """문서 × 토큰 BM25 가중치 CSR 행렬과 토큰 사전"""
+    vocab = {}
+    rows, cols = [], []
+    for d, text in enumerate(texts):
+        for token in tokenize(text):
+            cols.append(vocab.setdefault(token, len(vocab)))
+            rows.append(d)
+    n = len(texts)
+    tf = sparse.csr_matrix(
+        (np.ones(len(cols), dtype=np.float32), (np.array(rows, dtype=np.int64), np.array(cols, dtype=np.int64))),
+        shape=(n, len(vocab)),
+    )
+    tf.sum_duplicates()
+    doc_len = np.asarray(tf.sum(axis=1)).ravel()
+    avgdl = max(doc_len.mean(), 1.0) if n else 1.0
+    df = np.bincount(tf.indices, minlength=len(vocab))
+    idf = np.log1p((n - df + 0.5) / (df + 0.5))
+    norm = np.repeat(k1 * (1 - b + b * doc_len / avgdl), np.diff(tf.indptr))
+    weights = idf[tf.indices] * tf.data * (k1 + 1) / (tf.data + norm)
+    return sparse.csr_matrix((weights.astype(np.float32), tf.indices, tf.indptr), shape=tf.shape), vocab
+
+
+def build_index(tables, version, out_dir):
+    """리뷰 문서와 BM25 배열을 out_dir에 저장 (임시 폴더에 쓰고 바꿔치기)"""
+    docs = review_documents(tables["restaurants"], tables["spot_reviews"])
+    texts = (docs["subject"] + " " + docs["keywords"] + " " + docs["text"]).tolist()
+    matrix, vocab = bm25_matrix(texts)
+    post = matrix.T.tocsr()  # 토큰 → 문서 posting
+    # 대표 리뷰 고르기(코사인)용으로 문서 행은 L2 정규화
+    row_norm = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    doc = sparse.diags(1.0 / np.maximum(row_norm, 1e-9)) @ matrix
+    doc = doc.tocsr()
+
+    name = build_name(version)
+    os.makedirs(out_dir, exist_ok=True)
+    tmp = os.path.join(out_dir, f".{name}.tmp{os.getpid()}")
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    arrays = {
+        "post_indptr": post.indptr.astype(np.int64), "post_docs": post.indices.astype(np.int32),
+        "post_weights": post.data.astype(np.float32),
+        "doc_indptr": doc.indptr.astype(np.int64), "doc_terms": doc.indices.astype(np.int32),
+        "doc_weights": doc.data.astype(np.float32),
+    }
+    for key, arr in arrays.items():
+        np.save(os.path.join(tmp, f"{key}.npy"), arr)
+    feather.write_feather(docs, os.path.join(tmp, "docs.arrow"), compression="uncompressed")
+    with open(os.path.join(tmp, "vocab.json"), "w", encoding="utf-8") as f:
+        json.dump(vocab, f, ensure_ascii=False)
+    manifest = {"format": INDEX_FORMAT, "version": version, "docs": len(docs), "tokens": len(vocab),
+                "built_at": time.time()}
+    with open(os.path.join(tmp, MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    try:
+        os.replace(tmp, os.path.join(out_dir, name))
+    except OSError:
+        # 다른 프로세스가 같은 버전을 먼저 만들었다 (내용이 같으므로 그쪽을 쓴다)
+        shutil.rmtree(tmp, ignore_errors=True)
+        manifest = read_manifest(os.path.join(out_dir, name))
+
+    pointer = os.path.join(out_dir, f".{CURRENT}.tmp{os.getpid()}")
+    with open(pointer, "w", encoding="utf-8") as f:
+        f.write(name)
+    os.replace(pointer, os.path.join(out_dir, CURRENT))
+    _prune(out_dir, keep=name)
+    return manifest
+
+
+def build_name(version):
+    """형식·번들 버전별 인덱스 폴더 이름"""
+    return f"f{INDEX_FORMAT}-{version}"
+
+
+def _prune(out_dir, keep):
+    """최근 KEEP_BUILDS개(keep 포함)만 남기고 오래된 빌드 폴더 정리 (임시 폴더는 건드리지 않음)"""
+    builds = [d for d in os.listdir(out_dir) if not d.startswith(".") and os.path.isdir(os.path.join(out_dir, d))]
+    builds.sort(key=lambda d: os.path.getmtime(os.path.join(out_dir, d)), reverse=True)
+    for d in [d for d in builds if d != keep][KEEP_BUILDS - 1:]:
+        shutil.rmtree(os.path.join(out_dir, d), ignore_errors=True)
+
+
+def current_build(index_dir):
+    """CURRENT가 가리키는 빌드 폴더 (없으면 None)"""
+    path = os.path.join(index_dir, CURRENT)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        name = f.read().strip()
+    return os.path.join(index_dir, name) if name else None
+
+
+def read_manifest(index_dir):
+    path = os.path.join(index_dir, MANIFEST)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+class ReviewIndex:
+    def __init__(self, index_dir):
+        self.manifest = read_manifest(index_dir)
+        arrays = {name: np.load(os.path.join(index_dir, f"{name}.npy"), mmap_mode="r") for name in _ARRAYS}
+        self._post_indptr = arrays["post_indptr"]
+        self._post_docs = arrays["post_docs"]
+        self._post_weights = arrays["post_weights"]
+        with pa.memory_map(os.path.join(index_dir, "docs.arrow"), "r") as src:
+            docs = pa.ipc.open_file(src).read_all().to_pandas()
+        with open(os.path.join(index_dir, "vocab.json"), encoding="utf-8") as f:
+            self.vocab = json.load(f)
+        self.texts = docs["text"].tolist()
+        self.subjects = docs["subject"].tolist()
+        self.spots_of = docs["spot"].tolist()
+        self.sources = docs["source"].tolist()
+        self.n_docs = len(docs)
+        self._docs = sparse.csr_matrix(
+            (arrays["doc_weights"], arrays["doc_terms"], arrays["doc_indptr"]), shape=(self.n_docs, len(self.vocab))
+        )
+        # 문서가 spot 순으로 정렬돼 있어서 관광지별로는 (시작, 끝) 구간 하나
+        self.spot_ranges = {
+            spot: (int(idx[0]), int(idx[-1]) + 1) for spot, idx in docs.groupby("spot", sort=False).indices.items()
+        }
+        self._by_subject = docs.groupby("subject", sort=False).indices
+        # 질문에서 관광지명 찾기 (긴 이름부터, 공백 무시)
+        self._spot_keys = sorted(
+            ((spot.replace(" ", ""), spot) for spot in self.spot_ranges if len(spot.replace(" ", "")) >= 2),
+            key=lambda kv: -len(kv[0]),
+        )
+
+    @classmethod
+    def load(cls, tables, version, index_dir):
+        """저장된 인덱스 읽기 (이 번들 버전/형식의 빌드가 없으면 먼저 빌드)"""
+        folder = os.path.join(index_dir, build_name(version))
+        if read_manifest(folder) is None:
+            build_index(tables, version, index_dir)
+        return cls(folder)
+
+    def __len__(self):
+        return self.n_docs
+
+    def _snippet(self, i, score):
+        return Snippet(shorten(self.texts[i]), self.subjects[i], self.spots_of[i], self.sources[i], float(score))
+
+    def _top(self, doc_ids, scores, k):
+        """점수 높은 순 k개 (같은 리뷰 문장은 한 번만)"""
+        order = np.argsort(-scores, kind="stable")
+        out, seen = [], set()
+        for j in order:
+            if scores[j] <= 0:
+                break
+            i = int(doc_ids[j])
+            if self.texts[i] in seen:
+                continue
+            seen.add(self.texts[i])
+            out.append(self._snippet(i, scores[j]))
+            if len(out) == k:
+                break
+        return out
+
+    def mentioned_spots(self, query):
+        """질문에 이름이 들어 있는 관광지들"""
+        text = nfc(query).replace(" ", "")
+        found = []
+        for key, spot in self._spot_keys:
+            if key in text and not any(key in other.replace(" ", "") for other in found):
+                found.append(spot)
+        return found
+
+    def scores(self, query):
+        """문서별 BM25 점수 배열 (질문 토큰의 posting만 더함)"""
+        terms = [self.vocab[t] for t in dict.fromkeys(tokenize(query)) if t in self.vocab]
+        if not terms:
+            return np.zeros(self.n_docs)
+        bounds = [(self._post_indptr[t], self._post_indptr[t + 1]) for t in terms]
+        docs = np.concatenate([self._post_docs[a:b] for a, b in bounds])
+        weights = np.concatenate([self._post_weights[a:b] for a, b in bounds])
+        return np.bincount(docs, weights=weights, minlength=self.n_docs)
+
+    def search(self, query, spots=None, k=5):
+        """질문과 가장 관련 있는 리뷰 k개. spots를 주면 그 관광지에 묶인 리뷰(주변 맛집/카페 포함)만"""
+        scores = self.scores(query)
+        if spots:
+            ranges = [self.spot_ranges[nfc(s)] for s in spots if nfc(s) in self.spot_ranges]
+            doc_ids = np.concatenate([np.arange(a, b) for a, b in ranges]) if ranges else np.zeros(0, dtype=np.int64)
+            return self._top(doc_ids, scores[doc_ids], k)
+        top = np.argpartition(-scores, min(k * 4, self.n_docs - 1))[:k * 4] if self.n_docs > k * 4 else np.arange(self.n_docs)
+        return self._top(top, scores[top], k)
+
+    def place_docs(self, place):
+        """장소 자체에 대한 리뷰 문서 번호 (이름이 리뷰 대상에 없으면 그 관광지에 묶인 리뷰 전체)"""
+        key = nfc(place)
+        idx = self._by_subject.get(key)
+        if idx is not None:
+            return np.asarray(idx)
+        if key in self.spot_ranges:
+            return np.arange(*self.spot_ranges[key])
+        return np.zeros(0, dtype=np.int64)
+
+    def representative(self, place, k=3):
+        """장소 리뷰 중 리뷰 전체의 중심(평균 벡터)과 코사인이 가장 큰 k개"""
+        doc_ids = self.place_docs(place)
+        if len(doc_ids) == 0:
+            return []
+        rows = self._docs[doc_ids]
+        centroid = np.asarray(rows.sum(axis=0)).ravel()
+        scores = rows @ centroid
+        # 점수 0(토큰이 하나도 안 겹침)인 짧은 리뷰도 후보로 남기기
+        return self._top(doc_ids, scores + 1e-9, k)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="방문자 리뷰 BM25 검색 인덱스를 빌드하고 질의해 봅니다.")
+    parser.add_argument("--bundle", default=DEFAULT_BUNDLE_DIR)
+    parser.add_argument("--query", default=None, help="빌드 후 바로 검색해 볼 질문")
+    parser.add_argument("-k", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    tables, _, bundle_manifest = load_bundle(args.bundle)
+    index_dir = os.path.join(args.bundle, INDEX_DIR)
+    started = time.perf_counter()
+    manifest = build_index(tables, bundle_manifest["version"], index_dir)
+    print(f"리뷰 {manifest['docs']}개, 토큰 {manifest['tokens']}개 ({time.perf_counter() - started:.2f}s) → {index_dir}")
+    if args.query:
+        index = ReviewIndex(current_build(index_dir))
+        started = time.perf_counter()
+        hits = index.search(args.query, index.mentioned_spots(args.query), k=args.k) or index.search(args.query, k=args.k)
+        print(f"검색 {1000 * (time.perf_counter() - started):.2f}ms")
+        for hit in hits:
+            print(f"- ({hit.score:.2f}) {hit.line}")
+
+
+if __name__ == "__main__":
+    main()
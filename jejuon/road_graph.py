@@ -0,0 +1,212 @@
+"""오프라인 도로망 경로 엔진 (OSMnx 그래프 → CSR 배열, scipy Dijkstra)
+
+빌드 (네트워크 필요, 한 번만):
+  python -m jejuon.road_graph --network drive
+  python -m jejuon.road_graph --network walk --graphml jeju_walk.graphml   # 받아둔 GraphML 변환
+앱/API는 .cache/graph/jeju_<network>.npz 를 한 번 읽어서 Mapbox 없이 구간을 계산한다.
+반환 형태는 directions.fetch_route_legs 와 같은 (좌표 리스트, 소요시간 초, 거리 m).
+"""
+import argparse
+import os
+
+import numpy as np
+
+from .data import data_path
+from .geo import to_projected
+
+GRAPH_DIR = data_path(".cache", "graph")
+GRAPH_QUERY = "Jeju Island, South Korea"
+WALK_SPEED_MPS = 4.5 / 3.6
+
+
+def graph_path(network, graph_dir=GRAPH_DIR):
+    return os.path.join(graph_dir, f"jeju_{network}.npz")
+
+
+def network_for_mode(mode):
+    """화면의 이동 모드(운전자/도보) → 그래프 종류"""
+    return "walk" if mode in ("도보", "walking", "walk") else "drive"
+
+
+def compile_graph(G, network):
+    """networkx MultiDiGraph → CSR 배열 dict (평행 간선은 가장 빠른 것만)"""
+    nodes = list(G.nodes)
+    pos = {n: i for i, n in enumerate(nodes)}
+    lon = np.array([G.nodes[n]["x"] for n in nodes], dtype=float)
+    lat = np.array([G.nodes[n]["y"] for n in nodes], dtype=float)
+
+    best = {}
+    for u, v, d in G.edges(data=True):
+        length = float(d.get("length", 0.0))
+        if network == "walk" or "travel_time" not in d:
+            travel = length / WALK_SPEED_MPS
+        else:
+            travel = float(d["travel_time"])
+        key = (pos[u], pos[v])
+        if key not in best or travel < best[key][1]:
+            geom = d.get("geometry")
+            coords = list(geom.coords) if geom is not None else [(lon[key[0]], lat[key[0]]), (lon[key[1]], lat[key[1]])]
+            best[key] = (length, travel, coords)
+
+    edges = sorted(best.items())
+    src = np.array([k[0] for k, _ in edges], dtype=np.int64)
+    indptr = np.zeros(len(nodes) + 1, dtype=np.int64)
+    np.add.at(indptr, src + 1, 1)
+    indptr = np.cumsum(indptr)
+    geom_ptr = np.zeros(len(edges) + 1, dtype=np.int64)
+    geom_ptr[1:] = np.cumsum([len(v[2]) for _, v in edges])
+    geom = np.array([pt for _, v in edges for pt in v[2]], dtype=float).reshape(-1, 2)
+    return {
+        "node_ids": np.array(nodes, dtype=np.int64),
+        "lon": lon,
+        "lat": lat,
+        "indptr": indptr,
+        "indices": np.array([k[1] for k, _ in edges], dtype=np.int64),
+        "length": np.array([v[0] for _, v in edges], dtype=float),
+        "time": np.array([v[1] for _, v in edges], dtype=float),
+        "geom_ptr": geom_ptr,
+        "geom": geom,
+    }
+
+
+def build_graph(network="drive", graphml=None, graph_dir=GRAPH_DIR):
+    import osmnx as ox
+
+    if graphml:
+        G = ox.load_graphml(graphml)
+    else:
+        G = ox.graph_from_place(GRAPH_QUERY, network_type=network)
+    if network == "drive":
+        G = ox.add_edge_speeds(G)
+        G = ox.add_edge_travel_times(G)
+    arrays = compile_graph(G, network)
+    os.makedirs(graph_dir, exist_ok=True)
+    path = graph_path(network, graph_dir)
+    np.savez(path, **arrays)
+    return path, len(arrays["node_ids"]), len(arrays["indices"])
+
+
+class RoadGraph:
+    def __init__(self, arrays):
+        self.lon = arrays["lon"]
+        self.lat = arrays["lat"]
+        self.indptr = arrays["indptr"]
+        self.indices = arrays["indices"]
+        self.length = arrays["length"]
+        self.time = arrays["time"]
+        self.geom_ptr = arrays["geom_ptr"]
+        self.geom = arrays["geom"]
+        # 경로 복원용 파이썬 리스트 (NumPy 원소 접근보다 빠름)
+        self._indptr = self.indptr.tolist()
+        self._indices = self.indices.tolist()
+        self._tree = None
+        self._sparse = None
+        self._sparse_t = None
+
+    @classmethod
+    def load(cls, network="drive", graph_dir=GRAPH_DIR):
+        with np.load(graph_path(network, graph_dir)) as f:
+            return cls({k: f[k] for k in f.files})
+
+    @classmethod
+    def available(cls, network="drive", graph_dir=GRAPH_DIR):
+        return os.path.exists(graph_path(network, graph_dir))
+
+    def nearest_nodes(self, coords):
+        """경위도 지점들을 가장 가까운 그래프 노드로 (EPSG:5179 KD-tree)"""
+        from scipy.spatial import cKDTree
+
+        if self._tree is None:
+            self._tree = cKDTree(to_projected(np.column_stack([self.lon, self.lat])))
+        _, idx = self._tree.query(to_projected(coords))
+        return np.atleast_1d(idx).astype(int).tolist()
+
+    def _csgraph(self):
+        from scipy.sparse import csr_matrix
+
+        if self._sparse is None:
+            n = len(self.lon)
+            self._sparse = csr_matrix((np.maximum(self.time, 1e-3), self.indices, self.indptr), shape=(n, n))
+        return self._sparse
+
+    def shortest_paths(self, sources):
+        """출발 노드들에서의 최소 소요시간과 선행 노드 (scipy 다중 출발 Dijkstra 한 번)"""
+        from scipy.sparse.csgraph import dijkstra
+
+        return dijkstra(self._csgraph(), directed=True, indices=sources, return_predecessors=True)
+
+    def costs_between(self, stops, targets):
+        """(stops→targets, targets→stops) 소요시간 행렬. 둘 다 (len(stops), len(targets))
+
+        역방향은 뒤집은 그래프에서 stops를 출발점으로 Dijkstra를 돌려 구한다 (target 수와 무관하게 2번).
+        """
+        from scipy.sparse.csgraph import dijkstra
+
+        if self._sparse_t is None:
+            self._sparse_t = self._csgraph().T.tocsr()
+        stop_nodes = self.nearest_nodes(stops)
+        target_nodes = self.nearest_nodes(targets)
+        out = dijkstra(self._csgraph(), directed=True, indices=stop_nodes)[:, target_nodes]
+        back = dijkstra(self._sparse_t, directed=True, indices=stop_nodes)[:, target_nodes]
+        return out, back
+
+    def _path_edges(self, predecessors, source, target):
+        """선행 노드 배열로 source→target 간선 번호 목록 복원. 갈 수 없으면 None"""
+        if source == target:
+            return []
+        nodes = [target]
+        while nodes[-1] != source:
+            prev = predecessors[nodes[-1]]
+            if prev < 0:
+                return None
+            nodes.append(int(prev))
+        nodes.reverse()
+        edges = []
+        for u, v in zip(nodes, nodes[1:]):
+            lo, hi = self._indptr[u], self._indptr[u + 1]
+            edges.append(lo + self._indices[lo:hi].index(v))
+        return edges
+
+    def _edges_to_leg(self, edges, start, end):
+        coords = [list(start)]
+        for e in edges:
+            for pt in self.geom[self.geom_ptr[e]:self.geom_ptr[e + 1]].tolist():
+                if coords[-1] != pt:
+                    coords.append(pt)
+        if coords[-1] != list(end):
+            coords.append(list(end))
+        duration = float(self.time[edges].sum()) if edges else 0.0
+        distance = float(self.length[edges].sum()) if edges else 0.0
+        return coords, duration, distance
+
+    def route_legs(self, coords):
+        """coords 순서대로의 구간 목록 [(좌표 리스트, 소요시간 초, 거리 m) 또는 None]"""
+        nodes = self.nearest_nodes(coords)
+        sources = sorted(set(nodes[:-1]))
+        _, pred = self.shortest_paths(sources)
+        row = {src: i for i, src in enumerate(sources)}
+        legs = []
+        for i in range(len(coords) - 1):
+            edges = self._path_edges(pred[row[nodes[i]]], nodes[i], nodes[i + 1])
+            legs.append(None if edges is None else self._edges_to_leg(edges, coords[i], coords[i + 1]))
+        return legs
+
+    def matrix(self, coords):
+        """지점 전체 쌍의 최소 소요시간 행렬(초). 다중 출발 Dijkstra 한 번으로 계산"""
+        nodes = self.nearest_nodes(coords)
+        dist, _ = self.shortest_paths(nodes)
+        return dist[:, nodes]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="제주 도로망을 오프라인 경로 엔진용 CSR 배열로 저장합니다.")
+    parser.add_argument("--network", default="drive", choices=["drive", "walk"])
+    parser.add_argument("--graphml", default=None, help="미리 받아둔 GraphML 파일 (없으면 osmnx로 다운로드)")
+    parser.add_argument("--out", default=GRAPH_DIR)
+    args = parser.parse_args(argv)
+    path, n_nodes, n_edges = build_graph(args.network, args.graphml, args.out)
+    print(f"노드 {n_nodes}개, 간선 {n_edges}개 → {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""경로 기반 추천: 성향 점수 - 현재 경로에 끼워 넣을 때 늘어나는 이동시간
+
+후보는 감성분석 CSV의 장소들. CSV에는 좌표가 없어서 시작할 때 한 번
+장소명 → dataset POI 이름, 안 되면 주소(지번 그대로/본번/동·리 중심) 순으로 좌표를 붙인다.
+요청마다 KD-tree로 경로 근처 후보만 고르고, 정류장↔후보 비용 행렬(캐시)로
+모든 후보의 모든 삽입 위치 비용을 한 번에 계산한다.
+"""
+import re
+from collections import OrderedDict
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from .geo import haversine_matrix, to_projected
+from .names import NameIndex
+
+# 도로망이 없을 때 직선거리 → 이동시간 환산 (우회 계수, 평균 속도 m/s)
+DETOUR_FACTOR = 1.3
+FALLBACK_SPEED_MPS = {"drive": 40 / 3.6, "walk": 4.5 / 3.6}
+DEFAULT_RADIUS_M = 15_000
+DEFAULT_DETOUR_WEIGHT = 1.0  # 우회 1시간 = 정규화 성향 점수 1
+COST_CACHE_SIZE = 64
+
+_SPACE = re.compile(r"\s+")
+_LOT = re.compile(r"^(.*?[동리가로길])(\d+)")
+_VILLAGE = re.compile(r"[동리]$")
+
+
+def normalize_address(address):
+    """공백/끝의 '-' 제거 ('하모리 2129 - 3 ' → '하모리2129-3')"""
+    return _SPACE.sub("", str(address)).rstrip("-")
+
+
+def address_lot(address):
+    """본번까지만 ('...하모리2129-3' → '...하모리2129')"""
+    m = _LOT.match(normalize_address(address))
+    return m.group(1) + m.group(2) if m else None
+
+
+def address_village(address):
+    """주소의 마지막 동/리 이름"""
+    for part in reversed(str(address).split()):
+        if _VILLAGE.search(part):
+            return part
+    return None
+
+
+def locate_places(names, addresses, pois):
+    """장소명/주소 → (lon, lat, 방법) 배열. 방법: name/address/lot/village, 못 찾으면 ''"""
+    index = NameIndex()
+    index.add_frame(pois, "name", "lon", "lat", "poi")
+
+    pois = pois.dropna(subset=["address", "lon", "lat"])
+    lookups = {}
+    for level, key_fn in (("address", normalize_address), ("lot", address_lot), ("village", address_village)):
+        keys = pois["address"].map(key_fn)
+        valid = keys.notna()
+        means = pois[valid].groupby(keys[valid])[["lon", "lat"]].mean()
+        lookups[level] = dict(zip(means.index, zip(means["lon"], means["lat"])))
+
+    n = len(names)
+    lon = np.full(n, np.nan)
+    lat = np.full(n, np.nan)
+    method = np.full(n, "", dtype=object)
+    for i, (name, address) in enumerate(zip(names, addresses)):
+        place = index.get(name)
+        if place is not None:
+            lon[i], lat[i], method[i] = place.lon, place.lat, "name"
+            continue
+        if not isinstance(address, str):
+            continue
+        for level, key_fn in (("address", normalize_address), ("lot", address_lot), ("village", address_village)):
+            key = key_fn(address)
+            if key is not None and key in lookups[level]:
+                lon[i], lat[i] = lookups[level][key]
+                method[i] = level
+                break
+    return lon, lat, method
+
+
+class RouteRecommendation(NamedTuple):
+    name: str
+    score: float  # style - detour_weight * 우회 시간(시간)
+    style_score: float  # 0~1 정규화 성향 점수
+    detour: float  # 늘어나는 이동시간(초)
+    position: int  # 이 정류장 다음에 넣으면 가장 적게 늘어남 (recommend에 준 stops 인덱스, 서비스에서는 order 인덱스)
+    lon: float
+    lat: float
+    located_by: str
+    style: str
+    url: str
+
+
+def haversine_costs(speed_mps):
+    """도로망 없이 쓰는 비용 함수: 직선거리 × 우회 계수 / 속도 (초)"""
+    def costs(stops, targets):
+        out = haversine_matrix(stops, targets) * (DETOUR_FACTOR / speed_mps)
+        return out, out
+    return costs
+
+
+class RouteRecommender:
+    def __init__(self, recommender, pois, names_df):
+        """recommender: StyleRecommender, pois: all_pois 테이블, names_df: 감성분석 CSV 원본 (주소용)"""
+        self.recommender = recommender
+        first = names_df.dropna(subset=["Area Nm"]).drop_duplicates("Area Nm").set_index("Area Nm")
+        addresses = first["Address"].reindex(recommender.names).to_numpy(dtype=object)
+        self.lon, self.lat, self.located_by = locate_places(recommender.names, addresses, pois)
+        self.located = np.flatnonzero(np.isfinite(self.lon) & np.isfinite(self.lat))
+        self._xy = to_projected(np.column_stack([self.lon[self.located], self.lat[self.located]]))
+        self._tree = None
+        self._costs = OrderedDict()
+
+    def _kdtree(self):
+        from scipy.spatial import cKDTree
+
+        if self._tree is None:
+            self._tree = cKDTree(self._xy)
+        return self._tree
+
+    def candidates_near(self, stops, radius=DEFAULT_RADIUS_M):
+        """정류장 반경 안의 후보 장소 번호 (recommender.names 기준)"""
+        if len(self.located) == 0:
+            return np.array([], dtype=np.int64)
+        hits = self._kdtree().query_ball_point(to_projected(stops), r=radius)
+        rows = sorted({j for row in hits for j in row})
+        return self.located[rows]
+
+    def _cached_costs(self, key, cost_fn, stops, targets):
+        """같은 경로/모드/후보 집합이면 비용 행렬 재사용 (LRU)"""
+        if key in self._costs:
+            self._costs.move_to_end(key)
+            return self._costs[key]
+        result = cost_fn(stops, targets)
+        self._costs[key] = result
+        if len(self._costs) > COST_CACHE_SIZE:
+            self._costs.popitem(last=False)
+        return result
+
+    def insertion_costs(self, stops, candidates, cost_fn, cache_key=None):
+        """후보별 (최소 추가 비용 초, 그때의 삽입 위치). 위치 p = stops[p] 다음"""
+        stops = np.asarray(stops, dtype=float).reshape(-1, 2)
+        points = np.column_stack([self.lon[candidates], self.lat[candidates]])
+        targets = np.vstack([stops, points])
+        if cache_key is not None:
+            cache_key = (cache_key, tuple(map(tuple, stops.round(6))), tuple(candidates.tolist()))
+            out, back = self._cached_costs(cache_key, cost_fn, stops, targets)
+        else:
+            out, back = cost_fn(stops, targets)
+        n = len(stops)
+        base = out[np.arange(n - 1), np.arange(1, n)]  # stops[i] → stops[i+1]
+        out_c, back_c = out[:, n:], back[:, n:]
+        added = np.empty((n, len(candidates)))
+        added[:-1] = out_c[:-1] + back_c[1:] - base[:, None]
+        added[-1] = out_c[-1]  # 마지막 정류장 뒤에 붙이기
+        added[~np.isfinite(added)] = np.inf
+        position = np.argmin(added, axis=0)
+        return added[position, np.arange(len(candidates))], position
+
+    def recommend(self, stops, styles, k=5, cost_fn=None, popularity=0.0, detour_weight=DEFAULT_DETOUR_WEIGHT,
+                  radius=DEFAULT_RADIUS_M, exclude=(), cache_key=None):
+        """현재 경로(stops: 방문 순서 좌표)에 넣기 좋은 장소 상위 k개"""
+        if len(stops) == 0:
+            return []
+        cost_fn = cost_fn or haversine_costs(FALLBACK_SPEED_MPS["drive"])
+        candidates = self.candidates_near(stops, radius)
+        if exclude:
+            skip = {self.recommender.index.get(name) for name in exclude}
+            candidates = np.array([c for c in candidates if c not in skip], dtype=np.int64)
+        if len(candidates) == 0:
+            return []
+
+        style = self.recommender.score(styles, popularity)
+        top = style.max()
+        style = style / top if top > 0 else style
+        detour, position = self.insertion_costs(stops, candidates, cost_fn, cache_key)
+        score = style[candidates] - detour_weight * detour / 3600.0
+
+        k = min(k, len(candidates))
+        best = np.argpartition(-score, k - 1)[:k]
+        best = best[np.argsort(-score[best], kind="stable")]
+        results = []
+        for j in best:
+            if not np.isfinite(score[j]):
+                continue
+            i = candidates[j]
+            style_name = self.recommender.top_style(i, styles)
+            results.append(RouteRecommendation(
+                self.recommender.names[i], float(score[j]), float(style[i]), float(detour[j]), int(position[j]),
+                float(self.lon[i]), float(self.lat[i]), self.located_by[i], style_name, self.recommender.urls[i],
+            ))
+        return results
+
+    def coverage(self):
+        """좌표를 찾은 방법별 장소 수"""
+        return pd.Series(self.located_by).replace("", "없음").value_counts().to_dict()
@@ -0,0 +1,147 @@
+"""리뷰 문장 점수 매기기: 감성(p_n), 핵심 키워드(key_word), 여행 성향 10개 키워드 수
+
+final_result.csv의 p_n/key_word와 감성분석 CSV의 성향 열(힐링…맛집탐방)을 새 리뷰로 다시 만들 때 쓴다.
+사전(어간 목록) 기반이라 외부 모델 없이 프로세스 풀에서 그대로 돌릴 수 있다.
+성향 점수 공식은 기존 감성분석 CSV와 같다:
+  Cnt_norm = Cnt / max(Cnt),  {성향}_추천점수 = 0.7 × 성향 키워드 수 + 0.3 × Cnt_norm
+"""
+import re
+import unicodedata
+
+import numpy as np
+
+from .recommend import SCORE_COLUMNS, STYLES
+
+STYLE_WEIGHT = 0.7
+POPULARITY_WEIGHT = 0.3
+MAX_KEYWORDS = 3
+
+# 성향별 키워드 어간 (리뷰/장소명에 들어 있으면 1회로 셈)
+STYLE_KEYWORDS = {
+    "힐링": ("힐링", "여유", "조용", "한적", "휴식", "편안", "산책", "쉬어", "평화"),
+    "감성": ("감성", "분위기", "아늑", "인테리어", "예쁜", "이쁜", "예뻐", "이뻐", "낭만"),
+    "자연": ("자연", "바다", "숲", "오름", "풍경", "경치", "해변", "해수욕", "폭포", "한라산", "올레", "수국", "일출"),
+    "체험": ("체험", "만들기", "공방", "박물관", "전시", "미술관", "승마", "귤따기", "테마파크"),
+    "커플": ("커플", "데이트", "연인", "애인", "남자친구", "여자친구", "남친", "여친", "기념일"),
+    "가족": ("가족", "아이랑", "아이들", "아이와", "아기", "부모님", "어른", "키즈", "애들", "엄마", "아빠"),
+    "액티비티": ("액티비티", "카트", "서핑", "다이빙", "패러", "짚라인", "스노클", "카약", "레저", "요트", "잠수함"),
+    "사진명소": ("사진", "포토", "인생샷", "인스타", "전망", "뷰", "일출봉", "찍기"),
+    "카페투어": ("카페", "커피", "라떼", "디저트", "베이커리", "케이크", "빵", "음료", "아이스크림"),
+    "맛집탐방": ("맛집", "맛있", "맛나", "식당", "음식", "흑돼지", "갈치", "고기", "국밥", "해산물", "회덮밥", "밥집"),
+}
+
+POSITIVE = (
+    "좋", "맛있", "맛나", "친절", "추천", "최고", "만족", "예쁘", "예뻐", "이쁘", "이뻐", "깔끔", "행복", "감동",
+    "대박", "훌륭", "멋있", "멋지", "멋져", "멋쪄", "멋진", "편안", "편하", "편한", "아늑", "재밌", "재미있", "즐거",
+    "신선", "고소", "강추", "굿", "굳", "사랑", "맛집", "짱", "완벽", "끝내주", "끝판", "아름다", "환상", "괜찮",
+    "시원", "넓", "재방문", "탁트", "특별", "쵝오",
+)
+NEGATIVE = (
+    "별로", "실망", "불친절", "비싸", "최악", "아쉽", "아쉬", "더러", "불편", "짜증", "느리", "늦게나", "냄새나",
+    "덥", "더워", "춥", "추워", "시끄", "좁", "후회", "그저그", "슬펐", "불만",
+)
+
+# key_word 후보에서 떼어낼 조사/어미 (긴 것부터)
+_SUFFIXES = tuple(sorted(
+    ("이에요", "예요", "에서", "으로", "까지", "부터", "이랑", "랑", "하고", "도", "는", "은", "이", "가", "을", "를",
+     "에", "의", "와", "과", "로", "요", "네요", "해요", "했어요", "어요", "아요", "습니다", "ㅎㅎ", "ㅋㅋ"),
+    key=len, reverse=True,
+))
+_WORD = re.compile(r"[가-힣A-Za-z]+")
+_ASPECTS = ("뷰", "분위기", "맛", "친절", "가격", "가성비", "인테리어", "주차", "서비스", "양", "풍경", "경치", "사장님")
+
+
+def normalize_text(text):
+    """NFC + 공백 정리 (문자열이 아니면 빈 문자열)"""
+    if not isinstance(text, str):
+        return ""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def _negated(words, i):
+    """i번째 어절의 긍정 표현이 부정되는지 ('안 좋아요', '좋지 않아요', '맛없')"""
+    word = words[i]
+    if i > 0 and words[i - 1] in ("안", "못"):
+        return True
+    if word.endswith(("지않", "지않아요", "지않았어요")) or "없" in word:
+        return True
+    return i + 1 < len(words) and words[i + 1].startswith(("않", "없"))
+
+
+def sentiment(text):
+    """'positive' / 'negative' / 'mixing' / 'neutral' (긍정·부정 표현 수 비교)"""
+    words = _WORD.findall(text)
+    pos = neg = 0
+    for i, word in enumerate(words):
+        if any(stem in word for stem in NEGATIVE):
+            neg += 1
+        elif any(stem in word for stem in POSITIVE):
+            if _negated(words, i):
+                neg += 1
+            else:
+                pos += 1
+    if pos and neg:
+        if pos >= 2 * neg:
+            return "positive"
+        if neg >= 2 * pos:
+            return "negative"
+        return "mixing"
+    if pos:
+        return "positive"
+    if neg:
+        return "negative"
+    return "neutral"
+
+
+def _strip_suffix(word):
+    for suffix in _SUFFIXES:
+        if len(word) > len(suffix) + 1 and word.endswith(suffix):
+            return word[:-len(suffix)]
+    return word
+
+
+def keywords(text, k=MAX_KEYWORDS):
+    """'뷰, 맛있었고, 친절' 처럼 리뷰에서 감성/속성 표현이 든 어절 k개 (나온 순서, 없으면 긴 어절)"""
+    words = [_strip_suffix(w) for w in _WORD.findall(text)]
+    stems = POSITIVE + NEGATIVE + _ASPECTS
+    picked = []
+    for word in words:
+        if word not in picked and any(stem in word for stem in stems):
+            picked.append(word)
+            if len(picked) == k:
+                break
+    if len(picked) < k:
+        for word in sorted(dict.fromkeys(words), key=len, reverse=True):
+            if word not in picked and len(word) >= 2:
+                picked.append(word)
+                if len(picked) == k:
+                    break
+    return ", ".join(picked)
+
+
+def style_counts(text):
+    """성향별 키워드 수 (STYLES 순서)"""
+    return [sum(stem in text for stem in STYLE_KEYWORDS[style]) for style in STYLES]
+
+
+def score_texts(texts):
+    """리뷰 목록 → (p_n 목록, key_word 목록, 성향 수 int 배열 N×10). 프로세스 풀 작업 단위"""
+    texts = [normalize_text(t) for t in texts]
+    counts = np.array([style_counts(t) for t in texts], dtype=np.int64).reshape(len(texts), len(STYLES))
+    return [sentiment(t) for t in texts], [keywords(t) for t in texts], counts
+
+
+def style_scores(df):
+    """Cnt와 성향 수 열로 Cnt_norm, *_추천점수, 최고추천성향, 최고추천점수를 다시 계산한 DataFrame"""
+    df = df.copy()
+    cnt = df["Cnt"].astype(float)
+    df["Cnt_norm"] = cnt / cnt.max() if len(df) and cnt.max() > 0 else 0.0
+    counts = df[STYLES].to_numpy(dtype=float)
+    scores = STYLE_WEIGHT * counts + POPULARITY_WEIGHT * df["Cnt_norm"].to_numpy(dtype=float)[:, None]
+    for i, col in enumerate(SCORE_COLUMNS):
+        df[col] = scores[:, i]
+    # 동점이면 STYLES 순서가 앞선 성향 (기존 CSV와 같은 규칙)
+    best = scores.argmax(axis=1) if len(df) else np.zeros(0, dtype=int)
+    df["최고추천성향"] = np.array(STYLES, dtype=object)[best]
+    df["최고추천점수"] = scores.max(axis=1) if len(df) else []
+    return df
@@ -0,0 +1,552 @@
+"""화면(Streamlit)과 HTTP API가 같이 쓰는 핵심 기능
+
+데이터 번들과 인덱스는 처음 필요할 때 한 번 만들어 프로세스 안에서 공유한다(읽기 전용).
+요청별 상태는 인자로만 받으므로 워커를 여러 개 띄워도 된다.
+region을 주는 조회(nearby/recommend/route_recommendations/place_names)는 그 지역 행만으로 만든
+지역별 인덱스('poi_index:제주시 애월읍' 등, 처음 쓸 때 만듦)를 쓴다.
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from . import tracing
+from .bundle import DEFAULT_BUNDLE_DIR, assign_regions, load_bundle, read_regions
+from .directions import MAX_CONCURRENCY, api_profile, fetch_route_legs
+from .geo import haversine_matrix
+from .itinerary import DEFAULT_DAY_HOURS, DEFAULT_DWELL_MIN, cluster_days, plan_days
+from .legcache import LegCache
+from .names import NameIndex
+from .pipeline import DEFAULT_OUT_DIR as DEFAULT_SCORES_DIR, current_version as current_scores_version, load_current
+from .poi_clusters import POIClusters
+from .polyline import as_coords
+from .poi_index import POIIndex
+from .recommend import StyleRecommender, check_styles
+from .regions import REGION_COLUMN, RegionIndex
+from .restaurants import RestaurantSummaries
+from .retrieval import INDEX_DIR as REVIEW_INDEX_DIR, ReviewIndex
+from .road_graph import RoadGraph, network_for_mode
+from .route_recommend import DETOUR_FACTOR, FALLBACK_SPEED_MPS, RouteRecommender, haversine_costs
+from .spots import SpotIndex
+from .tsp import OPEN_END, RETURN_TO_START, repair as repair_tour, solve as solve_tour
+
+ENGINE_MAPBOX = "mapbox"
+ENGINE_OFFLINE = "offline"
+LODGING_AUTO = "auto"  # 날짜별 일정 중심에서 가장 가까운 숙소
+REFRESH_INTERVAL = 5.0  # 점수 파이프라인 새 버전 확인 간격(초)
+# 점수 파이프라인 출력(맛집/성향 표)이 바뀌면 다시 만들어야 하는 인덱스
+# (지역별 'style_recommender:{지역}' 같은 키도 ':' 앞 이름으로 함께 버린다)
+SCORED_RESOURCES = ("scores", "name_index", "restaurant_summaries", "review_index",
+                    "style_recommender", "route_recommender", "place_regions", "place_names")
+
+
+class RouteResult(NamedTuple):
+    order: list  # 방문 순서 장소명
+    segments: list  # 구간별 [lon, lat] 좌표 리스트 (또는 jejuon.polyline encoded 문자열)
+    duration: float  # 분
+    distance: float  # km
+    warning: str = None  # 구간 계산 중 오류가 있었으면 메시지 (직선으로 대체됨)
+    leg_stats: list = None  # 구간별 (소요시간 초, 거리 m), 직선으로 대체된 구간은 None
+
+
+class TripDay(NamedTuple):
+    day: int  # 1부터
+    lodging: str  # 숙소명 (없으면 None)
+    order: list  # 방문 순서 장소명 (숙소 제외)
+    coords: list  # 숙소 → 장소들 → 숙소 순서의 (lon, lat)
+    travel: float  # 이동시간 추정(분)
+    dwell: float  # 체류시간 합(분)
+    budget: float  # 하루 예산(분)
+    over_budget: bool
+
+
+def engine_name(engine):
+    """화면 라벨('오프라인 도로망' 등)도 받아서 mapbox/offline 으로"""
+    return ENGINE_OFFLINE if engine in (ENGINE_OFFLINE, "오프라인 도로망") else ENGINE_MAPBOX
+
+
+class TravelService:
+    def __init__(self, mapbox_token=None, bundle_dir=DEFAULT_BUNDLE_DIR, leg_cache_path=None,
+                 scores_dir=DEFAULT_SCORES_DIR):
+        self.mapbox_token = mapbox_token or os.environ.get("MAPBOX_TOKEN")
+        self.bundle_dir = bundle_dir
+        self.leg_cache_path = leg_cache_path
+        self.scores_dir = scores_dir
+        self._lock = threading.RLock()
+        self._resources = {}
+        self._checked = time.monotonic()
+
+    def _resource(self, key, factory):
+        """처음 한 번만 factory() 실행 (스레드 안전)"""
+        value = self._resources.get(key)
+        if value is None:
+            with self._lock:
+                value = self._resources.get(key)
+                if value is None:
+                    with tracing.span(f"build.{key.split(':')[0]}"):
+                        value = factory()
+                    self._resources[key] = value
+        return value
+
+    # 데이터/인덱스
+    @property
+    def bundle(self):
+        return self._resource("bundle", lambda: load_bundle(self.bundle_dir))
+
+    @property
+    def scores(self):
+        """점수 파이프라인(jejuon.pipeline) 현재 출력 (테이블 dict, 버전). 없으면 None"""
+        def build():
+            loaded = load_current(self.scores_dir)
+            if not loaded:
+                return False
+            # 이전 버전 파이프라인 출력에는 region 열이 없을 수 있다
+            tables, version = loaded
+            index = self.region_index
+            if index is not None:
+                pois = self.bundle[0]["all_pois"]
+                tables = {name: df if REGION_COLUMN in df else assign_regions(name, df, index, pois)
+                          for name, df in tables.items()}
+            return tables, version
+
+        return self._resource("scores", build) or None
+
+    @property
+    def tables(self):
+        """번들 테이블 (파이프라인 출력이 있으면 restaurants/style_scores는 그 버전으로)"""
+        scores = self.scores
+        return dict(self.bundle[0], **scores[0]) if scores else self.bundle[0]
+
+    @property
+    def boundary(self):
+        return self.bundle[1]
+
+    @property
+    def data_version(self):
+        scores = self.scores
+        return self.bundle[2]["version"] + (f"+{scores[1]}" if scores else "")
+
+    def refresh(self, force=False):
+        """파이프라인 CURRENT가 바뀌었으면 점수 표에 의존하는 인덱스를 버린다 (다음 접근 때 새 버전으로 다시 만듦)
+
+        REFRESH_INTERVAL마다 한 번만 파일을 확인한다. 반환: 바꿨으면 True
+        """
+        now = time.monotonic()
+        if not force and now - self._checked < REFRESH_INTERVAL:
+            return False
+        self._checked = now
+        loaded = self._resources.get("scores")
+        if loaded is None:
+            return False  # 아직 읽지 않았으면 처음 접근할 때 최신 버전을 읽는다
+        if current_scores_version(self.scores_dir) == (loaded[1] if loaded else None):
+            return False
+        with self._lock:
+            for key in [k for k in self._resources if k.split(":")[0] in SCORED_RESOURCES]:
+                self._resources.pop(key, None)
+        return True
+
+    @property
+    def region_index(self):
+        """지역 경계 STRtree (번들에 지역 경계가 없으면 None)"""
+        def build():
+            layer = read_regions(self.bundle_dir, self.bundle[2])
+            return RegionIndex(layer) if layer is not None else False
+
+        return self._resource("region_index", build) or None
+
+    @property
+    def regions(self):
+        """지역 이름 목록 (가나다순)"""
+        index = self.region_index
+        return sorted(index.names) if index is not None else []
+
+    def _regional(self, name, region):
+        """테이블에서 region 행만 (인덱스 번호는 원래 테이블 그대로)"""
+        df = self.tables[name]
+        if region not in self.regions:
+            raise ValueError(f"알 수 없는 지역이에요: {region}")
+        return df[df[REGION_COLUMN] == region] if REGION_COLUMN in df else df.iloc[:0]
+
+    @property
+    def name_index(self):
+        return self._resource("name_index", lambda: NameIndex.from_frames(self.tables["poi_data"], self.tables["restaurants"]))
+
+    @property
+    def poi_index(self):
+        return self._resource("poi_index", lambda: POIIndex(self.tables["all_pois"]))
+
+    def regional_poi_index(self, region=None):
+        if not region:
+            return self.poi_index
+        return self._resource(f"poi_index:{region}", lambda: POIIndex(self._regional("all_pois", region)))
+
+    @property
+    def poi_clusters(self):
+        return self._resource("poi_clusters", lambda: POIClusters(self.tables["all_pois"]))
+
+    @property
+    def spot_index(self):
+        return self._resource("spot_index", lambda: SpotIndex(self.tables["spot_reviews"]))
+
+    @property
+    def restaurant_summaries(self):
+        return self._resource("restaurant_summaries", lambda: RestaurantSummaries(self.tables["restaurants"]))
+
+    @property
+    def style_recommender(self):
+        return self._resource("style_recommender", lambda: StyleRecommender(self.tables["style_scores"]))
+
+    @property
+    def route_recommender(self):
+        return self._resource("route_recommender", lambda: RouteRecommender(
+            self.style_recommender, self.tables["all_pois"], self.tables["style_scores"]
+        ))
+
+    def regional_style_recommender(self, region=None):
+        if not region:
+            return self.style_recommender
+        return self._resource(f"style_recommender:{region}",
+                              lambda: StyleRecommender(self._regional("style_scores", region)))
+
+    def regional_route_recommender(self, region=None):
+        """region 후보만 보는 경로 추천 (좌표 찾기는 섬 전체 POI로)"""
+        if not region:
+            return self.route_recommender
+        return self._resource(f"route_recommender:{region}", lambda: RouteRecommender(
+            self.regional_style_recommender(region), self.tables["all_pois"], self._regional("style_scores", region)
+        ))
+
+    @property
+    def place_regions(self):
+        """출발지/경유지 선택 목록의 장소명 → 지역 (좌표 전체를 한 번에 공간 조인)"""
+        def build():
+            places = list(self.name_index.exact.values())
+            index = self.region_index
+            if index is None:
+                return {}
+            regions = index.assign([p.lon for p in places], [p.lat for p in places])
+            return {p.name: r for p, r in zip(places, regions) if r is not None}
+
+        return self._resource("place_regions", build)
+
+    def place_names(self, region=None):
+        """선택 목록용 정렬된 장소명 (region이 있으면 그 지역 장소만)"""
+        if not region:
+            return self.name_index.sorted_names
+        if region not in self.regions:
+            raise ValueError(f"알 수 없는 지역이에요: {region}")
+        return self._resource(f"place_names:{region}", lambda: [
+            name for name in self.name_index.sorted_names if self.place_regions.get(name) == region
+        ])
+
+    @property
+    def lodgings(self):
+        """숙소명 → (lon, lat) (같은 이름은 첫 번째)"""
+        def build():
+            pois = self.tables["all_pois"]
+            rows = pois[pois["category"] == "숙박"].drop_duplicates("name")
+            return dict(zip(rows["name"], zip(rows["lon"].astype(float), rows["lat"].astype(float))))
+
+        return self._resource("lodgings", build)
+
+    @property
+    def review_index(self):
+        """리뷰 BM25 검색 인덱스 (번들 폴더에 저장, 번들 버전이 바뀌면 다시 빌드)"""
+        return self._resource("review_index", lambda: ReviewIndex.load(
+            self.tables, self.data_version, os.path.join(self.bundle_dir, REVIEW_INDEX_DIR)
+        ))
+
+    @property
+    def leg_cache(self):
+        return self._resource("leg_cache", lambda: LegCache(self.leg_cache_path) if self.leg_cache_path else LegCache())
+
+    def road_graph(self, network):
+        """미리 빌드한 오프라인 도로망 (없으면 None, 없다는 결과도 캐시)"""
+        key = f"road_graph:{network}"
+        graph = self._resource(key, lambda: RoadGraph.load(network) if RoadGraph.available(network) else False)
+        return graph or None
+
+    def warm_up(self):
+        """API 워커 시작 시 인덱스를 미리 만들어 첫 요청 지연을 없앤다"""
+        for name in ("name_index", "poi_index", "poi_clusters", "spot_index", "restaurant_summaries",
+                     "style_recommender", "route_recommender", "lodgings", "review_index", "leg_cache",
+                     "region_index", "place_regions"):
+            getattr(self, name)
+
+    # 조회
+    def coordinates(self, place_name):
+        """장소명으로 좌표 (관광 데이터 우선, 없으면 맛집 데이터의 관광지)"""
+        return self.name_index.coordinates(place_name)
+
+    def place_summary(self, place):
+        """관광지 평점/리뷰/주변 카페 + 주변 맛집 요약"""
+        with tracing.span("guide.summary"):
+            spot = self.spot_index.get(place)
+            restaurants = self.restaurant_summaries.for_spot(place)
+            return {
+                "place": place,
+                "coordinates": self.coordinates(place),
+                "rating": None if spot is None or spot.rating is None else float(spot.rating),
+                "reviews": list(spot.reviews) if spot else [],
+                "cafes_markdown": spot.cafes if spot else "",
+                "restaurants": [r._asdict() for r in restaurants],
+                "restaurants_markdown": self.restaurant_summaries.markdown(place),
+            }
+
+    def review_snippets(self, place, k=3):
+        """가이드 소개 프롬프트에 넣을 장소의 대표 리뷰 k개"""
+        with tracing.span("retrieval.representative", k=k):
+            return self.review_index.representative(place, k=k)
+
+    def search_reviews(self, query, places=None, k=5):
+        """질문과 관련 있는 리뷰 k개. places가 없으면 질문에 나온 관광지로 좁히고, 거기서 못 찾으면 전체에서"""
+        with tracing.span("retrieval.search", k=k) as sp:
+            index = self.review_index
+            spots = places or index.mentioned_spots(query)
+            hits = index.search(query, spots, k=k) if spots else []
+            if not hits:
+                hits = index.search(query, k=k)
+            sp.set(spots=len(spots or ()), hits=len(hits))
+            return hits
+
+    def nearby(self, stops=(), segments=(), categories=None, k=10, radius=500.0, region=None):
+        with tracing.span("nearby", categories=",".join(categories or []), region=region or ""):
+            return self.regional_poi_index(region).nearby(stops, segments, categories, k=k, radius=radius)
+
+    def recommend(self, styles, k=3, popularity=0.0, region=None):
+        """성향 점수 상위 k곳 (모르는 성향이면 ValueError)"""
+        check_styles(styles)
+        with tracing.span("recommend.style", region=region or ""):
+            return self.regional_style_recommender(region).top(styles, k=k, popularity=popularity)
+
+    def route_recommendations(self, order, styles, mode="driving", engine=ENGINE_MAPBOX, k=5, popularity=0.0,
+                              region=None):
+        """현재 방문 순서에 끼워 넣기 좋은 장소 (region이 있으면 그 지역 후보만)
+
+        position은 order 인덱스 (order[position] 다음에 넣기). 좌표가 없는 장소는 비용 계산에서 빠진다.
+        모르는 성향이면 ValueError.
+        """
+        check_styles(styles)
+        network = network_for_mode(mode)
+        graph = self.road_graph(network) if engine_name(engine) == ENGINE_OFFLINE else None
+        cost_fn = graph.costs_between if graph is not None else haversine_costs(FALLBACK_SPEED_MPS[network])
+        coords = [self.coordinates(p) for p in order]
+        located = [i for i, c in enumerate(coords) if c]
+        stops = [coords[i] for i in located]
+        with tracing.span("recommend.route", stops=len(stops), engine=engine_name(engine), region=region or ""):
+            recs = self.regional_route_recommender(region).recommend(
+                stops, styles, k=k, cost_fn=cost_fn, popularity=popularity,
+                exclude=order, cache_key=(engine_name(engine), network),
+            )
+        # 추천기의 position은 좌표가 있는 정류장 목록 기준 → 원래 방문 순서 인덱스로
+        return [rec._replace(position=located[rec.position]) for rec in recs]
+
+    # 경로
+    def cost_matrix(self, points, mode, road_graph=None):
+        """순서 결정용 비용 행렬: 도로망 소요시간 → 캐시된 이동시간 → haversine 직선거리(m)"""
+        if road_graph is not None:
+            graph_matrix = road_graph.matrix(points)
+            if np.isfinite(graph_matrix).all():
+                return graph_matrix
+        durations, _ = self.leg_cache.matrix(api_profile(mode), points)
+        if all(v is not None for row in durations for v in row):
+            return np.array(durations, dtype=float)
+        return haversine_matrix(points)
+
+    def travel_times(self, points, mode, road_graph=None):
+        """이동시간 행렬(초): 도로망 → 캐시된 구간 → 직선거리 × 우회 계수 / 평균 속도 (빈 칸만 추정으로 채움)"""
+        points = np.asarray(points, dtype=float)
+        estimate = haversine_matrix(points) * DETOUR_FACTOR / FALLBACK_SPEED_MPS[network_for_mode(mode)]
+        if road_graph is not None:
+            graph_matrix = road_graph.matrix(points)
+            return np.where(np.isfinite(graph_matrix), graph_matrix, estimate)
+        durations, _ = self.leg_cache.matrix(api_profile(mode), points)
+        cached = np.array([[np.nan if v is None else v for v in row] for row in durations], dtype=float)
+        return np.where(np.isnan(cached), estimate, cached)
+
+    def plan_trip(self, places, days, mode="driving", engine=ENGINE_MAPBOX, lodging=None,
+                  dwell=DEFAULT_DWELL_MIN, day_hours=DEFAULT_DAY_HOURS, dwell_by_place=None):
+        """장소들을 days일로 나누고 날마다 방문 순서 최적화 (구간 경로는 받지 않음, route_through로 따로)
+
+        lodging: None=숙소 없이, LODGING_AUTO=날마다 가장 가까운 숙소, 숙소명=매일 그 숙소
+        dwell: 장소별 기본 체류시간(분), dwell_by_place: {장소명: 분}
+        반환: TripDay 목록. 좌표를 못 찾은 장소는 빠진다.
+        """
+        places = [p for p in dict.fromkeys(places) if self.coordinates(p)]
+        if not places or days < 1:
+            return []
+        coords = [tuple(self.coordinates(p)) for p in places]
+        with tracing.span("itinerary.cluster", places=len(places), days=days):
+            labels, centers = cluster_days(coords, days)
+
+        # 날짜별 숙소 → 행렬 인덱스 (장소 뒤에 붙임)
+        if lodging == LODGING_AUTO:
+            day_lodgings = [self._nearest_lodging(lon, lat) for lon, lat in centers]
+        elif lodging in self.lodgings:
+            day_lodgings = [lodging] * len(centers)
+        else:
+            day_lodgings = [None] * len(centers)
+        lodging_names = [name for name in dict.fromkeys(day_lodgings) if name is not None]
+        points = coords + [self.lodgings[name] for name in lodging_names]
+        anchors = [None if name is None else len(coords) + lodging_names.index(name) for name in day_lodgings]
+
+        road_graph = self.road_graph(network_for_mode(mode)) if engine_name(engine) == ENGINE_OFFLINE else None
+        with tracing.span("itinerary.travel_times", points=len(points)):
+            times = self.travel_times(points, mode, road_graph)
+        dwell_sec = np.array([(dwell_by_place or {}).get(p, dwell) * 60.0 for p in places])
+        with tracing.span("itinerary.plan", places=len(places), days=len(centers)):
+            plans = plan_days(times, labels, dwell_sec, day_hours * 3600.0, anchors)
+
+        trip = []
+        for plan in plans:
+            name = day_lodgings[plan.day - 1]
+            stop_coords = [coords[i] for i in plan.stops]
+            if name is not None:
+                stop_coords = [self.lodgings[name]] + stop_coords + [self.lodgings[name]]
+            trip.append(TripDay(
+                plan.day, name, [places[i] for i in plan.stops], stop_coords,
+                plan.travel / 60, plan.dwell / 60, plan.budget / 60, plan.over_budget,
+            ))
+        return trip
+
+    def _nearest_lodging(self, lon, lat):
+        """묶음 중심에서 가장 가까운 숙소명 (중심 좌표가 없거나 숙소가 없으면 None)"""
+        if not (np.isfinite(lon) and np.isfinite(lat)):
+            return None
+        nearest = self.poi_index.nearest(lon, lat, ["숙박"], k=1)
+        return nearest["name"].iloc[0] if len(nearest) else None
+
+    def _fetch_legs(self, route_coords, mode, road_graph):
+        """정해진 순서의 구간들. ([(좌표 리스트, 초, m) 또는 None], 경고)"""
+        try:
+            with tracing.span("route.legs", engine=ENGINE_OFFLINE if road_graph is not None else ENGINE_MAPBOX,
+                              legs=len(route_coords) - 1):
+                if road_graph is not None:
+                    return road_graph.route_legs(route_coords), None
+                if not self.mapbox_token:
+                    return [None] * (len(route_coords) - 1), "MAPBOX_TOKEN이 없어 직선 경로로 표시합니다."
+                return fetch_route_legs(route_coords, mode, self.mapbox_token, cache=self.leg_cache), None
+        except Exception as e:
+            return [None] * (len(route_coords) - 1), f"경로 계산 중 오류: {str(e)}"
+
+    @staticmethod
+    def _route_result(order, route_coords, legs, warning):
+        segments = []
+        leg_stats = []
+        for i, leg in enumerate(legs):
+            if leg:
+                geometry, leg_duration, leg_distance = leg
+                segments.append(geometry)
+                leg_stats.append((leg_duration, leg_distance))
+            else:
+                # API 실패시 직선 거리로 대체
+                coord1, coord2 = route_coords[i], route_coords[i + 1]
+                segments.append([[coord1[0], coord1[1]], [coord2[0], coord2[1]]])
+                leg_stats.append(None)
+        total_duration = sum(stat[0] for stat in leg_stats if stat)
+        total_distance = sum(stat[1] for stat in leg_stats if stat)
+        return RouteResult(list(order), segments, total_duration / 60, total_distance / 1000, warning, leg_stats)
+
+    def route_through(self, order, coords, mode="driving", engine=ENGINE_MAPBOX):
+        """순서를 바꾸지 않고 coords를 차례로 잇는 경로 (여러 날 일정의 하루 등)"""
+        if len(coords) < 2:
+            return RouteResult(list(order), [], 0.0, 0.0)
+        road_graph = self.road_graph(network_for_mode(mode)) if engine_name(engine) == ENGINE_OFFLINE else None
+        route_coords = [tuple(c) for c in coords]
+        legs, warning = self._fetch_legs(route_coords, mode, road_graph)
+        return self._route_result(order, route_coords, legs, warning)
+
+    def _resolve_places(self, start, waypoints):
+        """출발지 + (중복/좌표 없는 곳을 뺀) 경유지 목록과 좌표 dict. 경로를 만들 수 없으면 None"""
+        coords_dict = {}
+        for place in [start] + list(waypoints):
+            coord = self.coordinates(place)
+            if coord and not (pd.isna(coord[0]) or pd.isna(coord[1])):
+                coords_dict[place] = coord
+        valid_waypoints = [w for w in waypoints if w in coords_dict and w != start]
+        if start not in coords_dict or not valid_waypoints:
+            return None
+        return [start] + list(dict.fromkeys(valid_waypoints)), coords_dict
+
+    @staticmethod
+    def _end_index(places, end):
+        """도착지: 자유(None) / 출발지 복귀 / 특정 경유지"""
+        if end == places[0]:
+            return RETURN_TO_START
+        if end in places[1:]:
+            return places.index(end)
+        return OPEN_END
+
+    def shortest_route(self, start, waypoints, mode="driving", end=None, engine=ENGINE_MAPBOX):
+        """최단거리 기준으로 경로 최적화 (end: None=도착 자유, start=출발지 복귀, 경유지명=그 곳에서 종료)"""
+        empty = RouteResult([start], [], 0.0, 0.0)
+        resolved = self._resolve_places(start, waypoints) if waypoints else None
+        if resolved is None:
+            return empty
+        places, coords_dict = resolved
+
+        road_graph = self.road_graph(network_for_mode(mode)) if engine_name(engine) == ENGINE_OFFLINE else None
+        points = np.array([coords_dict[p] for p in places], dtype=float)
+        with tracing.span("route.cost_matrix", stops=len(places)):
+            cost_matrix = self.cost_matrix(points, mode, road_graph)
+        with tracing.span("route.solve", stops=len(places)):
+            order_idx, _ = solve_tour(cost_matrix, start=0, end=self._end_index(places, end))
+
+        # 최적화된 순서로 경로 계산 (캐시에 없는 구간만 한 번에/동시에 요청)
+        final_order = [places[i] for i in order_idx]
+        route_coords = [coords_dict[p] for p in final_order]
+        legs, warning = self._fetch_legs(route_coords, mode, road_graph)
+        return self._route_result(final_order, route_coords, legs, warning)
+
+    def update_route(self, previous, start, waypoints, mode="driving", end=None, engine=ENGINE_MAPBOX):
+        """이전 결과(previous, 같은 이동 모드/엔진)에서 경유지 추가/삭제만 반영한 경로
+
+        빠진 경유지는 순서에서 떼어 내고 새 경유지는 가장 싼 위치에 끼워 넣은 뒤 잠깐 지역 탐색한다.
+        이전 결과와 같은 구간(장소 쌍)은 좌표/시간을 그대로 쓰고 바뀐 구간만 다시 받는다.
+        이전 결과가 없거나 출발지가 바뀌었으면 shortest_route와 같다.
+        """
+        if previous is None or not previous.order or previous.order[0] != start or previous.leg_stats is None:
+            return self.shortest_route(start, waypoints, mode, end=end, engine=engine)
+        resolved = self._resolve_places(start, waypoints) if waypoints else None
+        if resolved is None:
+            return RouteResult([start], [], 0.0, 0.0)
+        places, coords_dict = resolved
+
+        road_graph = self.road_graph(network_for_mode(mode)) if engine_name(engine) == ENGINE_OFFLINE else None
+        points = np.array([coords_dict[p] for p in places], dtype=float)
+        with tracing.span("route.cost_matrix", stops=len(places)):
+            cost_matrix = self.cost_matrix(points, mode, road_graph)
+        index = {p: i for i, p in enumerate(places)}
+        kept = [index[p] for p in previous.order if p in index]
+        with tracing.span("route.repair", stops=len(places), added=len(set(places) - set(previous.order))):
+            order_idx, _ = repair_tour(cost_matrix, kept, start=0, end=self._end_index(places, end))
+
+        final_order = [places[i] for i in order_idx]
+        route_coords = [coords_dict[p] for p in final_order]
+        known = {
+            pair: (as_coords(segment), *stat)
+            for pair, segment, stat in zip(zip(previous.order, previous.order[1:]), previous.segments, previous.leg_stats)
+            if stat is not None
+        }
+        legs = [known.get(pair) for pair in zip(final_order, final_order[1:])]
+
+        # 바뀐 구간만, 이어진 구간끼리 묶어서 동시에 받기
+        runs = []
+        for i, leg in enumerate(legs):
+            if leg is None:
+                if runs and runs[-1][1] == i:
+                    runs[-1][1] = i + 1
+                else:
+                    runs.append([i, i + 1])
+        warning = None
+        if runs:
+            fetch = tracing.propagate(lambda run: self._fetch_legs(route_coords[run[0]:run[1] + 1], mode, road_graph))
+            with ThreadPoolExecutor(max_workers=min(len(runs), MAX_CONCURRENCY)) as pool:
+                for (i, j), (fetched, run_warning) in zip(runs, pool.map(fetch, runs)):
+                    legs[i:j] = fetched
+                    warning = warning or run_warning
+        return self._route_result(final_order, route_coords, legs, warning)
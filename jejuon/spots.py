@@ -0,0 +1,91 @@
+"""관광지별 가이드 정보 인덱스 (cj_data_final.csv)
+
+시작할 때 t_name 별로 한 번 묶어서 평점, 걸러진 방문자 리뷰, 주변 카페 마크다운을 미리 만들어 둔다.
+요청마다 하는 일은 dict 조회 한 번.
+"""
+from typing import NamedTuple
+
+from .names import nfc
+
+NO_REVIEW = ("없음", "없읍")
+MAX_REVIEWS = 3
+MAX_PARTIAL = 4096
+
+
+def has_review(text):
+    """'리뷰 없음/없읍' 같은 빈 리뷰가 아니면 True"""
+    return all(x not in str(text) for x in NO_REVIEW)
+
+
+def format_cafes(cafes_df):
+    try:
+        cafes_df = cafes_df.drop_duplicates(subset=['c_name', 'c_value', 'c_review'])
+        if len(cafes_df) == 0:
+            return ("현재 이 관광지 주변에 등록된 카페 정보는 없어요. \n"
+                    "하지만 근처에 숨겨진 보석 같은 공간이 있을 수 있으니, \n"
+                    "지도를 활용해 천천히 걸어보시는 것도 추천드립니다 😊")
+        elif len(cafes_df) == 1:
+            row = cafes_df.iloc[0]
+            if has_review(row["c_review"]):
+                return f" **{row['c_name']}** (⭐ {row['c_value']}) \n\"{row['c_review']}\""
+            else:
+                return f"**{row['c_name']}** (⭐ {row['c_value']})"
+        else:
+            grouped = cafes_df.groupby(['c_name', 'c_value'])
+            lines = ["**주변의 평점 높은 카페들은 여기 있어요!** 🌼\n"]
+            for (name, value), group in grouped:
+                reviews = group['c_review'].dropna().unique()
+                reviews = [r for r in reviews if has_review(r)]
+                top_reviews = reviews[:MAX_REVIEWS]
+                if top_reviews:
+                    review_text = "\n".join([f"\"{r}\"" for r in top_reviews])
+                    lines.append(f"- **{name}** (⭐ {value}) \n{review_text}")
+                else:
+                    lines.append(f"- **{name}** (⭐ {value})")
+            return "\n\n".join(lines)
+    except Exception as e:
+        return f"카페 정보 처리 중 오류가 발생했습니다: {str(e)}"
+
+
+class SpotInfo(NamedTuple):
+    rating: object  # 관광지 평점 (없으면 None)
+    reviews: tuple  # 걸러진 방문자 리뷰 (최대 MAX_REVIEWS개)
+    cafes: str  # 주변 카페 마크다운
+
+
+def summarize_spot(rows):
+    """한 관광지(또는 이름이 겹치는 관광지들)의 행 → SpotInfo"""
+    ratings = rows["t_value"].dropna().unique()
+    reviews = [str(r).strip().strip('"') for r in rows["t_review"].dropna().unique() if has_review(r)]
+    reviews = [r for r in reviews if r]
+    cafes = format_cafes(rows[["c_name", "c_value", "c_review"]].drop_duplicates())
+    return SpotInfo(ratings[0] if len(ratings) > 0 else None, tuple(reviews[:MAX_REVIEWS]), cafes)
+
+
+class SpotIndex:
+    def __init__(self, df):
+        self._df = df.reset_index(drop=True)
+        self._groups = self._df.groupby("t_name", sort=False).indices
+        self.spots = {name: summarize_spot(self._df.iloc[idx]) for name, idx in self._groups.items()}
+        self._partial = {}
+
+    def get(self, place):
+        """정확한 관광지명 우선, 없으면 이름에 place가 들어간 관광지들을 합쳐서 (기존 str.contains 동작)"""
+        if place is None:
+            return None
+        key = nfc(place)
+        info = self.spots.get(key)
+        if info is not None or not key:
+            return info
+        if key not in self._partial:
+            idx = sorted(i for name, rows in self._groups.items() if key in name for i in rows)
+            if len(self._partial) >= MAX_PARTIAL:
+                self._partial.clear()
+            self._partial[key] = summarize_spot(self._df.iloc[idx]) if idx else None
+        return self._partial[key]
+
+    def __contains__(self, place):
+        return self.get(place) is not None
+
+    def __len__(self):
+        return len(self.spots)
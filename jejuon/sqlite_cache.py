@@ -0,0 +1,70 @@
+"""SQLite 파일 캐시 공통 부분 (TTL + 최대 개수 LRU) - 경로 구간 캐시와 GPT 완성 캐시가 같이 쓴다
+
+하위 클래스는 TABLE(테이블 이름), COLUMNS(created/accessed를 뺀 열 정의), 필요하면 KEY(표 제약)만 정한다.
+TTL이 지난 항목은 조회에서 무시되고, 최대 개수를 넘으면 가장 오래 안 쓰인 항목부터 지운다(LRU).
+정리(evict)는 쓰기마다가 아니라 EVICT_EVERY개를 쓸 때마다 또는 EVICT_INTERVAL초마다 한 번 한다.
+"""
+import os
+import sqlite3
+import threading
+import time
+
+EVICT_EVERY = 1000  # 이만큼 쓸 때마다 정리 (최대 개수를 이 정도 넘을 수 있음)
+EVICT_INTERVAL = 600.0  # 쓰기가 적어도 이 간격(초)마다는 정리
+
+
+class SQLiteCache:
+    TABLE = None
+    COLUMNS = None  # "key TEXT PRIMARY KEY, ..." (created, accessed 열은 자동으로 붙음)
+    KEY = None  # 여러 열 기본키 같은 표 제약 ("PRIMARY KEY (a, b)")
+
+    def __init__(self, path, ttl, max_entries):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0  # 마지막 정리 이후 쓴 항목 수
+        self._evicted = time.monotonic()
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        key = f", {self.KEY}" if self.KEY else ""
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.TABLE} "
+            f"({self.COLUMNS}, created REAL NOT NULL, accessed REAL NOT NULL{key})"
+        )
+        for col in ("accessed", "created"):
+            self._conn.execute(f"CREATE INDEX IF NOT EXISTS {self.TABLE}_{col} ON {self.TABLE} ({col})")
+
+    def _wrote(self, count):
+        """쓰기 뒤에 호출 (잠금 밖에서). 정리할 때가 되었으면 evict"""
+        with self._lock:
+            self._writes += count
+            due = self._writes >= EVICT_EVERY or time.monotonic() - self._evicted >= EVICT_INTERVAL
+        if due:
+            self.evict()
+
+    def evict(self):
+        """만료 항목 삭제 후 최대 개수를 넘으면 LRU 순으로 삭제"""
+        with self._lock:
+            self._writes = 0
+            self._evicted = time.monotonic()
+            self._conn.execute(f"DELETE FROM {self.TABLE} WHERE created < ?", (time.time() - self.ttl,))
+            count = self._conn.execute(f"SELECT COUNT(*) FROM {self.TABLE}").fetchone()[0]
+            if count > self.max_entries:
+                self._conn.execute(
+                    f"DELETE FROM {self.TABLE} WHERE rowid IN (SELECT rowid FROM {self.TABLE} ORDER BY accessed LIMIT ?)",
+                    (count - self.max_entries,),
+                )
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {self.TABLE}").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
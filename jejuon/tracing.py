@@ -0,0 +1,257 @@
+"""가벼운 단계별 계측: 구간(span) 소요시간, 캐시 적중/실패, 외부 API 지연
+
+    with span("route.solve", stops=8): ...
+    with external("mapbox.directions"): ...   # 외부 호출 (kind="external")
+    cache_event("leg_cache", hits=3, misses=1)
+
+- begin("rerun") 으로 Trace를 시작하면 그 실행(Streamlit rerun, HTTP 요청) 안의 기록이 모인다 (디버그 패널용).
+  스레드 풀에 넘기는 함수는 propagate(fn)으로 감싸야 같은 Trace/부모 span에 붙는다.
+- setup()을 부르면 prometheus_client가 있을 때 히스토그램/카운터로도 기록하고,
+  OTEL_EXPORTER_OTLP_ENDPOINT가 있으면 OpenTelemetry span을 로컬 collector로 보낸다.
+  둘 다 없으면 Trace에만 남는다 (오버헤드는 perf_counter 두 번 정도).
+
+Prometheus 값은 프로세스(워커)별이다. uvicorn 워커를 여러 개 띄우면 워커마다 따로 긁는다.
+"""
+import contextvars
+import os
+import threading
+import time
+
+_trace = contextvars.ContextVar("jejuon_trace", default=None)
+_parent = contextvars.ContextVar("jejuon_span", default=None)
+
+_setup_lock = threading.Lock()
+_metrics = None  # prometheus_client 지표 (setup 이후)
+_otel = None  # OpenTelemetry tracer (setup 이후)
+_status = {}
+
+
+class Trace:
+    """한 번의 실행 동안 끝난 span과 캐시 적중/실패 집계"""
+
+    def __init__(self, name):
+        self.name = name
+        self.started = time.perf_counter()
+        self.duration = None
+        self.spans = []  # 끝난 순서대로 dict(name, kind, depth, start, duration, error, attrs)
+        self.caches = {}  # cache -> [hits, misses]
+        self._lock = threading.Lock()
+        self._token = None
+
+    def _add_span(self, record):
+        with self._lock:
+            self.spans.append(record)
+
+    def _add_cache(self, cache, hits, misses):
+        with self._lock:
+            counts = self.caches.setdefault(cache, [0, 0])
+            counts[0] += hits
+            counts[1] += misses
+
+    def finish(self):
+        """Trace 종료 (begin 이전 상태로 되돌리고 전체 소요시간 기록)"""
+        if self.duration is None:
+            self.duration = time.perf_counter() - self.started
+            _observe(self.name, "trace", self.duration, False)
+        if self._token is not None:
+            _trace.reset(self._token)
+            self._token = None
+        return self
+
+    def breakdown(self):
+        """시작 순서로 정렬한 span 목록 (start/duration은 초, start는 Trace 시작 기준)"""
+        with self._lock:
+            return sorted(self.spans, key=lambda s: s["start"])
+
+    def totals(self, kind=None):
+        """span 이름별 (호출 수, 합계 초)"""
+        totals = {}
+        for s in self.breakdown():
+            if kind is None or s["kind"] == kind:
+                count, total = totals.get(s["name"], (0, 0.0))
+                totals[s["name"]] = (count + 1, total + s["duration"])
+        return totals
+
+
+class Span:
+    """span(...)이 돌려주는 객체. with 블록 또는 end()로 끝낸다 (시작은 만들 때)"""
+
+    def __init__(self, name, kind="stage", **attrs):
+        self.name = name
+        self.kind = kind
+        self.attrs = attrs
+        self.trace = _trace.get()
+        parent = _parent.get()
+        self.depth = parent.depth + 1 if parent is not None else 0
+        self.started = time.perf_counter()
+        self._token = _parent.set(self)
+        self._otel_span = self._otel_token = None
+        if _otel is not None:
+            from opentelemetry import context, trace
+
+            self._otel_span = _otel.start_span(name, attributes=_otel_attrs(dict(attrs, kind=kind)))
+            self._otel_token = context.attach(trace.set_span_in_context(self._otel_span))
+        self.duration = None
+
+    def rename(self, name):
+        """끝나기 전에 이름 바꾸기 (HTTP 요청처럼 시작할 때는 이름을 모르는 경우)"""
+        self.name = name
+        if self._otel_span is not None:
+            self._otel_span.update_name(name)
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+        if self._otel_span is not None:
+            self._otel_span.set_attributes(_otel_attrs(attrs))
+
+    def end(self, error=None):
+        if self.duration is not None:
+            return
+        self.duration = time.perf_counter() - self.started
+        try:
+            _parent.reset(self._token)
+        except ValueError:
+            # 다른 Context에서 끝내는 경우 (순서가 꼬인 수동 end) - 부모 복원만 생략
+            pass
+        if self._otel_span is not None:
+            from opentelemetry import context
+            from opentelemetry.trace import Status, StatusCode
+
+            if error is not None:
+                self._otel_span.record_exception(error)
+                self._otel_span.set_status(Status(StatusCode.ERROR, str(error)))
+            context.detach(self._otel_token)
+            self._otel_span.end()
+        _observe(self.name, self.kind, self.duration, error is not None)
+        if self.trace is not None:
+            self.trace._add_span({
+                "name": self.name,
+                "kind": self.kind,
+                "depth": self.depth,
+                "start": self.started - self.trace.started,
+                "duration": self.duration,
+                "error": None if error is None else f"{type(error).__name__}: {error}",
+                "attrs": dict(self.attrs),
+            })
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end(exc)
+        return False
+
+
+def span(name, **attrs):
+    """단계 하나의 소요시간 기록"""
+    return Span(name, **attrs)
+
+
+def external(name, **attrs):
+    """외부 API 호출 한 번의 지연 기록"""
+    return Span(name, kind="external", **attrs)
+
+
+def cache_event(cache, hits=0, misses=0):
+    """캐시 적중/실패 수 누적 (현재 Trace + Prometheus)"""
+    if not hits and not misses:
+        return
+    trace = _trace.get()
+    if trace is not None:
+        trace._add_cache(cache, hits, misses)
+    if _metrics is not None:
+        if hits:
+            _metrics["cache"].labels(cache, "hit").inc(hits)
+        if misses:
+            _metrics["cache"].labels(cache, "miss").inc(misses)
+
+
+def begin(name="rerun"):
+    """현재 Context에서 새 Trace 시작 (끝낼 때 trace.finish())"""
+    trace = Trace(name)
+    trace._token = _trace.set(trace)
+    return trace
+
+
+def current():
+    return _trace.get()
+
+
+def propagate(fn):
+    """지금의 Trace/부모 span을 다른 스레드에서도 쓰도록 fn을 감싼다 (호출마다 Context 복사)"""
+    ctx = contextvars.copy_context()
+
+    def run(*args, **kwargs):
+        return ctx.copy().run(fn, *args, **kwargs)
+
+    return run
+
+
+def _otel_attrs(attrs):
+    """OTel 속성은 str/bool/int/float(및 그 리스트)만 허용"""
+    return {k: v if isinstance(v, (str, bool, int, float)) else str(v) for k, v in attrs.items() if v is not None}
+
+
+def _observe(name, kind, seconds, error):
+    if _metrics is None:
+        return
+    _metrics["seconds"].labels(name, kind).observe(seconds)
+    if error:
+        _metrics["errors"].labels(name, kind).inc()
+
+
+def setup(service_name="jejuon", metrics_port=None, otlp_endpoint=None):
+    """Prometheus/OpenTelemetry 내보내기 켜기 (프로세스당 한 번, 설치 안 된 쪽은 건너뜀)
+
+    metrics_port: 지정하면 그 포트에 /metrics HTTP 서버를 띄운다 (기본: JEJUON_METRICS_PORT 환경변수)
+    otlp_endpoint: OTLP/HTTP collector 주소 (기본: OTEL_EXPORTER_OTLP_ENDPOINT 환경변수)
+    반환: 켜진 내보내기 상태 dict
+    """
+    global _metrics, _otel
+    metrics_port = metrics_port or os.environ.get("JEJUON_METRICS_PORT")
+    otlp_endpoint = otlp_endpoint or os.environ.get("OTEL_EXPORTER_OTLP_ENDPOINT")
+    with _setup_lock:
+        if _metrics is None:
+            try:
+                import prometheus_client as prom
+            except ImportError:
+                prom = None
+            if prom is not None:
+                _metrics = {
+                    "seconds": prom.Histogram(
+                        "jejuon_span_seconds", "단계/외부 호출 소요시간", ["name", "kind"],
+                        buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+                    ),
+                    "errors": prom.Counter("jejuon_span_errors_total", "예외로 끝난 단계 수", ["name", "kind"]),
+                    "cache": prom.Counter("jejuon_cache_events_total", "캐시 적중/실패 수", ["cache", "result"]),
+                }
+                _status["prometheus"] = "enabled"
+                if metrics_port:
+                    prom.start_http_server(int(metrics_port))
+                    _status["prometheus"] = f":{int(metrics_port)}/metrics"
+        if _otel is None and otlp_endpoint:
+            try:
+                from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+                from opentelemetry.sdk.resources import Resource
+                from opentelemetry.sdk.trace import TracerProvider
+                from opentelemetry.sdk.trace.export import BatchSpanProcessor
+            except ImportError:
+                _status["otel"] = "opentelemetry-sdk 미설치"
+            else:
+                provider = TracerProvider(resource=Resource.create({"service.name": service_name}))
+                endpoint = otlp_endpoint.rstrip("/")
+                if not endpoint.endswith("/v1/traces"):
+                    endpoint += "/v1/traces"
+                provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter(endpoint=endpoint)))
+                _otel = provider.get_tracer("jejuon")
+                _status["otel"] = endpoint
+    return dict(_status)
+
+
+def metrics_text():
+    """Prometheus 텍스트 형식 (prometheus_client가 없으면 None)"""
+    if _metrics is None:
+        return None
+    import prometheus_client as prom
+
+    return prom.generate_latest().decode("utf-8")
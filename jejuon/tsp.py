@@ -0,0 +1,238 @@
+"""방문 순서 최적화 엔진
+
+- 지점이 적으면(기본 12개 이하) Held–Karp 동적계획법으로 정확한 최적해
+- 많으면 최근접 이웃 초기해 → 2-opt / Or-opt 지역 탐색 (NumPy 벡터화)
+  남는 시간 예산 동안 교란(double-bridge) 후 재탐색해서 더 좋은 해를 찾는다.
+
+경유지를 하나씩 더하거나 빼는 편집은 repair()로 기존 순서를 살린 채
+가장 싼 위치에 끼워 넣고(cheapest insertion) 짧은 시간만 지역 탐색한다.
+
+모든 문제는 "출발 고정 + 도착 고정" 경로로 바꿔서 푼다.
+  - 도착 자유(open): 모든 지점에서 비용 0으로 들어오는 가상 도착점을 붙인다.
+  - 출발지로 복귀: 출발지를 복제한 도착점을 붙인다.
+"""
+import time
+
+import numpy as np
+
+OPEN_END = None
+RETURN_TO_START = "start"
+
+DEFAULT_TIME_BUDGET = 0.03  # 초
+DEFAULT_EXACT_LIMIT = 12    # Held–Karp로 풀 최대 경유지 수
+DEFAULT_REPAIR_BUDGET = 0.005  # repair 후 지역 탐색 시간(초)
+
+
+def _augment(dist, start, end):
+    """(출발, 경유지들, 도착) 순서로 재배열한 비용 행렬과 원래 인덱스 매핑"""
+    n = len(dist)
+    if end == RETURN_TO_START:
+        end = start
+    middle = [i for i in range(n) if i != start and i != end]
+    if end is OPEN_END:
+        idx = [start] + middle
+        m = np.zeros((len(idx) + 1, len(idx) + 1))
+        m[:-1, :-1] = dist[np.ix_(idx, idx)]
+        return m, idx + [-1]
+    idx = [start] + middle + [end]
+    return dist[np.ix_(idx, idx)].astype(float), idx
+
+
+def path_cost(dist, path):
+    path = np.asarray(path)
+    return float(dist[path[:-1], path[1:]].sum())
+
+
+def held_karp(m):
+    """출발 0, 도착 n-1 고정 경로의 정확한 최적해 (벡터화 DP)"""
+    n = len(m)
+    k = n - 2  # 경유지 수
+    if k <= 0:
+        return list(range(n))
+    inner = m[1:-1, 1:-1]
+    full = (1 << k) - 1
+    dp = np.full((1 << k, k), np.inf)
+    parent = np.full((1 << k, k), -1, dtype=np.int64)
+    for j in range(k):
+        dp[1 << j, j] = m[0, j + 1]
+
+    masks = np.arange(1 << k)
+    popcount = np.zeros(1 << k, dtype=np.int64)
+    for j in range(k):
+        popcount += (masks >> j) & 1
+
+    for size in range(2, k + 1):
+        layer = masks[popcount == size]
+        for j in range(k):
+            sel = layer[(layer >> j) & 1 == 1]
+            prev = sel ^ (1 << j)
+            cand = dp[prev] + inner[:, j]
+            best = cand.argmin(axis=1)
+            dp[sel, j] = cand[np.arange(len(sel)), best]
+            parent[sel, j] = best
+
+    last = int((dp[full] + m[1:-1, -1]).argmin())
+    order = []
+    mask = full
+    while last != -1:
+        order.append(last + 1)
+        prev = int(parent[mask, last])
+        mask ^= 1 << last
+        last = prev
+    return [0] + order[::-1] + [n - 1]
+
+
+def nearest_neighbour(m):
+    n = len(m)
+    path = [0]
+    remaining = np.ones(n, dtype=bool)
+    remaining[0] = remaining[n - 1] = False
+    current = 0
+    for _ in range(n - 2):
+        row = np.where(remaining, m[current], np.inf)
+        current = int(row.argmin())
+        path.append(current)
+        remaining[current] = False
+    return path + [n - 1]
+
+
+def _two_opt_move(m, p):
+    """가장 좋은 2-opt(구간 뒤집기) 이동. 개선이 없으면 None"""
+    n = len(p)
+    fwd = np.concatenate([[0.0], np.cumsum(m[p[:-1], p[1:]])])
+    bwd = np.concatenate([[0.0], np.cumsum(m[p[1:], p[:-1]])])
+    i = np.arange(1, n - 1)[:, None]  # 뒤집는 구간 시작
+    j = np.arange(1, n - 1)[None, :]  # 뒤집는 구간 끝
+    delta = (
+        m[p[i - 1], p[j]] + m[p[i], p[j + 1]]
+        - m[p[i - 1], p[i]] - m[p[j], p[j + 1]]
+        + (bwd[j] - bwd[i]) - (fwd[j] - fwd[i])
+    )
+    delta = np.where(j > i, delta, np.inf)
+    best = np.unravel_index(np.argmin(delta), delta.shape)
+    if not delta[best] < -1e-9:
+        return None
+    a, b = int(best[0]) + 1, int(best[1]) + 1
+    return np.concatenate([p[:a], p[a:b + 1][::-1], p[b + 1:]])
+
+
+def _or_opt_move(m, p, max_len=3):
+    """가장 좋은 Or-opt(길이 1~3 구간을 다른 위치로 옮기기) 이동. 개선이 없으면 None"""
+    n = len(p)
+    best_delta, best_move = -1e-9, None
+    k = np.arange(n - 1)[None, :]  # p[k]와 p[k+1] 사이에 삽입
+    for length in range(1, max_len + 1):
+        if n - 2 < length + 1:
+            break
+        i = np.arange(1, n - length)[:, None]  # 구간 p[i..i+length-1]
+        e = i + length - 1
+        gain = m[p[i - 1], p[i]] + m[p[e], p[e + 1]] - m[p[i - 1], p[e + 1]]
+        add = m[p[k], p[i]] + m[p[e], p[k + 1]] - m[p[k], p[k + 1]]
+        delta = np.where((k < i - 1) | (k > e), add - gain, np.inf)
+        pos = np.unravel_index(np.argmin(delta), delta.shape)
+        if delta[pos] < best_delta:
+            best_delta = delta[pos]
+            best_move = (int(pos[0]) + 1, length, int(pos[1]))
+    if best_move is None:
+        return None
+    a, length, at = best_move
+    seg = p[a:a + length]
+    rest = np.concatenate([p[:a], p[a + length:]])
+    at = at + 1 if at < a else at + 1 - length
+    return np.concatenate([rest[:at], seg, rest[at:]])
+
+
+def local_search(m, path, deadline):
+    p = np.asarray(path)
+    while time.perf_counter() < deadline:
+        nxt = _two_opt_move(m, p)
+        if nxt is None:
+            nxt = _or_opt_move(m, p)
+        if nxt is None:
+            break
+        p = nxt
+    return p
+
+
+def _double_bridge(p, rng):
+    """지역 최적해를 벗어나기 위한 교란 (내부 지점만 섞음)"""
+    inner = p[1:-1]
+    if len(inner) < 8:
+        a, b = sorted(rng.choice(np.arange(len(inner) + 1), size=2, replace=False))
+        inner = np.concatenate([inner[:a], inner[a:b][::-1], inner[b:]])
+    else:
+        a, b, c = sorted(rng.choice(np.arange(1, len(inner)), size=3, replace=False))
+        inner = np.concatenate([inner[:a], inner[b:c], inner[a:b], inner[c:]])
+    return np.concatenate([p[:1], inner, p[-1:]])
+
+
+def iterated_local_search(m, time_budget=DEFAULT_TIME_BUDGET, seed=0):
+    deadline = time.perf_counter() + time_budget
+    best = local_search(m, nearest_neighbour(m), deadline)
+    best_cost = path_cost(m, best)
+    rng = np.random.default_rng(seed)
+    while time.perf_counter() < deadline and len(best) > 4:
+        cand = local_search(m, _double_bridge(best, rng), deadline)
+        cand_cost = path_cost(m, cand)
+        if cand_cost < best_cost - 1e-9:
+            best, best_cost = cand, cand_cost
+    return [int(x) for x in best]
+
+
+def _solve_held_karp(m, time_budget):
+    return held_karp(m)
+
+
+def _solve_local_search(m, time_budget):
+    return iterated_local_search(m, time_budget)
+
+
+SOLVERS = {
+    "held_karp": _solve_held_karp,
+    "local_search": _solve_local_search,
+}
+
+
+def register_solver(name, fn):
+    """fn(m, time_budget) → 0에서 시작해 len(m)-1에서 끝나는 경로"""
+    SOLVERS[name] = fn
+
+
+def solve(dist, start=0, end=OPEN_END, method="auto",
+          time_budget=DEFAULT_TIME_BUDGET, exact_limit=DEFAULT_EXACT_LIMIT):
+    """비용 행렬 dist(N×N, 비대칭 가능)에서 start부터 모든 지점을 도는 순서
+
+    end: None이면 도착 자유, RETURN_TO_START면 출발지로 복귀, 정수면 그 지점에서 끝
+    반환: (원래 인덱스 순서 리스트, 총비용)
+    """
+    dist = np.asarray(dist, dtype=float)
+    m, idx = _augment(dist, start, end)
+    if method == "auto":
+        method = "held_karp" if len(m) - 2 <= exact_limit else "local_search"
+    path = SOLVERS[method](m, time_budget)
+    cost = path_cost(m, path)
+    order = [idx[i] for i in path if idx[i] != -1]
+    return order, cost
+
+
+def repair(dist, order, start=0, end=OPEN_END, time_budget=DEFAULT_REPAIR_BUDGET):
+    """기존 방문 순서 order(원래 인덱스)를 살려서 빠진 지점은 건너뛰고 새 지점은 가장 싼 위치에 끼워 넣은 뒤,
+    time_budget 동안 2-opt/Or-opt로 다듬는다. order에 없는 인덱스는 dist 상의 새 지점으로 본다.
+
+    반환: solve와 같은 (원래 인덱스 순서 리스트, 총비용)
+    """
+    dist = np.asarray(dist, dtype=float)
+    m, idx = _augment(dist, start, end)
+    middle = {orig: i for i, orig in enumerate(idx[1:-1], 1)}
+    path = [0] + [middle[o] for o in dict.fromkeys(order) if o in middle] + [len(m) - 1]
+    kept = set(path)
+    for node in range(1, len(m) - 1):
+        if node in kept:
+            continue
+        a, b = np.array(path[:-1]), np.array(path[1:])
+        k = int((m[a, node] + m[node, b] - m[a, b]).argmin())
+        path.insert(k + 1, node)
+    path = local_search(m, path, time.perf_counter() + time_budget)
+    cost = path_cost(m, path)
+    order = [idx[i] for i in path if idx[i] != -1]
+    return order, cost
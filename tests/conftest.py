@@ -0,0 +1,36 @@
+"""테스트 공용 fixture: 저장소 CSV로 만든 임시 번들과 TravelService, 가짜 Mapbox 서버"""
+import pytest
+
+from benchmarks.stubs import MapboxHandler, StubServer
+from jejuon import directions
+from jejuon.bundle import build_bundle
+from jejuon.service import TravelService
+
+
+@pytest.fixture(scope="session")
+def bundle_dir(tmp_path_factory):
+    out = tmp_path_factory.mktemp("bundle")
+    build_bundle(str(out), fetch_boundary=False, log=lambda msg: None)
+    return str(out)
+
+
+@pytest.fixture(scope="session")
+def service(bundle_dir, tmp_path_factory):
+    """점수 파이프라인 출력 없이 번들만 쓰는 서비스 (로컬 .cache와 무관)"""
+    tmp = tmp_path_factory.mktemp("service")
+    return TravelService(
+        mapbox_token="stub", bundle_dir=bundle_dir,
+        leg_cache_path=str(tmp / "legs.sqlite"), scores_dir=str(tmp / "scores"),
+    )
+
+
+@pytest.fixture(scope="session")
+def mapbox_stub():
+    with StubServer(MapboxHandler) as stub:
+        yield stub
+
+
+@pytest.fixture
+def mapbox_api(mapbox_stub, monkeypatch):
+    monkeypatch.setattr(directions, "API_BASE", mapbox_stub.url)
+    return mapbox_stub
@@ -0,0 +1,118 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from jejuon import api
+
+SPOTS = ["약천사", "선광사", "훈데르트바서파크"]
+
+
+@pytest.fixture(scope="module")
+def client(service):
+    original = api.service
+    api.service = service
+    try:
+        with TestClient(api.app) as c:
+            yield c
+    finally:
+        api.service = original
+
+
+def test_health(client, service):
+    r = client.get("/health")
+    assert r.status_code == 200
+    assert r.json() == {"status": "ok", "data_version": service.data_version}
+
+
+def test_metrics(client):
+    r = client.get("/metrics")
+    assert r.status_code in (200, 503)
+
+
+def test_regions_and_places(client):
+    regions = client.get("/regions").json()["regions"]
+    assert regions == sorted(regions) and "제주시 애월읍" in regions
+    places = client.get("/places", params={"region": "제주시 애월읍"}).json()["places"]
+    assert places and len(places) < len(client.get("/places").json()["places"])
+    assert client.get("/places", params={"region": "없는지역"}).status_code == 422
+
+
+def test_coordinates(client):
+    r = client.get("/places/coordinates", params={"name": "약천사"})
+    assert r.status_code == 200
+    assert 126 < r.json()["lon"] < 127 and 33 < r.json()["lat"] < 34
+    assert client.get("/places/coordinates", params={"name": "없는장소이름"}).status_code == 404
+
+
+def test_place_summary(client):
+    body = client.get("/places/summary", params={"name": "훈데르트바서파크"}).json()
+    assert body["place"] == "훈데르트바서파크"
+    assert body["coordinates"] is not None
+
+
+def test_search_reviews(client):
+    body = client.get("/reviews/search", params={"q": "훈데르트바서파크 근처 조용한 카페", "k": 3}).json()
+    assert 0 < len(body["snippets"]) <= 3
+    assert client.get("/reviews/search", params={"q": ""}).status_code == 422
+
+
+def test_nearby_rows_with_missing_fields(client, service):
+    """빈 칸(NaN)이 있는 행도 null로 내려준다 (숙박 행은 업종이 비어 있는 경우가 많음)"""
+    stop = list(service.coordinates("훈데르트바서파크"))
+    r = client.post("/places/nearby", json={"stops": [stop], "categories": ["카페", "숙박", "관광업"], "k": 20})
+    assert r.status_code == 200
+    places = r.json()["places"]
+    assert places
+    assert any(value is None for place in places for value in place.values())
+    assert client.post("/places/nearby", json={}).status_code == 422
+
+
+def test_route(client, mapbox_api):
+    r = client.post("/route", json={"start": SPOTS[0], "waypoints": SPOTS[1:]})
+    assert r.status_code == 200
+    body = r.json()
+    assert body["order"][0] == SPOTS[0] and sorted(body["order"]) == sorted(SPOTS)
+    assert len(body["segments"]) == len(SPOTS) - 1 and body["duration"] > 0
+
+    compact = client.post("/route", json={"start": SPOTS[0], "waypoints": SPOTS[1:], "geometry": "polyline"}).json()
+    assert all(isinstance(seg, str) for seg in compact["segments"])
+
+    # 이전 결과에서 경유지 하나 빼기 (바뀐 구간만 다시 계산)
+    edited = client.post("/route", json={"start": SPOTS[0], "waypoints": SPOTS[1:2], "previous": body}).json()
+    assert edited["order"] == [SPOTS[0], SPOTS[1]]
+
+
+def test_itinerary(client):
+    r = client.post("/itinerary", json={"places": SPOTS + ["한림공원"], "days": 2, "engine": "offline"})
+    assert r.status_code == 200
+    days = r.json()["days"]
+    assert len(days) == 2
+    assert sorted(p for d in days for p in d["order"]) == sorted(SPOTS + ["한림공원"])
+
+
+def test_recommendations(client):
+    recs = client.get("/recommendations", params={"styles": ["자연"], "k": 3}).json()["recommendations"]
+    assert len(recs) == 3
+    assert [r["score"] for r in recs] == sorted((r["score"] for r in recs), reverse=True)
+    regional = client.get("/recommendations", params={"styles": ["자연"], "region": "제주시 애월읍"})
+    assert regional.status_code == 200
+    assert client.get("/recommendations", params={"styles": ["자연"], "region": "없는지역"}).status_code == 422
+
+
+def test_route_recommendations(client):
+    r = client.post("/recommendations/route", json={"order": SPOTS, "styles": ["자연"], "engine": "offline", "k": 3})
+    assert r.status_code == 200
+    recs = r.json()["recommendations"]
+    assert len(recs) <= 3
+    assert all(0 <= rec["position"] < len(SPOTS) and rec["name"] not in SPOTS for rec in recs)
+
+
+@pytest.mark.parametrize("styles", [["없는성향"], ["자연", "없는성향"]])
+def test_unknown_styles_are_rejected(client, styles):
+    r = client.get("/recommendations", params={"styles": styles})
+    assert r.status_code == 422 and "없는성향" in r.json()["detail"]
+    r = client.post("/recommendations/route", json={"order": SPOTS, "styles": styles})
+    assert r.status_code == 422
+
+
+def test_route_recommendations_need_a_style(client):
+    assert client.post("/recommendations/route", json={"order": SPOTS, "styles": []}).status_code == 422
@@ -0,0 +1,44 @@
+"""번들 빌드: 동시에 여러 워커가 빌드/읽기를 해도 완성된 빌드만 보이는지"""
+import json
+import multiprocessing
+import os
+
+from jejuon import bundle
+
+
+def _load(bundle_dir):
+    tables, _, manifest = bundle.load_bundle(bundle_dir)
+    return manifest["build"], {name: len(df) for name, df in tables.items()}
+
+
+def test_concurrent_workers_share_one_build(tmp_path):
+    with multiprocessing.get_context("fork").Pool(3) as pool:
+        results = pool.map(_load, [str(tmp_path)] * 3)
+    builds = {build for build, _ in results}
+    assert len(builds) == 1
+    assert all(rows == results[0][1] for _, rows in results)
+    # 임시 폴더/포인터가 남지 않고 빌드 폴더 하나와 CURRENT만
+    assert sorted(os.listdir(tmp_path)) == sorted([builds.pop(), bundle.CURRENT])
+
+
+def test_stale_rebuild_swaps_current(tmp_path):
+    old = tmp_path / "b3-old"
+    old.mkdir()
+    (old / bundle.MANIFEST).write_text(json.dumps({"format": bundle.BUNDLE_FORMAT, "build": "b3-old", "tables": {}}))
+    (tmp_path / bundle.CURRENT).write_text("b3-old")
+    (tmp_path / "reviews").mkdir()
+    assert bundle.is_stale(bundle.read_manifest(str(tmp_path)))
+
+    tables, _, manifest = bundle.load_bundle(str(tmp_path))
+    assert (tmp_path / bundle.CURRENT).read_text() == manifest["build"] != "b3-old"
+    assert bundle.read_manifest(str(tmp_path)) == manifest
+    assert not bundle.is_stale(manifest)
+    assert len(tables["poi_data"]) and bundle.read_regions(str(tmp_path)) is not None
+    # 직전 빌드(읽는 중인 워커용)와 리뷰 인덱스 폴더는 그대로
+    assert old.exists() and (tmp_path / "reviews").exists()
+
+
+def test_flat_layout_is_rebuilt(tmp_path):
+    """CURRENT 없이 폴더에 바로 쓰던 예전 번들은 없는 것으로 보고 다시 빌드"""
+    (tmp_path / bundle.MANIFEST).write_text(json.dumps({"format": bundle.BUNDLE_FORMAT, "tables": {}}))
+    assert bundle.read_manifest(str(tmp_path)) is None
@@ -0,0 +1,100 @@
+import time
+
+import pytest
+
+from jejuon import sqlite_cache
+from jejuon.guide import CompletionCache
+from jejuon.legcache import LegCache
+
+A, B, C = (126.5, 33.4), (126.6, 33.5), (126.7, 33.3)
+
+
+@pytest.fixture
+def legs(tmp_path):
+    cache = LegCache(str(tmp_path / "legs.sqlite"), ttl=60, max_entries=3)
+    yield cache
+    cache.close()
+
+
+def test_leg_roundtrip_and_geometry(legs):
+    legs.put("driving", A, B, 100.0, 2000.0, [[*A], [*B]])
+    legs.put("driving", B, C, 50.0, 900.0)  # 행렬 배치처럼 경로 좌표 없이
+    assert legs.get("driving", A, B) == {"duration": 100.0, "distance": 2000.0, "geometry": [[*A], [*B]]}
+    assert legs.get("driving", B, C) is None  # 경로 좌표가 필요하면 없는 것으로
+    assert legs.get("driving", B, C, need_geometry=False)["duration"] == 50.0
+    assert legs.get("walking", A, B) is None
+    # 경로 좌표 없이 다시 써도 기존 좌표는 유지
+    legs.put("driving", A, B, 110.0, 2000.0)
+    assert legs.get("driving", A, B)["geometry"] == [[*A], [*B]]
+    assert (legs.hits, legs.misses) == (3, 2)
+
+
+def test_leg_matrix(legs):
+    legs.put_many("driving", [(A, B, 10.0, 100.0, None), (B, A, 12.0, 110.0, None)])
+    durations, distances = legs.matrix("driving", [A, B, C])
+    assert durations == [[0.0, 10.0, None], [12.0, 0.0, None], [None, None, 0.0]]
+    assert distances[1][0] == 110.0
+
+
+def test_leg_ttl(legs, monkeypatch):
+    legs.put("driving", A, B, 10.0, 100.0, [[*A], [*B]])
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 61)
+    assert legs.get("driving", A, B) is None
+    assert legs.matrix("driving", [A, B])[0][0][1] is None
+    legs.evict()
+    assert len(legs) == 0
+
+
+def test_leg_lru_eviction(legs):
+    for i, dest in enumerate([B, C, (126.8, 33.2), (126.9, 33.1)]):
+        legs.put("driving", A, dest, float(i), 1.0)
+        time.sleep(0.002)
+    legs.get("driving", A, B, need_geometry=False)  # 가장 먼저 쓴 항목을 최근에 읽음
+    legs.evict()
+    assert len(legs) == 3
+    assert legs.get("driving", A, B, need_geometry=False) is not None
+    assert legs.get("driving", A, C, need_geometry=False) is None  # 가장 오래 안 쓰인 항목
+
+
+def test_evict_runs_on_write_counter_not_every_write(legs, monkeypatch):
+    monkeypatch.setattr(sqlite_cache, "EVICT_EVERY", 5)
+    calls = []
+    original = legs.evict
+    monkeypatch.setattr(legs, "evict", lambda: (calls.append(1), original()))
+    legs._evicted = time.monotonic()
+    for i in range(4):
+        legs.put("driving", A, (127.0 + i * 0.01, 33.0), 1.0, 1.0)
+    assert not calls and len(legs) == 4  # 최대 개수를 잠깐 넘을 수 있음
+    legs.put_many("driving", [(A, (127.5, 33.0), 1.0, 1.0, None)])
+    assert len(calls) == 1 and len(legs) == 3
+
+
+def test_indexes_on_created_and_accessed(legs):
+    plan = legs._conn.execute("EXPLAIN QUERY PLAN DELETE FROM legs WHERE created < 0").fetchall()
+    assert "legs_created" in str(plan)
+
+
+def test_completion_cache(tmp_path, monkeypatch):
+    cache = CompletionCache(str(tmp_path / "completions.sqlite"), ttl=60, max_entries=2)
+    cache.put("k1", "m", "성산일출봉", "소개 1")
+    cache.put("k2", "m", "우도", "소개 2")
+    assert cache.get("k1") == "소개 1" and cache.get("없음") is None
+    cache.put("k3", "m", "한라산", "소개 3")
+    cache.evict()
+    assert len(cache) == 2 and cache.get("k2") is None  # k1은 방금 읽어서 남음
+
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 61)
+    assert cache.get("k1") is None
+    cache.close()
+
+
+def test_cache_survives_reopen(tmp_path):
+    path = str(tmp_path / "legs.sqlite")
+    first = LegCache(path)
+    first.put("driving", A, B, 10.0, 100.0, [[*A], [*B]])
+    first.close()
+    second = LegCache(path)
+    assert second.get("driving", A, B)["duration"] == 10.0
+    second.close()
@@ -0,0 +1,80 @@
+import warnings
+
+import numpy as np
+import pytest
+
+from jejuon.itinerary import cluster_days, day_route, plan_days
+from jejuon.service import LODGING_AUTO
+
+A = (126.50, 33.40)
+B = (126.60, 33.50)
+C = (126.30, 33.45)
+
+
+def _clusters(coords, n_days):
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")  # "Mean of empty slice" 등이 나오면 실패
+        return cluster_days(coords, n_days)
+
+
+def test_fewer_distinct_coordinates_than_days():
+    labels, centers = _clusters([A, A, B, B], 3)
+    assert len(centers) == 2 and np.isfinite(centers).all()
+    assert sorted(set(labels.tolist())) == [0, 1]
+    assert labels[0] == labels[1] != labels[2] == labels[3]
+
+
+def test_all_same_coordinate():
+    labels, centers = _clusters([A] * 3, 2)
+    assert labels.tolist() == [0, 0, 0]
+    assert np.allclose(centers, [A])
+
+
+def test_fewer_places_than_days():
+    labels, centers = _clusters([A, B], 5)
+    assert sorted(labels.tolist()) == [0, 1] and len(centers) == 2
+
+
+def test_single_place():
+    labels, centers = _clusters([A], 1)
+    assert labels.tolist() == [0] and np.allclose(centers, [A])
+
+
+def test_days_are_balanced_and_every_day_used():
+    rng = np.random.default_rng(0)
+    coords = np.column_stack([rng.uniform(126.2, 126.9, 13), rng.uniform(33.2, 33.5, 13)])
+    labels, centers = _clusters(coords, 4)
+    counts = np.bincount(labels, minlength=4)
+    assert len(centers) == 4 and counts.min() >= 1 and counts.max() <= -(-13 // 4)
+
+
+def test_geographic_groups_stay_together():
+    west = [(126.20 + 0.001 * i, 33.40) for i in range(3)]
+    east = [(126.90 + 0.001 * i, 33.40) for i in range(3)]
+    labels, _ = _clusters(west + east, 2)
+    assert len(set(labels[:3])) == 1 and len(set(labels[3:])) == 1 and labels[0] != labels[3]
+
+
+def test_day_route_with_anchor_returns_to_it():
+    times = np.array([[0, 1, 5, 1], [1, 0, 1, 5], [5, 1, 0, 1], [1, 5, 1, 0]], dtype=float)
+    route, cost = day_route(times, [1, 2, 3], anchor=0)
+    assert sorted(route) == [1, 2, 3] and cost == pytest.approx(4.0)
+    assert day_route(times, []) == ([], 0.0)
+
+
+def test_plan_days_moves_places_off_over_budget_days():
+    times = np.full((4, 4), 600.0)
+    np.fill_diagonal(times, 0.0)
+    plans = plan_days(times, [0, 0, 0, 1], dwell=3600.0, day_budget=3 * 3600.0)
+    assert sorted(p for plan in plans for p in plan.stops) == [0, 1, 2, 3]
+    assert not any(plan.over_budget for plan in plans)
+
+
+def test_plan_trip_auto_lodging_with_shared_coordinates(service):
+    """같은 좌표의 장소들을 날짜 수보다 적은 묶음으로 (빈 날의 NaN 중심으로 숙소를 찾지 않음)"""
+    places = ["루체빌리조트", "포도뮤지엄", "환우(주)", "이비사호텔"]
+    assert len({service.coordinates(p) for p in places}) == 2
+    trip = service.plan_trip(places, 3, engine="offline", lodging=LODGING_AUTO)
+    assert len(trip) == 2
+    assert sorted(p for day in trip for p in day.order) == sorted(places)
+    assert all(day.lodging for day in trip)
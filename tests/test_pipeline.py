@@ -0,0 +1,59 @@
+"""점수 파이프라인: 증분 실행과 맛집 표 갱신"""
+import pytest
+
+from jejuon import pipeline
+from jejuon.data import read_restaurant_data
+
+
+@pytest.fixture(scope="module")
+def base():
+    return read_restaurant_data()
+
+
+def _run(paths, out_dir, **kwargs):
+    return pipeline.run([str(p) for p in paths], str(out_dir), workers=1, log=lambda msg: None, **kwargs)
+
+
+def test_partial_dump_keeps_other_restaurants(base, tmp_path):
+    name = base["name_1"].iloc[0]
+    part = base[base["name_1"] == name].assign(review="조용하고 풍경이 예뻐요")
+    part.to_csv(tmp_path / "part.csv", index=False)
+
+    manifest = _run([tmp_path / "part.csv"], tmp_path / "out", full=True)
+    tables, _ = pipeline.load_current(str(tmp_path / "out"))
+    restaurants = tables["restaurants"]
+    assert manifest["tables"]["restaurants"] == "restaurants"
+    assert set(restaurants["name_1"]) == set(base["name_1"])
+    # 입력에 있는 맛집은 입력 행으로 바뀐다
+    rows = restaurants[restaurants["name_1"] == name]
+    assert len(rows) == len(part) and (rows["review"] == "조용하고 풍경이 예뻐요").all()
+    assert len(restaurants) == len(base)
+
+
+def test_full_dump_replaces_restaurants(base, tmp_path):
+    base.head(500).to_csv(tmp_path / "head.csv", index=False)
+    base.to_csv(tmp_path / "all.csv", index=False)
+
+    first = _run([tmp_path / "head.csv"], tmp_path / "out")
+    second = _run([tmp_path / "all.csv"], tmp_path / "out")
+    assert second["parent"] == first["version"]
+    assert second["new_rows"] == len(base) - 500
+    # 기존 맛집을 모두 덮으면 리뷰 표를 그대로 쓴다
+    assert second["tables"]["restaurants"] == "reviews"
+    tables, version = pipeline.load_current(str(tmp_path / "out"))
+    assert version == second["version"] and len(tables["restaurants"]) == len(base)
+
+    # 새 행이 없으면 새 버전을 만들지 않는다
+    assert _run([tmp_path / "all.csv"], tmp_path / "out")["version"] == second["version"]
+
+
+def test_no_baseline_uses_inputs_only(base, tmp_path):
+    base.head(10).to_csv(tmp_path / "head.csv", index=False)
+    manifest = _run([tmp_path / "head.csv"], tmp_path / "out", baseline=False)
+    assert manifest["tables"]["restaurants"] == "reviews"
+
+
+def test_missing_columns(tmp_path):
+    (tmp_path / "bad.csv").write_text("a,b\n1,2\n", encoding="utf-8")
+    with pytest.raises(ValueError, match="name_1"):
+        _run([tmp_path / "bad.csv"], tmp_path / "out")
@@ -0,0 +1,44 @@
+"""encoded polyline 인코딩/디코딩과 단순화"""
+import numpy as np
+from numpy.testing import assert_allclose
+
+from jejuon import polyline
+
+
+def test_reference_example():
+    # 형식 문서의 예: (38.5, -120.2), (40.7, -120.95), (43.252, -126.453) (위도, 경도)
+    coords = [[-120.2, 38.5], [-120.95, 40.7], [-126.453, 43.252]]
+    assert polyline.encode(coords) == "_p~iF~ps|U_ulLnnqC_mqNvxq`@"
+    assert_allclose(polyline.decode("_p~iF~ps|U_ulLnnqC_mqNvxq`@"), coords)
+
+
+def test_round_trip_keeps_precision():
+    rng = np.random.default_rng(0)
+    coords = np.column_stack([rng.uniform(126.1, 126.95, 500), rng.uniform(33.1, 33.6, 500)]).tolist()
+    decoded = polyline.decode(polyline.encode(coords))
+    assert len(decoded) == len(coords)
+    assert np.abs(np.array(decoded) - np.array(coords)).max() <= 0.5e-5 + 1e-12
+
+
+def test_empty_and_single_point():
+    assert polyline.encode([]) == ""
+    assert polyline.decode("") == []
+    assert_allclose(polyline.decode(polyline.encode([[126.5, 33.4]])), [[126.5, 33.4]])
+
+
+def test_simplify_keeps_ends_and_tolerance():
+    lon = np.linspace(126.5, 126.6, 200)
+    lat = 33.4 + 0.00001 * np.sin(np.linspace(0, 20, 200))  # 1m 남짓 흔들리는 직선
+    coords = np.column_stack([lon, lat]).tolist()
+    simplified = polyline.simplify(coords, 5.0)
+    assert_allclose([simplified[0], simplified[-1]], [coords[0], coords[-1]])
+    assert len(simplified) < 10
+    assert polyline.simplify(coords, 0) == coords
+
+
+def test_compact_segments_accepts_coords_and_strings():
+    seg = [[126.5, 33.4], [126.51, 33.41], [126.52, 33.4]]
+    compact = polyline.compact_segments([seg, polyline.encode(seg)])
+    assert compact[0] == compact[1]
+    assert_allclose(polyline.as_coords(compact[0]), seg)
+    assert polyline.as_coords(seg) is seg
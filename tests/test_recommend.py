@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from jejuon.recommend import SCORE_COLUMNS, STYLES, StyleRecommender, check_styles
+
+
+def _frame():
+    rows = []
+    for i, name in enumerate(["가", "나", "다"]):
+        scores = np.zeros(len(STYLES))
+        scores[i] = 1.0  # 가=힐링, 나=감성, 다=자연
+        rows.append({"Area Nm": name, "Cnt": 10 * (i + 1), "Cnt_norm": (i + 1) / 3, "URL": f"u{i}",
+                     **dict(zip(SCORE_COLUMNS, scores))})
+    return pd.DataFrame(rows)
+
+
+def test_top_by_style():
+    rec = StyleRecommender(_frame())
+    assert [r.name for r in rec.top(["감성"], k=1)] == ["나"]
+    assert rec.top(["감성"], k=1)[0].style == "감성"
+    # 인기도만 보면 Cnt_norm이 가장 큰 곳
+    assert rec.top(["힐링"], k=1, popularity=1.0)[0].name == "다"
+    assert "나" not in [r.name for r in rec.top(["감성"], k=3, exclude=["나"])]
+
+
+def test_check_styles():
+    check_styles(["힐링", "자연"])
+    with pytest.raises(ValueError, match="없는성향"):
+        check_styles(["없는성향"])
+    with pytest.raises(ValueError):
+        check_styles([])
+
+
+def test_service_rejects_unknown_styles(service):
+    with pytest.raises(ValueError):
+        service.recommend(["없는성향"])
+    with pytest.raises(ValueError):
+        service.route_recommendations(["약천사"], ["없는성향"], engine="offline")
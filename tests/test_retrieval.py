@@ -0,0 +1,92 @@
+"""리뷰 BM25 인덱스: 토큰화/점수, 검색, 버전 폴더 빌드"""
+import math
+import multiprocessing
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from jejuon import retrieval
+from jejuon.retrieval import ReviewIndex
+
+TABLES = {
+    "restaurants": pd.DataFrame({
+        "name_1": ["바다식당", "바다식당", "숲카페"],
+        "name_2": ["성산일출봉", "성산일출봉", "비자림"],
+        "key_word": ["해물, 친절", "", "조용"],
+        "review": ["해물라면이 정말 맛있고 친절해요", "바다 보이는 창가 자리가 좋아요", "숲속이라 조용하고 커피가 맛있어요"],
+    }),
+    "spot_reviews": pd.DataFrame({
+        # 관광지-카페 쌍마다 한 행이라 같은 리뷰가 되풀이된다
+        "t_name": ["성산일출봉", "비자림", "비자림"],
+        "t_review": ["일출 보러 새벽에 올라갔는데 장관이었어요"] + ["비자나무 숲길 산책하기 좋아요 조용해요"] * 2,
+        "c_name": ["일출카페", "숲카페", "숲카페"],
+        "c_review": ["오션뷰 카페, 일출 보고 들르기 좋아요"] + ["숲속이라 조용하고 커피가 맛있어요"] * 2,
+    }),
+}
+
+
+@pytest.fixture(scope="module")
+def index(tmp_path_factory):
+    out = str(tmp_path_factory.mktemp("reviews"))
+    return ReviewIndex.load(TABLES, "v1", out)
+
+
+def test_tokenize():
+    assert retrieval.tokenize("해물라면 OK 1등") == ["해물", "물라", "라면", "ok", "1", "등"]
+
+
+def test_bm25_weights_match_formula():
+    texts = ["가나 다라", "가나 가나", "마바"]
+    matrix, vocab = retrieval.bm25_matrix(texts)
+    # "가나"(문서 0, 1): 문서 1은 tf=2, 문서 길이 평균 = 5/3
+    n, df, avgdl = 3, 2, 5 / 3
+    idf = math.log1p((n - df + 0.5) / (df + 0.5))
+    expect = idf * 2 * (retrieval.K1 + 1) / (2 + retrieval.K1 * (1 - retrieval.B + retrieval.B * 2 / avgdl))
+    assert matrix[1, vocab["가나"]] == pytest.approx(expect, rel=1e-6)
+    assert matrix[2, vocab["가나"]] == 0
+
+
+def test_documents_dedupe_and_group(index):
+    # 되풀이된 관광지/카페 리뷰는 하나만 (같은 문장이라도 맛집/카페 출처가 다르면 따로)
+    assert len(index) == 7
+    a, b = index.spot_ranges["비자림"]
+    assert index.subjects[a] == "비자림"  # 관광지 자체 리뷰가 구간 맨 앞
+
+
+def test_search(index):
+    hits = index.search("해물라면 맛집")
+    assert hits[0].subject == "바다식당" and hits[0].source == "restaurant"
+    assert all(h.spot == "비자림" for h in index.search("조용한 카페", spots=["비자림"]))
+    assert index.search("조용한 카페", spots=["없는곳"]) == []
+    assert index.search("zzz") == []
+    assert index.mentioned_spots("성산 일출봉 근처 카페") == ["성산일출봉"]
+
+
+def test_representative(index):
+    assert {s.subject for s in index.representative("바다식당", k=5)} == {"바다식당"}
+    assert {s.spot for s in index.representative("비자림", k=5)} == {"비자림"}
+    assert index.representative("없는곳") == []
+
+
+def _build(args):
+    version, out_dir = args
+    return retrieval.build_index(TABLES, version, out_dir)["version"]
+
+
+def test_versioned_builds(tmp_path):
+    out = str(tmp_path)
+    with multiprocessing.get_context("fork").Pool(3) as pool:
+        assert pool.map(_build, [("v1", out)] * 3) == ["v1"] * 3
+    assert sorted(os.listdir(out)) == [retrieval.CURRENT, retrieval.build_name("v1")]
+
+    for version in ("v2", "v3"):
+        os.utime(retrieval.current_build(out), (0, 0))  # 이전 빌드가 확실히 더 오래되게
+        retrieval.build_index(TABLES, version, out)
+    assert retrieval.current_build(out) == os.path.join(out, retrieval.build_name("v3"))
+    # 직전 빌드 하나만 남긴다
+    assert sorted(d for d in os.listdir(out) if d != retrieval.CURRENT) == [
+        retrieval.build_name("v2"), retrieval.build_name("v3")]
+    np.testing.assert_array_equal(ReviewIndex(retrieval.current_build(out)).scores("조용"),
+                                  ReviewIndex.load(TABLES, "v3", out).scores("조용"))
@@ -0,0 +1,84 @@
+"""오프라인 도로망: 작은 합성 그래프에서 networkx 최단 경로와 비교"""
+import networkx as nx
+import numpy as np
+import pytest
+from shapely.geometry import LineString
+
+from jejuon import road_graph
+from jejuon.road_graph import RoadGraph
+
+# 0 → 1 → 2 → 3 격자 비슷한 작은 도로망 (경위도는 제주시 부근)
+NODES = {10: (126.50, 33.50), 11: (126.51, 33.50), 12: (126.52, 33.50), 13: (126.51, 33.51), 14: (126.60, 33.40)}
+
+
+@pytest.fixture(scope="module")
+def G():
+    G = nx.MultiDiGraph()
+    for n, (x, y) in NODES.items():
+        G.add_node(n, x=x, y=y)
+    edges = [
+        (10, 11, 900.0, 60.0), (11, 10, 900.0, 60.0),
+        (11, 12, 900.0, 90.0), (12, 11, 900.0, 90.0),
+        (11, 12, 1000.0, 50.0),  # 평행 간선: 더 길지만 빠름
+        (10, 13, 1500.0, 200.0), (13, 12, 1500.0, 10.0),
+        (14, 10, 5000.0, 300.0),  # 14는 나가기만 하는 일방통행
+    ]
+    for u, v, length, travel in edges:
+        G.add_edge(u, v, length=length, travel_time=travel)
+    bent = LineString([NODES[10], (126.505, 33.505), NODES[13]])
+    nx.set_edge_attributes(G, {(10, 13, 0): bent}, "geometry")
+    return G
+
+
+@pytest.fixture(scope="module")
+def graph(G, tmp_path_factory):
+    folder = str(tmp_path_factory.mktemp("graph"))
+    np.savez(road_graph.graph_path("drive", folder), **road_graph.compile_graph(G, "drive"))
+    assert RoadGraph.available("drive", folder) and not RoadGraph.available("walk", folder)
+    return RoadGraph.load("drive", folder)
+
+
+def _expected(G, weight):
+    simple = nx.DiGraph()
+    for u, v, d in G.edges(data=True):
+        if not simple.has_edge(u, v) or d["travel_time"] < simple[u][v]["travel_time"]:
+            simple.add_edge(u, v, **d)
+    return dict(nx.all_pairs_dijkstra_path_length(simple, weight=weight))
+
+
+def test_matrix_matches_networkx(G, graph):
+    nodes = list(NODES)
+    expected = _expected(G, "travel_time")
+    matrix = graph.matrix([list(NODES[n]) for n in nodes])
+    for i, u in enumerate(nodes):
+        for j, v in enumerate(nodes):
+            assert matrix[i, j] == pytest.approx(expected[u].get(v, np.inf))
+
+
+def test_costs_between_both_directions(graph):
+    stops = [list(NODES[10]), list(NODES[12])]
+    targets = [list(NODES[13]), list(NODES[14])]
+    out, back = graph.costs_between(stops, targets)
+    full = graph.matrix([list(NODES[n]) for n in (10, 12, 13, 14)])
+    np.testing.assert_allclose(out, full[:2, 2:])
+    np.testing.assert_allclose(back, full[2:, :2].T)
+
+
+def test_route_legs(graph):
+    start = [126.5001, 33.5001]  # 노드 10 근처
+    legs = graph.route_legs([start, list(NODES[12]), list(NODES[14])])
+    coords, duration, distance = legs[0]
+    # 10 → 11 → 12(빠른 평행 간선): 60 + 50초, 900 + 1000m
+    assert (duration, distance) == pytest.approx((110.0, 1900.0))
+    assert coords[0] == start and coords[-1] == list(NODES[12])
+    assert legs[1] is None  # 14로는 들어갈 수 없다
+
+    coords, duration, _ = graph.route_legs([list(NODES[10]), list(NODES[13])])[0]
+    assert duration == pytest.approx(200.0)
+    assert [126.505, 33.505] in coords  # 간선 geometry를 그대로 쓴다
+
+
+def test_walk_uses_length(G):
+    arrays = road_graph.compile_graph(G, "walk")
+    np.testing.assert_allclose(arrays["time"], arrays["length"] / road_graph.WALK_SPEED_MPS)
+    assert road_graph.network_for_mode("도보") == "walk" and road_graph.network_for_mode("운전자") == "drive"
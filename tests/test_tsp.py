@@ -0,0 +1,82 @@
+"""방문 순서 엔진: 작은 문제에서 완전 탐색과 비교"""
+import itertools
+
+import numpy as np
+import pytest
+
+from jejuon import tsp
+
+
+def brute_force(dist, start, end):
+    """모든 순열 중 최소 비용 (end: None이면 도착 자유, tsp.RETURN_TO_START면 복귀, 정수면 고정)"""
+    n = len(dist)
+    last = start if end == tsp.RETURN_TO_START else end
+    middle = [i for i in range(n) if i != start and i != last]
+    best = np.inf
+    for perm in itertools.permutations(middle):
+        path = [start, *perm] + ([] if last is None else [last])
+        best = min(best, tsp.path_cost(dist, path))
+    return best
+
+
+def _matrix(n, seed, symmetric=False):
+    rng = np.random.default_rng(seed)
+    dist = rng.uniform(1, 100, (n, n))
+    if symmetric:
+        dist = (dist + dist.T) / 2
+    np.fill_diagonal(dist, 0)
+    return dist
+
+
+def _check_order(order, n, start, end):
+    assert order[0] == start
+    if end == tsp.RETURN_TO_START:
+        assert order[-1] == start and sorted(order[:-1]) == list(range(n))
+    else:
+        assert sorted(order) == list(range(n))
+        if end is not None:
+            assert order[-1] == end
+
+
+@pytest.mark.parametrize("end", [None, tsp.RETURN_TO_START, "last"])
+@pytest.mark.parametrize("n", [2, 4, 7])
+@pytest.mark.parametrize("seed", range(3))
+def test_held_karp_matches_brute_force(n, seed, end):
+    end = n - 1 if end == "last" else end
+    start = 1 if end != n - 1 else 0
+    dist = _matrix(n, seed)
+    order, cost = tsp.solve(dist, start=start, end=end, method="held_karp")
+    _check_order(order, n, start, end)
+    assert cost == pytest.approx(brute_force(dist, start, end))
+    assert cost == pytest.approx(tsp.path_cost(dist, order))
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_local_search_is_valid_and_near_optimal(seed):
+    dist = _matrix(8, seed, symmetric=True)
+    order, cost = tsp.solve(dist, method="local_search", time_budget=0.05)
+    _check_order(order, 8, 0, None)
+    optimum = brute_force(dist, 0, None)
+    assert optimum - 1e-9 <= cost <= optimum * 1.05
+    assert cost == pytest.approx(tsp.path_cost(dist, order))
+
+
+def test_auto_switches_to_local_search(monkeypatch):
+    calls = []
+    monkeypatch.setitem(tsp.SOLVERS, "local_search",
+                        lambda m, budget: calls.append(len(m)) or list(range(len(m))))
+    tsp.solve(_matrix(6, 0), exact_limit=3)
+    assert calls == [7]  # 경유지 5개 + 출발 + 가상 도착점
+
+
+def test_repair_keeps_order_and_inserts_new_points():
+    dist = _matrix(7, 1, symmetric=True)
+    order, _ = tsp.solve(dist[:6, :6])
+    repaired, cost = tsp.repair(dist, order, time_budget=0)
+    _check_order(repaired, 7, 0, None)
+    # 시간 예산 0이면 기존 순서를 유지하고 새 지점만 끼워 넣는다
+    assert [i for i in repaired if i != 6] == order
+    assert cost == pytest.approx(tsp.path_cost(dist, repaired))
+
+    dropped, _ = tsp.repair(dist[:5, :5], order, time_budget=0)
+    assert dropped == [i for i in order if i < 5]